@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 Celestia Arcana — Astro + Tarot Synthesizer (ChatGPT via OpenAI API)
-- High-timeout + retry networking
+- Deadline-aware retry networking (jittered backoff, Retry-After, circuit breaker)
 - Strict JSON extraction/repair
 - Schema normalizer (guarantees stable output)
 - Tarot Knowledge Base (78-card slim) integration
@@ -38,25 +38,47 @@ OUTPUT STRICT SCHEMA (do not add new keys):
 """
 
 from __future__ import annotations
-import os, sys, json, datetime, re, argparse, pathlib, time, hashlib
+import os, sys, json, datetime, re, argparse, pathlib, time, hashlib, unicodedata, pickle, threading, contextlib, contextvars, random
 
 # Ensure vendored packages (installed via --target python_packages) are importable
 _PACKAGE_DIR = pathlib.Path(__file__).resolve().parent / "python_packages"
 if _PACKAGE_DIR.exists():
     sys.path.insert(0, str(_PACKAGE_DIR))
 
-import requests
-from typing import List, Dict, Any, Optional
-from requests.exceptions import ReadTimeout, ConnectTimeout, Timeout, RequestException
-from functools import lru_cache
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+from functools import lru_cache, wraps
+
+# requests, asyncio, httpx, sqlite3 and friends are imported where first used:
+# a cold `--help` or cache-hit reading should not pay for the network stack.
+if TYPE_CHECKING:
+    import asyncio, requests
 
 # HTTP Session for connection pooling
 _HTTP_SESSION = None
 
+def _timed_pool_classes():
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed_connection(base):
+        class TimedConnection(base):
+            def connect(self):
+                with timed_stage("http_connect"):
+                    return super().connect()
+        return TimedConnection
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = timed_connection(HTTPConnectionPool.ConnectionCls)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = timed_connection(HTTPSConnectionPool.ConnectionCls)
+
+    return {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
 def get_http_session() -> requests.Session:
     """Get or create a persistent HTTP session with connection pooling."""
     global _HTTP_SESSION
     if _HTTP_SESSION is None:
+        import requests
         _HTTP_SESSION = requests.Session()
         # Configure connection pooling
         adapter = requests.adapters.HTTPAdapter(
@@ -64,35 +86,289 @@ def get_http_session() -> requests.Session:
             pool_maxsize=10,
             max_retries=0  # We handle retries manually
         )
+        # Connections time their connect() (TCP + TLS) into the http_connect stage
+        adapter.poolmanager.pool_classes_by_scheme = _timed_pool_classes()
         _HTTP_SESSION.mount('http://', adapter)
         _HTTP_SESSION.mount('https://', adapter)
     return _HTTP_SESSION
 
-# Response cache for model calls (hash of prompt -> response)
-_RESPONSE_CACHE: Dict[str, str] = {}
 ENABLE_RESPONSE_CACHE = os.environ.get("ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MEMORY_TTL = float(os.environ.get("RESPONSE_CACHE_MEMORY_TTL", "0"))  # 0 = no expiry
+RESPONSE_CACHE_COMPRESS = os.environ.get("RESPONSE_CACHE_COMPRESS", "false").lower() == "true"
+
+# Optional persistent tier behind _RESPONSE_CACHE ("memory" = none, "sqlite" = shared on-disk cache)
+RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", "data/.response_cache.sqlite3")
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+RESPONSE_CACHE_DISK_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
+class LRUResponseCache:
+    """
+    Bounded in-memory response cache: LRU over at most `max_entries` entries and
+    `max_bytes` of stored text, optional TTL, optional zlib compression.
+    Dict-style access (`in`, `[]`, `len`, `clear`) plus get() which counts hits/misses.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 0.0, compress: bool = False, compress_min_bytes: int = 512):
+        from collections import OrderedDict
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl = float(ttl)
+        self.compress = bool(compress)
+        self.compress_min_bytes = int(compress_min_bytes)
+        self._data = OrderedDict()   # key -> (payload, size, expires, compressed)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _encode(self, value: str):
+        raw = value.encode("utf-8")
+        if self.compress and len(raw) >= self.compress_min_bytes:
+            import zlib
+            packed = zlib.compress(raw, 6)
+            if len(packed) < len(raw):
+                return packed, len(packed), True
+        return value, len(raw), False
+
+    @staticmethod
+    def _decode(payload, compressed: bool) -> str:
+        if compressed:
+            import zlib
+            return zlib.decompress(payload).decode("utf-8")
+        return payload
+
+    def _drop(self, key):
+        payload, size, _, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _live(self, key) -> bool:
+        entry = self._data.get(key)
+        if entry is None:
+            return False
+        if entry[2] and entry[2] <= time.time():
+            self._drop(key)
+            self.expirations += 1
+            return False
+        return True
+
+    def get(self, key, default=None):
+        with self._lock:
+            if not self._live(key):
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            payload, _, _, compressed = self._data[key]
+        return self._decode(payload, compressed)
+
+    def __getitem__(self, key) -> str:
+        with self._lock:
+            if not self._live(key):
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            payload, _, _, compressed = self._data[key]
+        return self._decode(payload, compressed)
+
+    def __setitem__(self, key, value: str):
+        payload, size, compressed = self._encode(value)
+        if size > self.max_bytes:
+            return
+        expires = time.time() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (payload, size, expires, compressed)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._live(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl,
+                "compress": self.compress,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+# Response cache for model calls (hash of prompt -> response)
+_RESPONSE_CACHE = LRUResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES,
+                                   RESPONSE_CACHE_MEMORY_TTL, RESPONSE_CACHE_COMPRESS)
 
 # -----------------------------------------------------------------------------
 # Config
 # -----------------------------------------------------------------------------
 DEFAULT_MODEL = "gpt-4o-mini"
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
-OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_API_URL = os.environ.get("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
+MODEL_MAX_CONCURRENCY = int(os.environ.get("MODEL_MAX_CONCURRENCY", "16"))
+LAST_OUTPUT_PATH = os.environ.get("LAST_MODEL_OUTPUT_PATH", "last_model_output.txt")
 STOP_SEQUENCES = [s for s in os.environ.get("ASTRO_TAROT_STOPS", "").split(",") if s.strip()] or None
 
 TAROT_KB_PATH = os.environ.get("TAROT_KB_PATH", "data/celestia_arcana_knowledge.json")
 CONSTELLATION_KB_PATH = os.environ.get("CONSTELLATION_KB_PATH", "data/constellation_knowledge.json")
 
 # Performance monitoring
-_PERF_STATS = {"cache_hits": 0, "cache_misses": 0, "kb_reloads": 0}
+_PERF_STATS = {"cache_hits": 0, "cache_misses": 0, "kb_reloads": 0, "persistent_cache_hits": 0, "local_fallbacks": 0}
+_PERF_STATS_LOCK = threading.Lock()
+
+def _count(name: str, n: int = 1):
+    """Add n to a _PERF_STATS counter; counters are bumped from worker threads and the event loop alike."""
+    with _PERF_STATS_LOCK:
+        _PERF_STATS[name] += n
+
+# -----------------------------------------------------------------------------
+# Stage timings (histograms per reading stage; JSON + Prometheus export)
+# -----------------------------------------------------------------------------
+# kb_load, prompt_build, http_connect, http_ttfb, model_generation, json_extract, json_repair,
+# coerce, validator, files_write, archive_write
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+STAGE_WINDOW = 1024  # recent observations kept per stage for p50/p95/p99
+METRICS_PREFIX = "astro_tarot"
+
+def _percentile(values, q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = -(-q * len(ordered) // 100)  # ceil(q/100 * n)
+    return ordered[min(len(ordered), max(1, int(rank))) - 1]
+
+class StageHistogram:
+    """Cumulative bucket counts + sum/count (for Prometheus) and a window of recent values (for quantiles)."""
+
+    def __init__(self):
+        from collections import deque
+        self.buckets = [0] * len(STAGE_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=STAGE_WINDOW)
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(STAGE_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap = {"count": self.count, "sum_s": round(self.sum, 6), "max_s": round(self.max, 6)}
+        for q in (50, 95, 99):
+            snap[f"p{q}_s"] = round(_percentile(self.recent, q), 6) if self.recent else None
+        return snap
+
+_STAGES: Dict[str, StageHistogram] = {}
+_STAGES_LOCK = threading.Lock()
+
+def observe_stage(stage: str, seconds: float):
+    with _STAGES_LOCK:
+        hist = _STAGES.get(stage)
+        if hist is None:
+            hist = _STAGES[stage] = StageHistogram()
+        hist.observe(seconds)
+
+@contextlib.contextmanager
+def timed_stage(stage: str):
+    """Time the block into the stage's histogram (failures included)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+def timed(stage: str):
+    """Decorator form of timed_stage."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with timed_stage(stage):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def stage_stats() -> Dict[str, Dict[str, Any]]:
+    with _STAGES_LOCK:
+        return {stage: hist.snapshot() for stage, hist in sorted(_STAGES.items())}
+
+def reset_stage_stats():
+    with _STAGES_LOCK:
+        _STAGES.clear()
+
+def get_metrics() -> Dict[str, Any]:
+    """Per-stage timings (count, sum, max, p50/p95/p99 in seconds) and the perf counters."""
+    return {"stages": stage_stats(), "perf_stats": dict(_PERF_STATS)}
+
+def metrics_prometheus() -> str:
+    """get_metrics() in the Prometheus text exposition format (0.0.4)."""
+    name = f"{METRICS_PREFIX}_stage_seconds"
+    lines = [f"# HELP {name} Time spent in each reading stage.", f"# TYPE {name} histogram"]
+    with _STAGES_LOCK:
+        stages = [(stage, list(h.buckets), h.count, h.sum, h.snapshot()) for stage, h in sorted(_STAGES.items())]
+    for stage, buckets, count, total, _snap in stages:
+        cumulative = 0
+        for bound, n in zip(STAGE_BUCKETS, buckets):
+            cumulative += n
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+    qname = f"{METRICS_PREFIX}_stage_quantile_seconds"
+    lines += [f"# HELP {qname} Quantiles over the last {STAGE_WINDOW} observations of each stage.",
+              f"# TYPE {qname} gauge"]
+    for stage, _buckets, _count, _total, snap in stages:
+        for q in (50, 95, 99):
+            if snap[f"p{q}_s"] is not None:
+                lines.append(f'{qname}{{stage="{stage}",quantile="{q / 100:g}"}} {snap[f"p{q}_s"]}')
+    for key, value in sorted(_PERF_STATS.items()):
+        counter = f"{METRICS_PREFIX}_{key}_total"
+        lines += [f"# TYPE {counter} counter", f"{counter} {value}"]
+    return "\n".join(lines) + "\n"
 
 # Cache management utilities
 def clear_all_caches():
     """Clear all caches (KB, responses, HTTP session)."""
-    global _CARD_KB_CACHE, _CONSTELLATION_KB_CACHE, _RESPONSE_CACHE, _HTTP_SESSION
+    global _CARD_KB_CACHE, _CONSTELLATION_KB_CACHE, _KNOWLEDGE_INDEX, _RESPONSE_CACHE, _HTTP_SESSION, _CACHE_BACKEND
+    global _SYMBOLIC_MEANINGS_CACHE
     _CARD_KB_CACHE = None
     _CONSTELLATION_KB_CACHE = None
+    _SYMBOLIC_MEANINGS_CACHE = None
+    _KNOWLEDGE_INDEX = None
     _RESPONSE_CACHE.clear()
+    _READING_CACHE.clear()
+    if _CACHE_BACKEND is not None:
+        # Shared with other processes: drop our handle, keep the entries
+        _CACHE_BACKEND.close()
+        _CACHE_BACKEND = None
     if _HTTP_SESSION:
         _HTTP_SESSION.close()
         _HTTP_SESSION = None
@@ -104,39 +380,789 @@ def reload_kbs(force=True):
     load_constellation_kb(force_reload=force)
     print("✓ Knowledge bases reloaded", file=sys.stderr)
 
+def warm_kbs():
+    """Load knowledge bases if they are not cached yet."""
+    get_card_kb()
+    get_constellation_kb()
+
 def get_cache_stats() -> Dict[str, Any]:
     """Get cache statistics."""
+    backend = get_cache_backend()
     return {
         "response_cache_size": len(_RESPONSE_CACHE),
         "cache_enabled": ENABLE_RESPONSE_CACHE,
+        "response_cache": _RESPONSE_CACHE.stats(),
+        "reading_cache": _READING_CACHE.stats(),
+        "persistent_cache": backend.stats() if backend is not None else None,
+        "kb_load": {kind: dict(v) for kind, v in _KB_LOAD_STATS.items()},
+        "output_profile": get_output_profile(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "hedging": hedge_stats(),
+        "router": get_router_stats(),
+        "stages": stage_stats(),
         "perf_stats": dict(_PERF_STATS)
     }
 
 # -----------------------------------------------------------------------------
-# HTTP (long timeout + retry + connection pooling)
+# Persistent response cache (shared across processes)
+# -----------------------------------------------------------------------------
+class SQLiteResponseCache:
+    """
+    Response cache in SQLite (WAL mode) keyed by _get_cache_key.
+    Safe for many processes and threads; entries expire after `ttl` seconds and
+    the least recently used ones are evicted once the total exceeds `max_bytes`.
+    Any object with the same get/set/delete/clear/stats/close methods can replace it.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, ttl: float = RESPONSE_CACHE_TTL,
+                 max_bytes: int = RESPONSE_CACHE_DISK_MAX_BYTES):
+        import sqlite3
+        self.path = str(path)
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        pathlib.Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=10000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+        # Leases for cross-process single-flight: one row per key being computed right now
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS inflight (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        expires = now + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses(key, value, size, expires, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, expires, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows until under max_bytes."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self.evictions += self._db.execute("DELETE FROM responses WHERE expires <= ?", (now,)).rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            excess = total - self.max_bytes
+            if excess > 0:
+                victims = []
+                for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+                self.evictions += len(victims)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def delete(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def try_lock(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the in-flight lease for key unless another live owner holds it."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM inflight WHERE key = ? AND expires <= ?", (key, now))
+                taken = self._db.execute("INSERT OR IGNORE INTO inflight(key, owner, expires) VALUES (?, ?, ?)",
+                                         (key, owner, now + float(ttl))).rowcount == 1
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return taken
+
+    def unlock(self, key: str, owner: str):
+        with self._lock:
+            self._db.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, owner))
+
+    def lock_held(self, key: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM inflight WHERE key = ? AND expires > ?",
+                                    (key, time.time())).fetchone() is not None
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"backend": "sqlite", "path": self.path, "entries": entries, "bytes": size,
+                "max_bytes": self.max_bytes, "ttl_s": self.ttl, "evictions": self.evictions}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_CACHE_BACKEND = None
+
+def get_cache_backend():
+    """Persistent cache tier selected by RESPONSE_CACHE_BACKEND (None when memory-only)."""
+    global _CACHE_BACKEND
+    if _CACHE_BACKEND is None and RESPONSE_CACHE_BACKEND == "sqlite":
+        _CACHE_BACKEND = SQLiteResponseCache(RESPONSE_CACHE_PATH)
+    return _CACHE_BACKEND
+
+def set_cache_backend(backend):
+    """Install a persistent cache tier (or None to disable one)."""
+    global _CACHE_BACKEND
+    _CACHE_BACKEND = backend
+
+# -----------------------------------------------------------------------------
+# HTTP (deadline-aware retry policy + circuit breaker + connection pooling)
 # -----------------------------------------------------------------------------
-def _post_with_retry(url, payload, headers=None, timeout=(60, 3600), retries=3, backoff=2.0):
+# Per-attempt timeouts; READING_DEADLINE bounds one reading's attempts and backoff together
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "120"))
+READING_DEADLINE = float(os.environ.get("READING_DEADLINE", "300"))  # seconds, 0 = none
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "4"))  # including the first
+RETRY_BACKOFF_BASE = float(os.environ.get("RETRY_BACKOFF_BASE", "0.5"))
+RETRY_BACKOFF_CAP = float(os.environ.get("RETRY_BACKOFF_CAP", "20"))  # also the longest Retry-After honoured
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+BREAKER_THRESHOLD = int(os.environ.get("BREAKER_THRESHOLD", "5"))  # consecutive failures, 0 = off
+BREAKER_COOLDOWN = float(os.environ.get("BREAKER_COOLDOWN", "30"))
+_PERF_STATS.update(http_retries=0, deadline_exceeded=0, breaker_trips=0, breaker_rejected=0)
+
+class DeadlineExceeded(TimeoutError):
+    """The reading's deadline passed (or would pass during the next backoff) before the model answered."""
+
+class CircuitOpenError(RuntimeError):
+    """The upstream's circuit is open: fail fast (or fall back) instead of calling it."""
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("reading_deadline", default=None)
+
+@contextlib.contextmanager
+def reading_deadline(seconds: Optional[float] = None):
+    """Bound every model call inside to `seconds` from now (default READING_DEADLINE); nesting only tightens."""
+    seconds = READING_DEADLINE if seconds is None else seconds
+    deadline = time.monotonic() + seconds if seconds and seconds > 0 else None
+    outer = _DEADLINE.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+def deadline_remaining() -> Optional[float]:
+    """Seconds left on the current reading deadline, or None without one."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def _deadline_exceeded(what: str) -> DeadlineExceeded:
+    _count("deadline_exceeded")
+    return DeadlineExceeded(f"reading deadline exceeded ({what})")
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one upstream host. `threshold` failures open it;
+    while open, calls are rejected for `cooldown` seconds, then one probe is let through:
+    success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, threshold: Optional[int] = None, cooldown: Optional[float] = None):
+        self.threshold = BREAKER_THRESHOLD if threshold is None else threshold
+        self.cooldown = BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.threshold <= 0 or self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.cooldown:
+                return False
+            if self.probe_at is not None and now - self.probe_at < self.cooldown:
+                return False  # a probe is already out
+            self.probe_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = self.probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.threshold > 0 and (self.probe_at is not None or self.failures >= self.threshold):
+                if self.opened_at is None or self.probe_at is not None:
+                    _count("breaker_trips")
+                self.opened_at = time.monotonic()
+                self.probe_at = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.cooldown else "half_open"
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = 0.0 if self.opened_at is None else max(0.0, self.opened_at + self.cooldown - time.monotonic())
+        return {"state": self.state, "failures": self.failures, "retry_in": round(retry_in, 3)}
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """The breaker for url's host (one per scheme://host:port)."""
+    from urllib.parse import urlsplit
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(host)
+        if breaker is None:
+            breaker = _BREAKERS[host] = CircuitBreaker()
+        return breaker
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _BREAKERS_LOCK:
+        return {host: b.snapshot() for host, b in _BREAKERS.items()}
+
+def reset_circuit_breakers():
+    with _BREAKERS_LOCK:
+        _BREAKERS.clear()
+
+def _admit(url: str, breaker: CircuitBreaker):
+    if not breaker.allow():
+        _count("breaker_rejected")
+        raise CircuitOpenError(f"circuit open for {url} (retry in {breaker.snapshot()['retry_in']:.1f}s)")
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date); None if absent or malformed."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+def _attempt_timeout(timeout) -> tuple:
+    """(connect, read) for the next attempt, clipped to what is left of the reading deadline."""
+    connect, read = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    remaining = deadline_remaining()
+    if remaining is None:
+        return connect, read
+    if remaining <= 0:
+        raise _deadline_exceeded("before attempt")
+    return min(connect, remaining), min(read, remaining)
+
+def _retry_delay(attempt: int, retries: int, backoff: float, retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    Sleep before retry number attempt+1: full jitter, uniform(0, min(cap, backoff * 2**attempt)),
+    or exactly the server's Retry-After. None when out of retries or Retry-After exceeds the cap;
+    raises DeadlineExceeded when the sleep would outlast the reading deadline.
+    """
+    if attempt >= retries:
+        return None
+    if retry_after is not None:
+        if retry_after > RETRY_BACKOFF_CAP:
+            return None
+        delay = retry_after
+    else:
+        delay = random.uniform(0.0, min(RETRY_BACKOFF_CAP, backoff * 2 ** attempt))
+    remaining = deadline_remaining()
+    if remaining is not None and delay >= remaining:
+        raise _deadline_exceeded(f"after {attempt + 1} attempt(s)")
+    _count("http_retries")
+    return delay
+
+def _log_retry(reason: str, delay: float, attempt: int, retries: int):
+    print(f"[retry] {reason}, retrying in {delay:.2f}s ({attempt + 1}/{retries})", file=sys.stderr)
+
+def _post_with_retry(url, payload, headers=None, timeout=None, retries=None, backoff=None, stream=False):
     """
-    Robust HTTP POST with generous timeouts, exponential backoff, and connection pooling.
-    timeout -> (connect_timeout, read_timeout)
+    HTTP POST under the retry policy. Timeouts, connection errors and RETRY_STATUSES are retried
+    with full-jitter backoff (or the server's Retry-After), all within the reading deadline.
+    timeout -> per-attempt (connect_timeout, read_timeout); stream=True leaves the body unread (SSE).
+    Returns the last response (status unchecked); raises the last transport error,
+    DeadlineExceeded, or CircuitOpenError while the host's breaker is open.
     """
+    from requests.exceptions import Timeout, ConnectionError as RequestsConnectionError
     session = get_http_session()
+    breaker = get_circuit_breaker(url)
+    retries = RETRY_MAX_ATTEMPTS - 1 if retries is None else retries
+    backoff = RETRY_BACKOFF_BASE if backoff is None else backoff
     attempt = 0
-    last_err = None
-    while attempt <= retries:
+    while True:
+        attempt_timeout = _attempt_timeout(timeout)
+        _admit(url, breaker)
         try:
-            return session.post(url, json=payload, headers=headers, timeout=timeout)
-        except (ReadTimeout, ConnectTimeout, Timeout) as e:
-            last_err = e
-            if attempt == retries:
-                break
-            sleep_s = backoff ** attempt
-            print(f"[retry] Timeout, retrying in {sleep_s:.1f}s...", file=sys.stderr)
-            time.sleep(sleep_s)
-            attempt += 1
-        except RequestException:
-            raise
-    raise last_err
+            r = session.post(url, json=payload, headers=headers, timeout=attempt_timeout, stream=stream)
+            observe_stage("http_ttfb", r.elapsed.total_seconds())
+        except (Timeout, RequestsConnectionError) as e:
+            breaker.record_failure()
+            delay = _retry_delay(attempt, retries, backoff)
+            if delay is None:
+                raise
+            reason = type(e).__name__
+        else:
+            if r.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return r
+            breaker.record_failure()
+            try:
+                delay = _retry_delay(attempt, retries, backoff, _parse_retry_after(r.headers.get("Retry-After")))
+            except DeadlineExceeded:
+                r.close()  # nobody gets this response: give its connection back to the pool
+                raise
+            if delay is None:
+                return r
+            r.close()
+            reason = f"HTTP {r.status_code}"
+        _log_retry(reason, delay, attempt, retries)
+        time.sleep(delay)
+        attempt += 1
+
+# Async client state is bound to the running event loop (connections + semaphore)
+_ASYNC_STATE: Dict[str, Any] = {"loop": None, "client": None, "sem": None, "flights": {}}
+
+def set_model_concurrency(limit: int):
+    """Set the global cap on in-flight async model calls (applies to the next event loop state)."""
+    global MODEL_MAX_CONCURRENCY
+    MODEL_MAX_CONCURRENCY = max(1, int(limit))
+    _ASYNC_STATE["sem"] = None
+
+def _async_state() -> Dict[str, Any]:
+    import asyncio
+    loop = asyncio.get_running_loop()
+    if _ASYNC_STATE["loop"] is not loop:
+        _ASYNC_STATE.update(loop=loop, client=None, sem=None, flights={})
+    if _ASYNC_STATE["sem"] is None:
+        _ASYNC_STATE["sem"] = asyncio.Semaphore(MODEL_MAX_CONCURRENCY)
+    return _ASYNC_STATE
+
+_BLOCKING_POOL = None
+
+def _blocking_pool():
+    # Own pool rather than the loop's default executor, which callers may saturate themselves
+    global _BLOCKING_POOL
+    if _BLOCKING_POOL is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _BLOCKING_POOL = ThreadPoolExecutor(max_workers=max(8, MODEL_MAX_CONCURRENCY), thread_name_prefix="blocking")
+    return _BLOCKING_POOL
+
+async def run_blocking(fn, *args):
+    """Run fn(*args) on a worker thread, in a copy of this context, so it cannot stall the event loop."""
+    import asyncio
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_blocking_pool(), lambda: ctx.run(fn, *args))
+
+def get_async_http_client():
+    """Get or create the pooled httpx.AsyncClient for the running event loop."""
+    state = _async_state()
+    if state["client"] is None:
+        import httpx
+        state["client"] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MODEL_MAX_CONCURRENCY,
+                                max_keepalive_connections=MODEL_MAX_CONCURRENCY)
+        )
+    return state["client"]
+
+async def cache_io(fn, *args):
+    """Cache lookups/stores for coroutines: inline when memory-only, on a worker thread once SQLite is involved."""
+    if get_cache_backend() is None:
+        return fn(*args)
+    return await run_blocking(fn, *args)
+
+async def close_async_http_client():
+    """Close the async client of the running loop (call before the loop shuts down)."""
+    state = _async_state()
+    if state["client"] is not None:
+        await state["client"].aclose()
+        state["client"] = None
+
+def _httpx_trace():
+    """httpx trace hook for one attempt: feeds http_connect (new connections) and http_ttfb."""
+    marks = {"start": time.perf_counter()}
+
+    async def trace(event: str, info):
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            marks["connect"] = now
+        elif event.endswith(".send_request_headers.started") and "connect" in marks:
+            observe_stage("http_connect", now - marks.pop("connect"))
+        elif event.endswith(".receive_response_headers.complete"):
+            observe_stage("http_ttfb", now - marks["start"])
+    return trace
+
+async def _post_with_retry_async(url, payload, headers=None, timeout=None, retries=None, backoff=None):
+    """Async twin of _post_with_retry: same policy, non-blocking backoff, global concurrency cap."""
+    import asyncio, httpx
+    state = _async_state()
+    client = get_async_http_client()
+    breaker = get_circuit_breaker(url)
+    retries = RETRY_MAX_ATTEMPTS - 1 if retries is None else retries
+    backoff = RETRY_BACKOFF_BASE if backoff is None else backoff
+    attempt = 0
+    while True:
+        connect, read = _attempt_timeout(timeout)
+        _admit(url, breaker)
+        try:
+            async with state["sem"]:
+                r = await client.post(url, json=payload, headers=headers,
+                                      timeout=httpx.Timeout(read, connect=connect),
+                                      extensions={"trace": _httpx_trace()})
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            delay = _retry_delay(attempt, retries, backoff)
+            if delay is None:
+                raise
+            reason = type(e).__name__
+        else:
+            if r.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return r
+            breaker.record_failure()
+            try:
+                delay = _retry_delay(attempt, retries, backoff, _parse_retry_after(r.headers.get("Retry-After")))
+            except DeadlineExceeded:
+                await r.aclose()
+                raise
+            if delay is None:
+                return r
+            await r.aclose()
+            reason = f"HTTP {r.status_code}"
+        _log_retry(reason, delay, attempt, retries)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+# -----------------------------------------------------------------------------
+# Hedged model requests (duplicate a slow call after a latency percentile)
+# -----------------------------------------------------------------------------
+ENABLE_HEDGING = os.environ.get("ENABLE_HEDGING", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "95"))  # of recent latencies for the model
+HEDGE_MAX_RATE = float(os.environ.get("HEDGE_MAX_RATE", "0.1"))  # hedges per model call, at most
+HEDGE_MIN_SAMPLES = 20  # no hedging until this many latencies are known for the model
+HEDGE_WINDOW = 256
+HEDGE_BURST = 5.0  # hedge tokens that can accumulate while nothing is slow
+_PERF_STATS.update(hedges_fired=0, hedges_won=0, hedges_capped=0)
+
+_LATENCIES: Dict[str, Any] = {}  # model -> deque of recent successful call durations (s)
+_HEDGE_BUDGET = {"tokens": 0.0}
+_HEDGE_LOCK = threading.Lock()
+_HEDGE_POOL = None
+
+def record_latency(model: str, seconds: float):
+    from collections import deque
+    with _HEDGE_LOCK:
+        window = _LATENCIES.get(model)
+        if window is None:
+            window = _LATENCIES[model] = deque(maxlen=HEDGE_WINDOW)
+        window.append(seconds)
+
+def hedge_delay(model: str) -> Optional[float]:
+    """Seconds to wait before hedging a call to model, or None (hedging off or too few samples)."""
+    if not ENABLE_HEDGING:
+        return None
+    with _HEDGE_LOCK:
+        window = list(_LATENCIES.get(model) or ())
+    if len(window) < HEDGE_MIN_SAMPLES:
+        return None
+    return _percentile(window, HEDGE_PERCENTILE)
+
+def _earn_hedge_token():
+    with _HEDGE_LOCK:
+        _HEDGE_BUDGET["tokens"] = min(HEDGE_BURST, _HEDGE_BUDGET["tokens"] + HEDGE_MAX_RATE)
+
+def _take_hedge_token() -> bool:
+    """Spend one hedge token; the budget grows by HEDGE_MAX_RATE per call, so hedges stay under that rate."""
+    with _HEDGE_LOCK:
+        if _HEDGE_BUDGET["tokens"] >= 1.0:
+            _HEDGE_BUDGET["tokens"] -= 1.0
+            return True
+    _count("hedges_capped")
+    return False
+
+def hedge_stats() -> Dict[str, Any]:
+    with _HEDGE_LOCK:
+        models = {m: {"samples": len(w), f"p{HEDGE_PERCENTILE:g}_s": round(_percentile(w, HEDGE_PERCENTILE), 4)}
+                  for m, w in _LATENCIES.items() if w}
+        tokens = _HEDGE_BUDGET["tokens"]
+    return {"enabled": ENABLE_HEDGING, "max_rate": HEDGE_MAX_RATE, "tokens": round(tokens, 3), "models": models}
+
+def _record_post(model: str, started: float, r=None, error: Optional[BaseException] = None):
+    """Feed one finished model POST to the hedging window and the router (r=None: it raised `error`)."""
+    elapsed = time.perf_counter() - started
+    if r is None and not _upstream_error(error):
+        return
+    ok = r is not None and r.status_code < 400
+    if ok:
+        record_latency(model, elapsed)
+        observe_stage("model_generation", elapsed)
+    _ROUTER.record_call(model, elapsed, ok)
+
+def _timed_post(url, payload, headers):
+    started = time.perf_counter()
+    try:
+        r = _post_with_retry(url, payload, headers=headers)
+    except Exception as e:
+        _record_post(payload.get("model", ""), started, error=e)
+        raise
+    _record_post(payload.get("model", ""), started, r)
+    return r
+
+async def _timed_post_async(url, payload, headers):
+    started = time.perf_counter()
+    try:
+        r = await _post_with_retry_async(url, payload, headers=headers)
+    except Exception as e:
+        _record_post(payload.get("model", ""), started, error=e)
+        raise
+    _record_post(payload.get("model", ""), started, r)
+    return r
+
+def _hedge_pool():
+    global _HEDGE_POOL
+    if _HEDGE_POOL is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _HEDGE_POOL = ThreadPoolExecutor(max_workers=2 * MODEL_MAX_CONCURRENCY, thread_name_prefix="hedge")
+    return _HEDGE_POOL
+
+def _close_late_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+def _model_post(url, payload, headers):
+    """
+    POST a non-streaming model call. With ENABLE_HEDGING, a call still unanswered after the
+    model's HEDGE_PERCENTILE latency is duplicated (budget permitting) and the first
+    successful response wins; the loser's response is closed when it arrives.
+    The hedge timer starts once the primary has a pool thread, so queueing isn't read as latency.
+    """
+    delay = hedge_delay(payload.get("model", ""))
+    if delay is None:
+        return _timed_post(url, payload, headers)
+    from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+    _earn_hedge_token()
+    pool = _hedge_pool()
+    running = threading.Event()
+
+    def primary_post():
+        running.set()
+        return _timed_post(url, payload, headers)
+
+    # Each branch runs in a copy of this context so it keeps the reading deadline and KB pin
+    primary = pool.submit(contextvars.copy_context().run, primary_post)
+    running.wait()
+    try:
+        return primary.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    if not _take_hedge_token():
+        return primary.result()
+    _count("hedges_fired")
+    hedge = pool.submit(contextvars.copy_context().run, _timed_post, url, payload, headers)
+    pending, error = {primary, hedge}, None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    _count("hedges_won")
+                for loser in pending:
+                    loser.add_done_callback(_close_late_response)
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+async def _model_post_async(url, payload, headers):
+    """
+    Async _model_post: the hedge is a second task on the pooled client; the loser is cancelled.
+    No hedging while every MODEL_MAX_CONCURRENCY slot is taken: the primary would be timed while
+    it queues, and a hedge could only queue behind it.
+    """
+    delay = hedge_delay(payload.get("model", ""))
+    sem = _async_state()["sem"]
+    if delay is None or sem.locked():
+        return await _timed_post_async(url, payload, headers)
+    import asyncio
+    _earn_hedge_token()
+    primary = asyncio.ensure_future(_timed_post_async(url, payload, headers))
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done or sem.locked() or not _take_hedge_token():
+            return await primary
+        _count("hedges_fired")
+        hedge = asyncio.ensure_future(_timed_post_async(url, payload, headers))
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _count("hedges_won")
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+# -----------------------------------------------------------------------------
+# Model router (per-model EWMA of latency, error rate and output tokens)
+# -----------------------------------------------------------------------------
+ROUTER_MODEL = "auto"  # pass as the model to let the router choose
+# Candidate models, cheapest/fastest first and strongest last
+ROUTER_MODELS = [m.strip() for m in os.environ.get("ROUTER_MODELS", "gpt-4o-mini,gpt-4o").split(",") if m.strip()]
+ROUTER_LARGE_SPREAD = int(os.environ.get("ROUTER_LARGE_SPREAD", "5"))  # positions that go to the strongest model
+ROUTER_SLA_S = float(os.environ.get("ROUTER_SLA_S", "30"))  # interactive latency target, 0 = none
+ROUTER_MAX_ERROR_RATE = float(os.environ.get("ROUTER_MAX_ERROR_RATE", "0.5"))
+ROUTER_COOLDOWN = float(os.environ.get("ROUTER_COOLDOWN", "60"))  # unhealthy models get traffic again after this
+ROUTER_ALPHA = 0.2
+ROUTER_MIN_SAMPLES = 3
+READING_PRIORITIES = ("interactive", "batch")
+_PERF_STATS.update(router_routed=0, router_failovers=0)
+
+class ModelRouter:
+    """
+    Online per-model EWMAs of call latency, error rate and output tokens, and the routing
+    policy over them: spread size picks the preferred tier, interactive requests avoid models
+    whose latency EWMA misses ROUTER_SLA_S, and models whose error rate spikes past
+    ROUTER_MAX_ERROR_RATE drop to the back of the failover order until ROUTER_COOLDOWN passes.
+    """
+
+    def __init__(self, models: Optional[List[str]] = None):
+        self.models = list(models) if models else None
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model: str) -> Dict[str, Any]:
+        entry = self.stats.get(model)
+        if entry is None:
+            entry = self.stats[model] = {"calls": 0, "errors": 0, "latency_s": None, "error_rate": 0.0,
+                                         "output_tokens": None, "last_error": None}
+        return entry
+
+    @staticmethod
+    def _ewma(old: Optional[float], value: float) -> float:
+        return value if old is None else old + ROUTER_ALPHA * (value - old)
+
+    def record_call(self, model: str, seconds: Optional[float], ok: bool):
+        with self._lock:
+            entry = self._entry(model)
+            entry["calls"] += 1
+            entry["error_rate"] = self._ewma(entry["error_rate"] if entry["calls"] > 1 else None, 0.0 if ok else 1.0)
+            if ok:
+                entry["latency_s"] = self._ewma(entry["latency_s"], seconds)
+            else:
+                entry["errors"] += 1
+                entry["last_error"] = time.monotonic()
+
+    def record_tokens(self, model: str, tokens: int):
+        with self._lock:
+            entry = self._entry(model)
+            entry["output_tokens"] = self._ewma(entry["output_tokens"], float(tokens))
+
+    def healthy(self, model: str) -> bool:
+        entry = self.stats.get(model)
+        if entry is None or entry["calls"] < ROUTER_MIN_SAMPLES or entry["error_rate"] <= ROUTER_MAX_ERROR_RATE:
+            return True
+        return time.monotonic() - (entry["last_error"] or 0.0) >= ROUTER_COOLDOWN
+
+    def candidates(self, positions: int, priority: str = "interactive") -> List[str]:
+        """Models to try for a reading, in failover order."""
+        models = self.models or ROUTER_MODELS or [DEFAULT_MODEL]
+        preferred = models[-1] if positions >= ROUTER_LARGE_SPREAD else models[0]
+        order = [preferred] + [m for m in models if m != preferred]
+        with self._lock:
+            healthy = [m for m in order if self.healthy(m)]
+            if priority == "interactive" and ROUTER_SLA_S > 0:
+                latency = {m: (self.stats.get(m) or {}).get("latency_s") for m in healthy}
+                within = [m for m in healthy if latency[m] is None or latency[m] <= ROUTER_SLA_S]
+                healthy = within + [m for m in healthy if m not in within]
+            sick = sorted((m for m in order if m not in healthy), key=lambda m: self.stats[m]["error_rate"])
+        return healthy + sick
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {m: {"calls": e["calls"], "errors": e["errors"],
+                          "latency_s": None if e["latency_s"] is None else round(e["latency_s"], 4),
+                          "error_rate": round(e["error_rate"], 4),
+                          "output_tokens": None if e["output_tokens"] is None else round(e["output_tokens"], 1),
+                          "healthy": self.healthy(m)}
+                      for m, e in self.stats.items()}
+        return {"models": models, "policy": {
+            "candidates": self.models or ROUTER_MODELS, "large_spread": ROUTER_LARGE_SPREAD,
+            "sla_s": ROUTER_SLA_S, "max_error_rate": ROUTER_MAX_ERROR_RATE}}
+
+_ROUTER = ModelRouter()
+
+def get_router_stats() -> Dict[str, Any]:
+    return _ROUTER.snapshot()
+
+def route_models(model: str, positions: int, priority: str = "interactive") -> List[str]:
+    """[model] for an explicit model; the router's failover order for ROUTER_MODEL ("auto")."""
+    if model != ROUTER_MODEL:
+        return [model]
+    _count("router_routed")
+    return _ROUTER.candidates(positions, priority)
+
+def _upstream_error(e: Optional[BaseException]) -> bool:
+    """
+    Transport, HTTP status and timeout errors: the ones that say a model endpoint is unhealthy.
+    Unparseable output, local bugs, an open breaker (no call was made) and the reading's own
+    deadline running out (any model would fail under it) are not.
+    """
+    upstream = [TimeoutError, ConnectionError]
+    for name, cls in (("requests", "RequestException"), ("httpx", "HTTPError")):
+        module = sys.modules.get(name)
+        if module is not None:
+            upstream.append(getattr(module, cls))
+    return isinstance(e, tuple(upstream)) and not isinstance(e, (CircuitOpenError, DeadlineExceeded))
+
+def _failover(models: List[str], e: Exception, tried: int) -> bool:
+    """True (after logging) when another routed model is left to try and e is an upstream error."""
+    if tried >= len(models) or not _upstream_error(e):
+        return False
+    _count("router_failovers")
+    print(f"⚠️  {models[tried - 1]} failed ({type(e).__name__}: {e}) — failing over to {models[tried]}", file=sys.stderr)
+    return True
 
 # -----------------------------------------------------------------------------
 # Schema + System Prompt
@@ -247,27 +1273,97 @@ def load_json_if_exists(path: str):
         return None
 
 # -----------------------------------------------------------------------------
-# Tarot KB (with reload support)
+# KB snapshots (compiled lookup tables cached next to the JSON sources)
 # -----------------------------------------------------------------------------
-_CARD_KB_CACHE = None
-_CONSTELLATION_KB_CACHE = None
+KB_SNAPSHOT_VERSION = 1
+ENABLE_KB_SNAPSHOT = os.environ.get("KB_SNAPSHOT", "1") != "0"
+_KB_LOAD_STATS: Dict[str, Dict[str, Any]] = {}
 
-def load_card_kb(path=TAROT_KB_PATH, force_reload=False):
-    """Load tarot card knowledge base with caching and reload support."""
-    global _CARD_KB_CACHE
+def kb_snapshot_path(path) -> pathlib.Path:
+    """Snapshot file for a KB source, e.g. data/.constellation_knowledge.json.v1.pickle."""
+    p = pathlib.Path(path)
+    return p.with_name(f".{p.name}.v{KB_SNAPSHOT_VERSION}.pickle")
 
-    if _CARD_KB_CACHE is not None and not force_reload:
-        return _CARD_KB_CACHE
+def _read_kb_snapshot(snap: pathlib.Path, kind: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(snap, "rb") as f:
+            compiled = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable KB snapshot {snap}: {e}", file=sys.stderr)
+        return None
+    if not isinstance(compiled, dict) or compiled.get("version") != KB_SNAPSHOT_VERSION or compiled.get("kind") != kind:
+        return None
+    return compiled
 
-    if force_reload:
-        _PERF_STATS["kb_reloads"] += 1
+def _write_kb_snapshot(snap: pathlib.Path, compiled: Dict[str, Any]):
+    tmp = snap.with_name(f"{snap.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, snap)
+    except OSError as e:
+        # Read-only checkouts still work, they just compile on every start
+        print(f"⚠️  Could not write KB snapshot {snap}: {e}", file=sys.stderr)
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
 
-    raw = load_json_if_exists(path)
-    if not raw:
-        print(f"⚠️  Tarot KB not found at {path}", file=sys.stderr)
-        _CARD_KB_CACHE = {}
-        return {}
+@timed("kb_load")
+def load_compiled_kb(path, kind: str, compile_fn) -> Optional[Dict[str, Any]]:
+    """
+    Compiled tables for one KB source, or None if it is missing or invalid.
+    The snapshot is reused while the source mtime/size match, or failing that its
+    sha256; otherwise the JSON is parsed, compiled and the snapshot rewritten.
+    """
+    start = time.perf_counter()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    snap = kb_snapshot_path(path)
+    compiled = _read_kb_snapshot(snap, kind) if ENABLE_KB_SNAPSHOT else None
+    origin = "snapshot"
+    if compiled is None or compiled["source"]["mtime_ns"] != st.st_mtime_ns or compiled["source"]["size"] != st.st_size:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"⚠️  Error loading {path}: {e}", file=sys.stderr)
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        if compiled is None or compiled["source"]["sha256"] != digest:
+            try:
+                raw = json.loads(data)
+            except ValueError as e:
+                print(f"⚠️  JSON decode error in {path}: {e}", file=sys.stderr)
+                return None
+            compiled = compile_fn(raw)
+            if compiled is None:
+                return None
+            compiled.update(version=KB_SNAPSHOT_VERSION, kind=kind)
+            origin = "json"
+        compiled["source"] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+        if ENABLE_KB_SNAPSHOT:
+            _write_kb_snapshot(snap, compiled)
+    _KB_LOAD_STATS[kind] = {"origin": origin, "ms": round((time.perf_counter() - start) * 1000, 3)}
+    return compiled
 
+# -----------------------------------------------------------------------------
+# Tarot KB (with reload support)
+# -----------------------------------------------------------------------------
+_CARD_KB_CACHE = None
+_CONSTELLATION_KB_CACHE = None
+_CARD_KB_COMPILED: Optional[Dict[str, Any]] = None
+_CONSTELLATION_KB_COMPILED: Optional[Dict[str, Any]] = None
+_KB_PATHS: Dict[str, str] = {"cards": TAROT_KB_PATH, "constellations": CONSTELLATION_KB_PATH}
+
+def _compile_card_kb(raw) -> Optional[Dict[str, Any]]:
+    """Build the name/alias dict plus the normalised lookup tables for a tarot KB."""
+    if not raw:
+        return None
     # Accept either {"cards":[...]} or a dict keyed by names
     if isinstance(raw, dict) and "cards" in raw:
         cards = raw["cards"]
@@ -304,8 +1400,32 @@ def load_card_kb(path=TAROT_KB_PATH, force_reload=False):
         elif "Swords" in name:
             kb[name.replace("Swords", "Winds")] = c
 
-    _CARD_KB_CACHE = kb
-    print(f"✓ Loaded {len(cards)} tarot cards ({len(kb)} entries with aliases)", file=sys.stderr)
+    compiled = {"kb": kb, "count": len(cards)}
+    compiled.update(_card_tables(kb))
+    return compiled
+
+def load_card_kb(path=TAROT_KB_PATH, force_reload=False):
+    """Load tarot card knowledge base with caching and reload support."""
+    global _CARD_KB_CACHE, _CARD_KB_COMPILED
+
+    if _CARD_KB_CACHE is not None and not force_reload:
+        return _CARD_KB_CACHE
+
+    if force_reload:
+        _count("kb_reloads")
+
+    _KB_PATHS["cards"] = str(path)
+    compiled = load_compiled_kb(path, "cards", _compile_card_kb)
+    if not compiled:
+        print(f"⚠️  Tarot KB not found at {path}", file=sys.stderr)
+        _CARD_KB_CACHE, _CARD_KB_COMPILED = {}, None
+        return {}
+
+    kb = compiled["kb"]
+    _CARD_KB_CACHE, _CARD_KB_COMPILED = kb, compiled
+    stats = _KB_LOAD_STATS["cards"]
+    print(f"✓ Loaded {compiled['count']} tarot cards ({len(kb)} entries with aliases) "
+          f"from {stats['origin']} in {stats['ms']:.1f} ms", file=sys.stderr)
     return kb
 
 def get_card_kb():
@@ -315,59 +1435,38 @@ def get_card_kb():
         load_card_kb()
     return _CARD_KB_CACHE or {}
 
-def kb_lookup(card_name: str) -> dict:
-    kb = get_card_kb()
-    return kb.get(card_name or "") or {}
-
-def kb_element(card_name: str, fallback: str = "") -> str:
-    info = kb_lookup(card_name)
-    return info.get("element") or fallback
-
-def kb_is_major(card_name: str) -> bool:
-    info = kb_lookup(card_name)
-    return (info.get("arcana") == "Major")
-
-def kb_keywords(card_name: str, orientation: str = "upright") -> List[str]:
-    info = kb_lookup(card_name)
-    if not info: return []
-    if orientation and orientation.lower().startswith("rev"):
-        text = info.get("reversed_general") or ""
-    else:
-        text = info.get("upright_general") or ""
-    if text:
-        # Drop "Card: " prefix if present and split by comma
-        text = text.split(":", 1)[-1]
-        words = [w.strip(" .") for w in text.split(",") if w.strip()]
-        if words: return words[:4]
-    # fallback to keywords array
-    return (info.get("keywords") or [])[:4]
-
 # -----------------------------------------------------------------------------
 # Constellation KB (with reload support)
 # -----------------------------------------------------------------------------
+def _compile_constellation_kb(data) -> Optional[Dict[str, Any]]:
+    if not isinstance(data, dict):
+        return None
+    compiled = {"kb": data}
+    compiled.update(_constellation_tables(data))
+    return compiled
+
 def load_constellation_kb(path=CONSTELLATION_KB_PATH, force_reload=False):
     """Load constellation knowledge base with caching and reload support."""
-    global _CONSTELLATION_KB_CACHE
+    global _CONSTELLATION_KB_CACHE, _CONSTELLATION_KB_COMPILED
 
     if _CONSTELLATION_KB_CACHE is not None and not force_reload:
         return _CONSTELLATION_KB_CACHE
 
     if force_reload:
-        _PERF_STATS["kb_reloads"] += 1
-
-    data = load_json_if_exists(path)
-    if not data:
-        print(f"⚠️  Constellation KB not found at {path}", file=sys.stderr)
-        _CONSTELLATION_KB_CACHE = {}
-        return {}
+        _count("kb_reloads")
 
-    if not isinstance(data, dict):
-        print(f"⚠️  Constellation KB is not a dict at {path}", file=sys.stderr)
-        _CONSTELLATION_KB_CACHE = {}
+    _KB_PATHS["constellations"] = str(path)
+    compiled = load_compiled_kb(path, "constellations", _compile_constellation_kb)
+    if not compiled:
+        print(f"⚠️  Constellation KB not found or not a dict at {path}", file=sys.stderr)
+        _CONSTELLATION_KB_CACHE, _CONSTELLATION_KB_COMPILED = {}, None
         return {}
 
-    _CONSTELLATION_KB_CACHE = data
-    print(f"✓ Loaded constellation KB with {len(data)} entries", file=sys.stderr)
+    data = compiled["kb"]
+    _CONSTELLATION_KB_CACHE, _CONSTELLATION_KB_COMPILED = data, compiled
+    stats = _KB_LOAD_STATS["constellations"]
+    print(f"✓ Loaded constellation KB with {len(data)} entries "
+          f"from {stats['origin']} in {stats['ms']:.1f} ms", file=sys.stderr)
     return data
 
 def get_constellation_kb():
@@ -377,34 +1476,175 @@ def get_constellation_kb():
         load_constellation_kb()
     return _CONSTELLATION_KB_CACHE or {}
 
+# -----------------------------------------------------------------------------
+# Knowledge index (normalised O(1) lookups over both KBs)
+# -----------------------------------------------------------------------------
+# Interchangeable suit names: the Celestia deck prints Flames/Tides/Stones/Winds
+_SUIT_ALIASES = (
+    ("Wands", "Flames"),
+    ("Cups", "Tides"),
+    ("Pentacles", "Coins", "Disks", "Stones"),
+    ("Swords", "Winds"),
+)
+# Zodiac sign -> Latin constellation name used as the KB key
+_ZODIAC_LATIN = {"Capricorn": "Capricornus", "Scorpio": "Scorpius"}
+
+@lru_cache(maxsize=4096)
+def _kb_key(name: str) -> str:
+    """Case-folded, whitespace-collapsed lookup key."""
+    return " ".join(name.casefold().split())
+
+def _ascii_fold(key: str) -> str:
+    return unicodedata.normalize("NFKD", key).encode("ascii", "ignore").decode("ascii")
+
+def _index_add(table: Dict[str, Any], name: str, entry: Any):
+    key = _kb_key(name)
+    table.setdefault(key, entry)
+    table.setdefault(_ascii_fold(key), entry)
+
+def _card_keywords(info: Dict[str, Any], reversed_: bool) -> List[str]:
+    words = info.get("keywords_reversed" if reversed_ else "keywords_upright")
+    if words:
+        return list(words[:4])
+    text = info.get("reversed_general" if reversed_ else "upright_general") or ""
+    if text:
+        # Drop "Card: " prefix if present and split by comma
+        text = text.split(":", 1)[-1]
+        words = [w.strip(" .") for w in text.split(",") if w.strip()]
+        if words: return words[:4]
+    # fallback to keywords array
+    return (info.get("keywords") or [])[:4]
+
+def _card_tables(card_kb: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalised name/suit-alias -> card, and card name -> (upright, reversed) keywords."""
+    cards: Dict[str, Any] = {}
+    keywords: Dict[str, tuple] = {}
+    for name, card in card_kb.items():
+        _index_add(cards, name, card)
+        for group in _SUIT_ALIASES:
+            suit = next((s for s in group if s in name), None)
+            if suit:
+                for alias in group:
+                    _index_add(cards, name.replace(suit, alias), card)
+                break
+        canonical = card.get("name") or name
+        if canonical not in keywords:
+            keywords[canonical] = (_card_keywords(card, False), _card_keywords(card, True))
+    return {"cards": cards, "keywords": keywords}
+
+def _constellation_tables(constellation_kb: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalised name/zodiac alias -> entry, and the same keys -> precomputed theme line."""
+    table: Dict[str, Any] = {}
+    entries = constellation_kb.get("constellations", constellation_kb)
+    for name, entry in entries.items():
+        if not isinstance(entry, dict):
+            continue
+        for alias in (name, entry.get("name")):
+            if isinstance(alias, str):
+                _index_add(table, alias, entry)
+    for sign, latin in _ZODIAC_LATIN.items():
+        entry = table.get(_kb_key(latin))
+        if entry is not None:
+            _index_add(table, sign, entry)
+    theme_lines = {}
+    for key, entry in table.items():
+        meanings = entry.get("meanings") or {}
+        theme_lines[key] = " ".join(b for b in (meanings.get("virtue"), meanings.get("omen")) if b).strip()
+    return {"constellations": table, "theme_lines": theme_lines}
+
+class KnowledgeIndex:
+    """
+    Normalised name -> entry maps over the loaded KBs.
+    Cards are reachable under every suit alias; constellations under their KB key,
+    entry name, accent-free spelling and English zodiac name. Tables come prebuilt
+    from the KB snapshots when available.
+    """
+
+    def __init__(self, card_kb: Dict[str, Any], constellation_kb: Dict[str, Any],
+                 card_tables: Optional[Dict[str, Any]] = None,
+                 constellation_tables: Optional[Dict[str, Any]] = None):
+        self.card_source = card_kb
+        self.constellation_source = constellation_kb
+        # Source digests of the compiled KBs ("" when built from in-memory dicts)
+        self.version = ":".join(((t or {}).get("source") or {}).get("sha256", "")[:12]
+                                for t in (card_tables, constellation_tables))
+        card_tables = card_tables or _card_tables(card_kb)
+        constellation_tables = constellation_tables or _constellation_tables(constellation_kb)
+        self.cards: Dict[str, Dict[str, Any]] = card_tables["cards"]
+        self.keywords: Dict[str, tuple] = card_tables["keywords"]
+        self.constellations: Dict[str, Dict[str, Any]] = constellation_tables["constellations"]
+        self.theme_lines: Dict[str, str] = constellation_tables["theme_lines"]
+
+    def card(self, name: str) -> Dict[str, Any]:
+        return self.cards.get(_kb_key(name), {}) if name else {}
+
+    def card_keywords(self, name: str, reversed_: bool = False) -> List[str]:
+        info = self.card(name)
+        pair = self.keywords.get(info.get("name")) if info else None
+        return list(pair[1 if reversed_ else 0]) if pair else []
+
+    def constellation(self, name: str) -> Dict[str, Any]:
+        return self.constellations.get(_kb_key(name), {}) if name else {}
+
+    def theme_line(self, name: str) -> str:
+        return self.theme_lines.get(_kb_key(name), "") if name else ""
+
+_KNOWLEDGE_INDEX: Optional[KnowledgeIndex] = None
+# Guards rebuilds and hot swaps so no reader ever pairs one KB's tables with the other's old ones
+_KB_SWAP_LOCK = threading.RLock()
+# Set for the duration of one reading so a concurrent hot reload cannot change KBs mid-reading
+_PINNED_INDEX: contextvars.ContextVar[Optional[KnowledgeIndex]] = contextvars.ContextVar("kb_index", default=None)
+
+def _index_is_current(index: Optional[KnowledgeIndex]) -> bool:
+    return (index is not None and index.card_source is _CARD_KB_CACHE
+            and index.constellation_source is _CONSTELLATION_KB_CACHE)
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """Index over the currently loaded KBs (or the reading's pinned one); rebuilt after any (re)load."""
+    global _KNOWLEDGE_INDEX
+    pinned = _PINNED_INDEX.get()
+    if pinned is not None:
+        return pinned
+    index = _KNOWLEDGE_INDEX
+    if _index_is_current(index):
+        return index
+    with _KB_SWAP_LOCK:
+        cards, constellations = get_card_kb(), get_constellation_kb()
+        index = _KNOWLEDGE_INDEX
+        if index is None or index.card_source is not cards or index.constellation_source is not constellations:
+            card_tables = _CARD_KB_COMPILED if _CARD_KB_COMPILED and _CARD_KB_COMPILED["kb"] is cards else None
+            constellation_tables = (_CONSTELLATION_KB_COMPILED
+                                    if _CONSTELLATION_KB_COMPILED and _CONSTELLATION_KB_COMPILED["kb"] is constellations
+                                    else None)
+            index = _KNOWLEDGE_INDEX = KnowledgeIndex(cards, constellations, card_tables, constellation_tables)
+        return index
+
+@contextlib.contextmanager
+def pinned_knowledge_index():
+    """Keep the current KB index for everything inside the block (one reading)."""
+    token = _PINNED_INDEX.set(get_knowledge_index())
+    try:
+        yield
+    finally:
+        _PINNED_INDEX.reset(token)
+
+def kb_lookup(card_name: str) -> dict:
+    return get_knowledge_index().card(card_name)
+
+def kb_element(card_name: str, fallback: str = "") -> str:
+    info = kb_lookup(card_name)
+    return info.get("element") or fallback
+
+def kb_is_major(card_name: str) -> bool:
+    info = kb_lookup(card_name)
+    return (info.get("arcana") == "Major")
+
+def kb_keywords(card_name: str, orientation: str = "upright") -> List[str]:
+    reversed_ = bool(orientation and orientation.lower().startswith("rev"))
+    return get_knowledge_index().card_keywords(card_name, reversed_)
+
 def constellation_lookup(name: str) -> dict:
-    if not name: return {}
-    kb = get_constellation_kb()
-    # try exact, then case-insensitive
-    if name in kb:
-        return kb[name]
-    for k in kb.keys():
-        if k.lower() == name.lower():
-            return kb[k]
-    # some zodiac names might be Latinized variants (e.g., Capricornus vs Capricorn)
-    alt = {
-        "Capricorn": "Capricornus",
-        "Scorpio": "Scorpius",
-        "Aquarius": "Aquarius",
-        "Pisces": "Pisces",
-        "Aries": "Aries",
-        "Taurus": "Taurus",
-        "Gemini": "Gemini",
-        "Cancer": "Cancer",
-        "Leo": "Leo",
-        "Virgo": "Virgo",
-        "Libra": "Libra",
-        "Sagittarius": "Sagittarius",
-    }
-    mapped = alt.get(name)
-    if mapped and mapped in kb:
-        return kb[mapped]
-    return {}
+    return get_knowledge_index().constellation(name)
 
 def constellation_insight(name: str) -> dict:
     info = constellation_lookup(name)
@@ -420,13 +1660,99 @@ def constellation_insight(name: str) -> dict:
     }
 
 def constellation_theme_line(sign: str) -> str:
-    c = constellation_insight(sign)
-    bits = []
-    if c["virtue"]:
-        bits.append(c["virtue"])
-    if c["omen"]:
-        bits.append(c["omen"])
-    return " ".join(bits).strip()
+    return get_knowledge_index().theme_line(sign)
+
+# -----------------------------------------------------------------------------
+# KB hot reload (background mtime watcher + atomic swap)
+# -----------------------------------------------------------------------------
+KB_WATCH_INTERVAL = float(os.environ.get("KB_WATCH_INTERVAL", "0"))  # seconds; 0 = off
+
+def _kb_fingerprint(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def swap_kbs() -> bool:
+    """
+    Recompile both KBs from disk, build their index off the request path, then publish
+    caches and index together under _KB_SWAP_LOCK. Readings already pinned keep theirs.
+    """
+    global _CARD_KB_CACHE, _CONSTELLATION_KB_CACHE, _CARD_KB_COMPILED, _CONSTELLATION_KB_COMPILED, _KNOWLEDGE_INDEX
+    cards = load_compiled_kb(_KB_PATHS["cards"], "cards", _compile_card_kb)
+    constellations = load_compiled_kb(_KB_PATHS["constellations"], "constellations", _compile_constellation_kb)
+    if not cards or not constellations:
+        print("⚠️  KB reload skipped: a source is missing or invalid; keeping the current KBs", file=sys.stderr)
+        return False
+    index = KnowledgeIndex(cards["kb"], constellations["kb"], cards, constellations)
+    with _KB_SWAP_LOCK:
+        _CARD_KB_COMPILED, _CONSTELLATION_KB_COMPILED = cards, constellations
+        _CARD_KB_CACHE, _CONSTELLATION_KB_CACHE = cards["kb"], constellations["kb"]
+        _KNOWLEDGE_INDEX = index
+        _count("kb_reloads")
+    print(f"✓ Knowledge bases hot-reloaded ({len(index.cards)} card keys, "
+          f"{len(index.constellations)} constellation keys)", file=sys.stderr)
+    return True
+
+class KBWatcher:
+    """Daemon thread polling the KB source files; swaps in fresh KBs when one changes."""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = max(0.05, float(interval))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seen: Dict[str, Optional[tuple]] = {}
+
+    def _snapshot(self) -> Dict[str, Optional[tuple]]:
+        return {kind: _kb_fingerprint(path) for kind, path in _KB_PATHS.items()}
+
+    def check(self) -> bool:
+        """One poll: reload if any source changed since the last poll. Returns True on swap."""
+        seen = self._snapshot()
+        changed = seen != self._seen
+        if changed and all(seen.values()):
+            try:
+                swapped = swap_kbs()
+            except Exception as e:
+                print(f"⚠️  KB reload failed: {e}", file=sys.stderr)
+                return False
+            if swapped:
+                self._seen = seen  # a failed reload is retried on the next poll
+            return swapped
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "KBWatcher":
+        warm_kbs()
+        self._seen = self._snapshot()
+        self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+        self._thread.start()
+        print(f"✓ Watching knowledge bases every {self.interval:g}s", file=sys.stderr)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+_KB_WATCHER: Optional[KBWatcher] = None
+
+def start_kb_watcher(interval: float = KB_WATCH_INTERVAL or 2.0) -> KBWatcher:
+    """Start (once) the background KB watcher for this process."""
+    global _KB_WATCHER
+    if _KB_WATCHER is None:
+        _KB_WATCHER = KBWatcher(interval).start()
+    return _KB_WATCHER
+
+def stop_kb_watcher():
+    global _KB_WATCHER
+    if _KB_WATCHER is not None:
+        _KB_WATCHER.stop()
+        _KB_WATCHER = None
 
 # -----------------------------------------------------------------------------
 # Model call / JSON parsing + repair
@@ -436,17 +1762,46 @@ def _get_cache_key(system: str, user: str, model: str, temp: float, num: int) ->
     content = f"{system}||{user}||{model}||{temp}||{num}"
     return hashlib.sha256(content.encode()).hexdigest()
 
-def call_chatgpt(system: str, user: str, model: str, temp: float, num: int) -> str:
-    """Call ChatGPT via OpenAI API with optional response caching and performance tracking."""
-    # Check cache first
-    if ENABLE_RESPONSE_CACHE:
-        cache_key = _get_cache_key(system, user, model, temp, num)
-        if cache_key in _RESPONSE_CACHE:
-            _PERF_STATS["cache_hits"] += 1
-            print(f"[cache] Hit for model={model} (total hits: {_PERF_STATS['cache_hits']})", file=sys.stderr)
-            return _RESPONSE_CACHE[cache_key]
-        _PERF_STATS["cache_misses"] += 1
+def _cached_response(system: str, user: str, model: str, temp: float, num: int) -> Optional[str]:
+    """Return a cached response (counting the hit/miss), or None. Memory first, then the persistent tier."""
+    if not ENABLE_RESPONSE_CACHE:
+        return None
+    cache_key = _get_cache_key(system, user, model, temp, num)
+    response = _RESPONSE_CACHE.get(cache_key)
+    if response is not None:
+        _count("cache_hits")
+        print(f"[cache] Hit for model={model} (total hits: {_PERF_STATS['cache_hits']})", file=sys.stderr)
+        return response
+    backend = get_cache_backend()
+    if backend is not None:
+        try:
+            response = backend.get(cache_key)
+        except Exception as e:
+            print(f"⚠️  Persistent cache read failed: {e}", file=sys.stderr)
+            response = None
+        if response is not None:
+            _count("cache_hits")
+            _count("persistent_cache_hits")
+            print(f"[cache] Persistent hit for model={model}", file=sys.stderr)
+            _RESPONSE_CACHE[cache_key] = response
+            return response
+    _count("cache_misses")
+    return None
+
+def _store_response(system: str, user: str, model: str, temp: float, num: int, response: str):
+    if not ENABLE_RESPONSE_CACHE:
+        return
+    cache_key = _get_cache_key(system, user, model, temp, num)
+    _RESPONSE_CACHE[cache_key] = response
+    backend = get_cache_backend()
+    if backend is not None:
+        try:
+            backend.set(cache_key, response)
+        except Exception as e:
+            print(f"⚠️  Persistent cache write failed: {e}", file=sys.stderr)
 
+def _chat_request(system: str, user: str, model: str, temp: float, num: int):
+    """Build (headers, payload) for one chat completion."""
     if not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY environment variable not set")
 
@@ -464,8 +1819,10 @@ def call_chatgpt(system: str, user: str, model: str, temp: float, num: int) -> s
             {"role": "user", "content": user}
         ]
     }
+    return headers, payload
 
-    r = _post_with_retry(OPENAI_API_URL, payload, headers=headers, timeout=(60, 3600))
+def _chat_content(r) -> str:
+    """Raise on HTTP errors, then pull the message content out of a requests/httpx response."""
     try:
         r.raise_for_status()
     except Exception as e:
@@ -475,16 +1832,35 @@ def call_chatgpt(system: str, user: str, model: str, temp: float, num: int) -> s
 
     try:
         obj = r.json()
-        response = obj.get("choices", [{}])[0].get("message", {}).get("content", "")
+        return obj.get("choices", [{}])[0].get("message", {}).get("content", "")
     except Exception as e:
         print(f"[error] Failed to parse response: {e}", file=sys.stderr)
-        response = r.text
+        return r.text
+
+def call_chatgpt(system: str, user: str, model: str, temp: float, num: int) -> str:
+    """Call ChatGPT via OpenAI API with optional response caching and performance tracking."""
+    cached = _cached_response(system, user, model, temp, num)
+    if cached is not None:
+        return cached
+
+    headers, payload = _chat_request(system, user, model, temp, num)
+    r = _model_post(OPENAI_API_URL, payload, headers)
+    response = _chat_content(r)
+
+    _store_response(system, user, model, temp, num, response)
+    return response
 
-    # Cache the response
-    if ENABLE_RESPONSE_CACHE:
-        cache_key = _get_cache_key(system, user, model, temp, num)
-        _RESPONSE_CACHE[cache_key] = response
+async def call_chatgpt_async(system: str, user: str, model: str, temp: float, num: int) -> str:
+    """Async call_chatgpt: same cache and stats, pooled httpx client, non-blocking retries."""
+    cached = await cache_io(_cached_response, system, user, model, temp, num)
+    if cached is not None:
+        return cached
 
+    headers, payload = _chat_request(system, user, model, temp, num)
+    r = await _model_post_async(OPENAI_API_URL, payload, headers)
+    response = _chat_content(r)
+
+    await cache_io(_store_response, system, user, model, temp, num, response)
     return response
 
 # Alias for backward compatibility
@@ -492,6 +1868,244 @@ def call_ollama(system: str, user: str, model: str, temp: float, num: int) -> st
     """Backward compatibility wrapper - calls ChatGPT instead."""
     return call_chatgpt(system, user, model, temp, num)
 
+# -----------------------------------------------------------------------------
+# Streaming (SSE) + incremental JSON parsing
+# -----------------------------------------------------------------------------
+class IncrementalJSONParser:
+    """
+    Incremental scanner for one streamed JSON object.
+    feed() returns (path, value) events as soon as each top-level block closes
+    ("meta", "astro_summary", ...) and for every entry of the `item_paths` arrays
+    ("interpretation.positions[0]", ...). `done` flips when the root object closes;
+    whatever the model sends after that is ignored.
+    """
+
+    def __init__(self, item_paths=("interpretation.positions",)):
+        self.item_paths = set(item_paths)
+        self.blocks: Dict[str, Any] = {}
+        self.items: Dict[str, List[Any]] = {p: [] for p in self.item_paths}
+        self.done = False
+        self._buf = ""
+        self._pos = 0
+        self._root = -1
+        self._end = -1
+        self._stack: List[Dict[str, Any]] = []
+        self._in_str = False
+        self._esc = False
+        self._str_start = -1
+        self._prim_start = -1
+
+    @property
+    def text(self) -> str:
+        """The root object text seen so far (exactly the object once done)."""
+        if self._root < 0:
+            return ""
+        return self._buf[self._root:self._end] if self.done else self._buf[self._root:]
+
+    def _emit(self, events, path: str, text: str, item_of: Optional[str] = None):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        if item_of is None:
+            self.blocks[path] = value
+        else:
+            self.items[item_of].append(value)
+        events.append((path, value))
+
+    def _flush_primitive(self, events, end: int):
+        top = self._stack[0]
+        self._emit(events, top["key"], self._buf[self._prim_start:end].strip())
+        self._prim_start = -1
+
+    def feed(self, chunk: str) -> List[tuple]:
+        events: List[tuple] = []
+        if self.done or not chunk:
+            return events
+        self._buf += chunk
+        buf, stack = self._buf, self._stack
+        i, n = self._pos, len(buf)
+        while i < n:
+            c = buf[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+                    top = stack[-1]
+                    if top["kind"] == "{" and top["expect_key"]:
+                        try:
+                            top["key"] = json.loads(buf[self._str_start:i + 1])
+                        except ValueError:
+                            top["key"] = buf[self._str_start + 1:i]
+            elif self._root < 0:
+                if c == "{":
+                    self._root = i
+                    stack.append({"kind": "{", "path": "", "start": i, "key": None, "expect_key": True, "index": 0})
+            elif c == '"':
+                self._in_str = True
+                self._str_start = i
+                top = stack[-1]
+                if len(stack) == 1 and not top["expect_key"] and self._prim_start < 0:
+                    self._prim_start = i
+            elif c == "{" or c == "[":
+                parent = stack[-1]
+                if parent["kind"] == "{":
+                    path = f'{parent["path"]}.{parent["key"]}' if parent["path"] else str(parent["key"])
+                else:
+                    path = f'{parent["path"]}[{parent["index"]}]'
+                stack.append({"kind": c, "path": path, "start": i, "key": None, "expect_key": c == "{", "index": 0})
+            elif c == "}" or c == "]":
+                if len(stack) == 1 and self._prim_start >= 0:
+                    self._flush_primitive(events, i)
+                node = stack.pop()
+                if not stack:
+                    self.done = True
+                    self._end = i + 1
+                    break
+                parent = stack[-1]
+                if len(stack) == 1:
+                    self._emit(events, node["path"], buf[node["start"]:i + 1])
+                elif parent["kind"] == "[" and parent["path"] in self.item_paths:
+                    self._emit(events, node["path"], buf[node["start"]:i + 1], item_of=parent["path"])
+            elif c == ":":
+                stack[-1]["expect_key"] = False
+            elif c == ",":
+                top = stack[-1]
+                if top["kind"] == "{":
+                    if len(stack) == 1 and self._prim_start >= 0:
+                        self._flush_primitive(events, i)
+                    top["expect_key"] = True
+                else:
+                    top["index"] += 1
+            elif not c.isspace():
+                if len(stack) == 1 and not stack[0]["expect_key"] and self._prim_start < 0:
+                    self._prim_start = i
+            i += 1
+        self._pos = i + 1 if self.done else i
+        return events
+
+    def result(self) -> Dict[str, Any]:
+        """Parse the complete root object (only valid once done)."""
+        return json.loads(self.text)
+
+    def partial(self) -> Dict[str, Any]:
+        """Completed blocks only; streamed items fill in blocks that never closed."""
+        out = dict(self.blocks)
+        for path, items in self.items.items():
+            head, _, tail = path.partition(".")
+            if tail and head not in out and items:
+                out[head] = {tail: list(items)}
+        return out
+
+def _iter_sse_content(lines):
+    """Yield (content_delta, finish_reason) from OpenAI chat-completion SSE lines."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            choice = (json.loads(data).get("choices") or [{}])[0]
+        except ValueError:
+            continue
+        yield (choice.get("delta") or {}).get("content") or "", choice.get("finish_reason")
+
+def call_chatgpt_stream(system: str, user: str, model: str, temp: float, num: int,
+                        on_event=None, parser: Optional[IncrementalJSONParser] = None) -> str:
+    """
+    Streaming call_chatgpt: feeds SSE deltas into an IncrementalJSONParser and calls
+    on_event(path, value) per completed block. Stops reading as soon as the root object
+    closes. Only complete objects are cached; cache hits are replayed through the parser.
+    """
+    parser = parser or IncrementalJSONParser()
+
+    def feed(text: str):
+        for path, value in parser.feed(text):
+            if on_event:
+                on_event(path, value)
+
+    cached = _cached_response(system, user, model, temp, num)
+    if cached is not None:
+        feed(cached)
+        return cached
+
+    headers, payload = _chat_request(system, user, model, temp, num)
+    payload["stream"] = True
+    started = time.perf_counter()
+    try:
+        r = _post_with_retry(OPENAI_API_URL, payload, headers=headers, stream=True)
+    except Exception as e:
+        if _upstream_error(e):
+            _ROUTER.record_call(model, None, False)
+        raise
+    chunks: List[str] = []
+    finish_reason = None
+    breaker = get_circuit_breaker(OPENAI_API_URL)
+    try:
+        if r.status_code >= 400:
+            _ROUTER.record_call(model, None, False)
+            _chat_content(r)
+        try:
+            for delta, finish_reason in _iter_sse_content(r.iter_lines()):
+                chunks.append(delta)
+                feed(delta)
+                if parser.done:
+                    break
+        except Exception as e:
+            # Headers already counted as a success; the body dying mid-stream is the failure
+            if _upstream_error(e):
+                breaker.record_failure()
+                _ROUTER.record_call(model, None, False)
+            raise
+    finally:
+        r.close()
+    elapsed = time.perf_counter() - started
+    observe_stage("model_generation", elapsed)
+    # A stream cut off upstream (no finish_reason) is salvaged by the caller, but it is a
+    # transport failure; one that ran out of max_tokens is the model answering, however badly
+    cut_off = not parser.done and finish_reason is None
+    if cut_off:
+        breaker.record_failure()
+    _ROUTER.record_call(model, elapsed, not cut_off)
+
+    if parser.done:
+        response = parser.text
+        _store_response(system, user, model, temp, num, response)
+        return response
+    if finish_reason == "length":
+        print("[stream] Generation hit max_tokens before the JSON object closed", file=sys.stderr)
+    return "".join(chunks)
+
+# One token = a run of ordinary characters or a single structural/quote/control character,
+# so every repair below is a single left-to-right pass with no backtracking.
+_JSON_TOKEN_RE = re.compile(r'[^"\'\\{}\[\],:\u201c\u201d\u2018\u2019\x00-\x1f]+|.', re.S)
+_JSON_BRACE_RE = re.compile(r'[{}"\\]')
+_JSON_ESCAPES = frozenset('"\\/bfnrt')
+_JSON_HEX = frozenset("0123456789abcdefABCDEF")
+_JSON_CLOSERS = {"{": "}", "[": "]"}
+_JSON_OPENERS = {"}": "{", "]": "["}
+# opening quote -> characters that may close it (straight quotes close unconditionally)
+_JSON_QUOTES = {
+    '"': '"',
+    "\u201c": "\u201d\u201c\"", "\u201d": "\u201d\u201c\"",
+    "'": "'\u2019", "\u2018": "'\u2019", "\u2019": "'\u2019",
+}
+_JSON_CTRL = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+def _closes_string(text: str, i: int) -> bool:
+    """A non-straight quote ends a string only before , : } ] or end of input ("don't")."""
+    n = len(text)
+    while i < n and text[i] in " \t\r\n":
+        i += 1
+    return i >= n or text[i] in ",:}]"
+
 def _extract_balanced_json(text: str) -> Optional[str]:
     t = text.strip()
     if t.startswith("```"):
@@ -503,50 +2117,146 @@ def _extract_balanced_json(text: str) -> Optional[str]:
         return None
     depth = 0
     in_str = False
-    esc = False
-    for i, ch in enumerate(t[start:], start=start):
+    skip = -1
+    for m in _JSON_BRACE_RE.finditer(t, start):
+        i = m.start()
+        if i == skip:
+            continue
+        ch = t[i]
         if in_str:
-            if esc: esc = False
-            elif ch == "\\": esc = True
+            if ch == "\\": skip = i + 1
             elif ch == '"': in_str = False
-        else:
-            if ch == '"': in_str = True
-            elif ch == "{": depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    return t[start:i+1]
+        elif ch == '"': in_str = True
+        elif ch == "{": depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return t[start:i+1]
     return None
 
 def _basic_json_repairs(s: str) -> str:
-    s = s.replace("“", '"').replace("”", '"').replace("’", "'")
-    s = re.sub(r'(?P<pre>[\{\s,])\'(?P<key>[^\'\n\r]+)\'(?P<post>\s*:)', r'\g<pre>"\g<key>"\g<post>', s)
-    s = re.sub(r':\s*\'([^\']*)\'(\s*[,\}])', r': "\1"\2', s)
-    s = re.sub(r',\s*([}\]])', r'\1', s)
-    s = re.sub(r'(".*?)(?<!\\)\\(?![\\/"bfnrtu])', r'\1\\\\', s)
-
-    # Handle truncated JSON by closing open structures
-    # Count open/close braces and brackets
-    open_braces = s.count('{') - s.count('}')
-    open_brackets = s.count('[') - s.count(']')
-
-    # Close any unclosed strings (truncated at end)
-    # First, find the last quote and check if it's closed
-    last_quote = s.rfind('"')
-    if last_quote != -1:
-        # Count quotes before the last one
-        quotes_before = s[:last_quote].count('"')
-        if quotes_before % 2 == 0:  # Odd number of quotes total = unclosed string
-            s = s.rstrip() + '"'
-
-    # Close unclosed arrays and objects
-    s = s.rstrip(',') + ']' * open_brackets + '}' * open_braces
-
-    return s
+    """
+    Single-pass, string-aware repair of model JSON, linear in len(s).
+    Fixes smart and single quotes, trailing/doubled/missing commas, invalid escapes,
+    raw control characters in strings, mismatched closers and truncation (open strings,
+    dangling keys/values and unclosed containers are closed in nesting order).
+    Text before the first "{" and after the root object closes is dropped.
+    """
+    start = s.find("{")
+    if start == -1:
+        return s.strip()
+    out: List[str] = []
+    stack: List[list] = []          # [opener, expecting_key]
+    depth = {"{": 0, "[": 0}
+    closers = None                  # closing quotes of the current string, None outside strings
+    last = ""                       # last significant token: { [ , : k(ey) s(tring) v(alue) } ]
+    comma = -1                      # out index of a comma that may turn out to be trailing
+    value = -1                      # out index of the last bare value (number/literal)
+    n, i = len(s), start
+    match = _JSON_TOKEN_RE.match
+    while i < n:
+        tok = match(s, i).group()
+        i += len(tok)
+        if closers is not None:
+            if tok == "\\":
+                nxt = s[i] if i < n else ""
+                if nxt in _JSON_ESCAPES and nxt:
+                    out.append("\\" + nxt); i += 1
+                elif nxt == "u" and len(s) >= i + 5 and all(c in _JSON_HEX for c in s[i+1:i+5]):
+                    out.append(s[i-1:i+5]); i += 5
+                elif nxt == "'":
+                    out.append("'"); i += 1
+                elif nxt:
+                    out.append("\\\\")
+            elif tok in closers and (closers == '"' or _closes_string(s, i)):
+                out.append('"')
+                closers = None
+                top = stack[-1]
+                last = "k" if top[0] == "{" and top[1] else "s"
+            elif tok == '"':
+                out.append('\\"')
+            elif tok < " ":
+                out.append(_JSON_CTRL.get(tok) or "\\u%04x" % ord(tok))
+            else:
+                out.append(tok)
+            continue
+
+        if tok in _JSON_QUOTES:
+            if last in ("s", "v", "}", "]"):
+                out.append(",")
+                if stack[-1][0] == "{":
+                    stack[-1][1] = True
+            out.append('"')
+            closers = _JSON_QUOTES[tok]
+            comma = -1
+        elif tok == "{" or tok == "[":
+            if last in ("s", "v", "}", "]"):
+                out.append(",")
+            out.append(tok)
+            stack.append([tok, tok == "{"])
+            depth[tok] += 1
+            last, comma = tok, -1
+        elif tok == "}" or tok == "]":
+            opener = _JSON_OPENERS[tok]
+            if not depth[opener]:
+                continue                 # stray closer
+            if comma >= 0:
+                out[comma] = ""
+            if last == ":" or last == "k":
+                out.append(":null" if last == "k" else "null")
+            while True:
+                top = stack.pop()[0]
+                depth[top] -= 1
+                out.append(_JSON_CLOSERS[top])
+                if top == opener:
+                    break
+            last, comma = tok, -1
+            if not stack:
+                break
+        elif tok == ",":
+            if last in ("{", "[", ",", ":", "k"):
+                continue                 # leading or doubled comma
+            out.append(",")
+            if stack[-1][0] == "{":
+                stack[-1][1] = True
+            last, comma = ",", len(out) - 1
+        elif tok == ":":
+            if stack[-1][0] == "{":
+                stack[-1][1] = False
+            out.append(":")
+            last = ":"
+        elif tok < " " and not tok.isspace():
+            continue
+        else:
+            out.append(tok)
+            if not tok.isspace():
+                last, comma, value = "v", -1, len(out) - 1
+
+    if stack:
+        # Truncated: finish the open string, drop dangling commas/partial literals, close in order
+        if closers is not None:
+            out.append('"')
+            last = "k" if stack[-1][0] == "{" and stack[-1][1] else "s"
+        if comma >= 0:
+            out[comma] = ""
+        if last == "v":
+            try:
+                json.loads(out[value])
+            except ValueError:
+                out[value] = "null"
+        if last in (":", "k"):
+            out.append(":null" if last == "k" else "null")
+        while stack:
+            out.append(_JSON_CLOSERS[stack.pop()[0]])
+    return "".join(out)
 
 def parse_model_json(raw: str) -> Dict[str, Any]:
     """Parse JSON from model output with aggressive local repair."""
     cand = _extract_balanced_json(raw) or raw.strip()
+    try:
+        return json.loads(cand)
+    except json.JSONDecodeError:
+        pass
     repaired = _basic_json_repairs(cand)
     try:
         return json.loads(repaired)
@@ -554,17 +2264,22 @@ def parse_model_json(raw: str) -> Dict[str, Any]:
         snippet = repaired[max(0, e.pos-160):e.pos+160]
         raise ValueError(f"JSON parse failed at {e.pos}: {e.msg}\n--- snippet ---\n{snippet}")
 
+REPAIR_SYSTEM_PROMPT = (
+    "You are a JSON repair tool. Input may be malformed JSON. "
+    "Return only a single valid JSON object that matches schema; no markdown or comments."
+)
+
+def _repair_user_prompt(raw_text: str) -> str:
+    return f"Repair this into strict JSON (single object). Preserve fields.\n\nRAW:\n{raw_text}"
+
 def repair_to_json(raw_text: str, model: str, temperature: float = 0.1, max_retries: int = 2) -> str:
-    """Repair malformed JSON by calling ChatGPT with retry logic."""
-    fixer_system = (
-        "You are a JSON repair tool. Input may be malformed JSON. "
-        "Return only a single valid JSON object that matches schema; no markdown or comments."
-    )
-    fixer_user = f"Repair this into strict JSON (single object). Preserve fields.\n\nRAW:\n{raw_text}"
+    """Repair malformed JSON by calling ChatGPT with retry logic (model "auto": the router's fast tier)."""
+    fixer_user = _repair_user_prompt(raw_text)
+    model = route_models(model, 0)[0]
 
     for attempt in range(max_retries + 1):
         try:
-            response = call_chatgpt(fixer_system, fixer_user, model, temperature, 1500)
+            response = call_chatgpt(REPAIR_SYSTEM_PROMPT, fixer_user, model, temperature, 1500)
             if response:
                 print(f"[repair] Success on attempt {attempt + 1}", file=sys.stderr)
                 return response
@@ -576,6 +2291,26 @@ def repair_to_json(raw_text: str, model: str, temperature: float = 0.1, max_retr
 
     return ""
 
+async def repair_to_json_async(raw_text: str, model: str, temperature: float = 0.1, max_retries: int = 2) -> str:
+    """Async repair_to_json."""
+    import asyncio
+    fixer_user = _repair_user_prompt(raw_text)
+    model = route_models(model, 0)[0]
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = await call_chatgpt_async(REPAIR_SYSTEM_PROMPT, fixer_user, model, temperature, 1500)
+            if response:
+                print(f"[repair] Success on attempt {attempt + 1}", file=sys.stderr)
+                return response
+        except Exception as e:
+            print(f"[repair] Error on attempt {attempt + 1}: {e}", file=sys.stderr)
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(1.0)
+
+    return ""
+
 # -----------------------------------------------------------------------------
 # Element guess fallback (used if KB missing)
 # -----------------------------------------------------------------------------
@@ -594,6 +2329,7 @@ def _guess_element(card: str) -> str:
 # -----------------------------------------------------------------------------
 # Normalizer / Schema coercion
 # -----------------------------------------------------------------------------
+@timed("coerce")
 def _coerce_to_schema(d: Dict[str, Any], spread: List[Dict[str, Any]]) -> Dict[str, Any]:
     out = {
         "meta": d.get("meta", {}),
@@ -857,36 +2593,439 @@ def _coerce_to_schema(d: Dict[str, Any], spread: List[Dict[str, Any]]) -> Dict[s
 
     return out
 
+# -----------------------------------------------------------------------------
+# Request-level reading cache (canonicalised inputs -> coerced reading)
+# -----------------------------------------------------------------------------
+# Bump when _reading_prompt / SYSTEM_PROMPT change in a way that should invalidate cached readings
+PROMPT_TEMPLATE_VERSION = "1"
+ENABLE_READING_CACHE = os.environ.get("ENABLE_READING_CACHE", "true").lower() == "true"
+READING_CACHE_MAX_ENTRIES = int(os.environ.get("READING_CACHE_MAX_ENTRIES", "256"))
+READING_CACHE_MAX_BYTES = int(os.environ.get("READING_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+_PERF_STATS.update(reading_cache_hits=0, reading_cache_misses=0)
+# Own LRU (and stats) so readings don't evict, or blur the hit ratio of, raw model responses
+_READING_CACHE = LRUResponseCache(READING_CACHE_MAX_ENTRIES, READING_CACHE_MAX_BYTES,
+                                  RESPONSE_CACHE_MEMORY_TTL, RESPONSE_CACHE_COMPRESS)
+
+def _canonical_text(value) -> str:
+    return " ".join(unicodedata.normalize("NFKC", str(value or "")).casefold().split())
+
+def _canonical_value(value):
+    """Recursively strip/collapse strings so formatting-only differences compare equal."""
+    if isinstance(value, dict):
+        return {str(k).strip(): _canonical_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical_value(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+def _spread_name(spread: List[Dict[str, Any]]) -> str:
+    """meta.spread_name for a spread: the first card's "spread" field, else "Custom"."""
+    return (spread[0].get("spread", "") if (spread and isinstance(spread[0], dict)) else "") or "Custom"
+
+def _canonical_spread(spread: List[Dict[str, Any]]) -> List[List[str]]:
+    """(position, KB card name, orientation) per card; a supplied element only matters for unknown cards."""
+    out = []
+    for item in spread or []:
+        if not isinstance(item, dict):
+            continue
+        card = " ".join(str(item.get("card") or "").split())
+        info = kb_lookup(card)
+        orientation = "reversed" if str(item.get("orientation") or "").strip().lower().startswith("rev") else "upright"
+        entry = [_canonical_text(item.get("position")), info.get("name") or card, orientation]
+        if not info and item.get("element"):
+            entry.append(str(item["element"]).strip())
+        out.append(entry)
+    return out
+
+def reading_cache_key(question: str, timeframe: str, astro: Dict[str, Any], spread: List[Dict[str, Any]],
+                      model: str, temp: float, num: int) -> str:
+    """Cache key from canonicalised request inputs, the prompt template version and the KB version."""
+    canonical = {
+        "v": PROMPT_TEMPLATE_VERSION,
+        "compact": PROMPT_BUDGET,
+        "kb": get_knowledge_index().version,
+        "question": _canonical_text(question),
+        "timeframe": _canonical_text(timeframe),
+        "astro": _canonical_value(astro if isinstance(astro, dict) else {}),
+        "spread": _canonical_spread(spread),
+        "spread_name": _spread_name(spread),
+        "model": str(model).strip(),
+        "temp": round(float(temp), 3),
+        "num": int(num),
+    }
+    blob = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return "reading:" + hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def _cached_reading(key: str, question: str, timeframe: str,
+                    spread: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+    """A fresh copy of the cached reading for key (meta set for this request), or None."""
+    if not ENABLE_READING_CACHE:
+        return None
+    blob = _READING_CACHE.get(key)
+    backend = get_cache_backend()
+    if blob is None and backend is not None:
+        try:
+            blob = backend.get(key)
+        except Exception as e:
+            print(f"⚠️  Persistent cache read failed: {e}", file=sys.stderr)
+        if blob is not None:
+            _READING_CACHE[key] = blob
+    if blob is None:
+        _count("reading_cache_misses")
+        return None
+    _count("reading_cache_hits")
+    return _reading_from_blob(blob, question, timeframe, spread)
+
+def _spread_slot(position, card) -> tuple:
+    """(position, card) as _canonical_spread folds them: case-insensitive, cards by KB name."""
+    card = " ".join(str(card or "").split())
+    return _canonical_text(position), _canonical_text(kb_lookup(card).get("name") or card)
+
+def _restamp_spread(reading: Dict[str, Any], spread: List[Dict[str, Any]]) -> None:
+    """Respell layout and interpretation positions with this request's own position and card names."""
+    surface = {}
+    for item in spread:
+        if isinstance(item, dict) and item.get("position") and item.get("card"):
+            pos, card = str(item["position"]).strip(), str(item["card"]).strip()
+            surface.setdefault(_spread_slot(pos, card), (pos, card))
+    if not surface:
+        return
+    summary = reading.get("spread_summary")
+    layout = summary.get("layout") if isinstance(summary, dict) else None
+    for i, entry in enumerate(layout if isinstance(layout, list) else ()):
+        pos, sep, card = entry.rpartition(": ") if isinstance(entry, str) else ("", "", "")
+        slot = surface.get(_spread_slot(pos, card)) if sep else None
+        if slot:
+            layout[i] = f"{slot[0]}: {slot[1]}"
+    interp = reading.get("interpretation")
+    positions = interp.get("positions") if isinstance(interp, dict) else None
+    for p in positions if isinstance(positions, list) else ():
+        slot = surface.get(_spread_slot(p.get("position"), p.get("card"))) if isinstance(p, dict) else None
+        if slot:
+            p["position"], p["card"] = slot
+
+def _reading_from_blob(blob: str, question: str, timeframe: str,
+                       spread: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Private copy of a serialised reading, timestamped now. The key only matches question,
+    timeframe and spread up to formatting (and card aliases), so meta, layout and positions
+    carry this request's own spelling of them.
+    """
+    reading = json.loads(blob)
+    meta = reading.setdefault("meta", {})
+    meta.update(question=question, timeframe=timeframe,
+                timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z"))
+    if spread:
+        _restamp_spread(reading, spread)
+    return reading
+
+def _store_reading(key: str, reading: Dict[str, Any], cache: bool = True) -> str:
+    """Serialise the reading and (if caching) store it under key; returns the blob."""
+    blob = json.dumps(reading, ensure_ascii=False, separators=(",", ":"))
+    if not (cache and ENABLE_READING_CACHE):
+        return blob
+    _READING_CACHE[key] = blob
+    backend = get_cache_backend()
+    if backend is not None:
+        try:
+            backend.set(key, blob)
+        except Exception as e:
+            print(f"⚠️  Persistent cache write failed: {e}", file=sys.stderr)
+    return blob
+
+# -----------------------------------------------------------------------------
+# Single-flight request coalescing (threads, asyncio, processes)
+# -----------------------------------------------------------------------------
+READING_LOCK_TTL = float(os.environ.get("READING_LOCK_TTL", "120"))  # seconds a cross-process lease lives
+READING_LOCK_POLL = 0.05
+_PERF_STATS.update(coalesced=0, coalesced_remote=0)
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution: the first caller runs fn,
+    the others wait for its result (or exception). do() serves threads, do_async()
+    coroutines on the running event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Any] = {}
+
+    def do(self, key: str, fn):
+        from concurrent.futures import Future
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+        if not leader:
+            _count("coalesced")
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._calls.pop(key, None)
+        fut.set_result(result)
+        return result
+
+    async def do_async(self, key: str, coro_fn):
+        """
+        The flight runs in its own task; every caller (the first included) awaits it shielded,
+        so cancelling one caller leaves the others waiting. It is cancelled once no caller is left.
+        """
+        import asyncio
+        calls = _async_state()["flights"]
+        flight = calls.get(key)
+        if flight is None:
+            flight = calls[key] = {"task": asyncio.ensure_future(coro_fn()), "callers": 0}
+
+            def landed(task, flight=flight):
+                if calls.get(key) is flight:
+                    calls.pop(key)
+                if not task.cancelled():
+                    task.exception()  # retrieved here, so no "never retrieved" warning without callers
+            flight["task"].add_done_callback(landed)
+        else:
+            _count("coalesced")
+        flight["callers"] += 1
+        try:
+            return await asyncio.shield(flight["task"])
+        finally:
+            flight["callers"] -= 1
+            if flight["callers"] == 0 and not flight["task"].done():
+                if calls.get(key) is flight:
+                    calls.pop(key)
+                flight["task"].cancel()
+
+_SINGLE_FLIGHT = SingleFlight()
+
+def _lock_backend(backend=None):
+    """The shared cache tier if it can host cross-process leases (and carry the result)."""
+    backend = backend if backend is not None else get_cache_backend()
+    if backend is None or not ENABLE_READING_CACHE or not hasattr(backend, "try_lock"):
+        return None
+    return backend
+
+def _lock_owner() -> str:
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+def _remote_result(backend, key: str) -> Optional[str]:
+    try:
+        return backend.get(key)
+    except Exception as e:
+        print(f"⚠️  Persistent cache read failed: {e}", file=sys.stderr)
+        return None
+
+def coalesce_across_processes(key: str, compute, backend=None) -> str:
+    """
+    Run compute() (which must store its blob under key) unless another process holds the
+    lease for key; then wait for its result in the shared cache. A lease that expires or is
+    released without a result makes the next waiter compute instead.
+    """
+    backend = _lock_backend(backend)
+    if backend is None:
+        return compute()
+    owner, counted = _lock_owner(), False
+    deadline = time.monotonic() + READING_LOCK_TTL
+    while True:
+        if backend.try_lock(key, owner, READING_LOCK_TTL):
+            try:
+                return compute()
+            finally:
+                backend.unlock(key, owner)
+        if not counted:
+            _count("coalesced_remote")
+            counted = True
+        while backend.lock_held(key) and time.monotonic() < deadline:
+            time.sleep(READING_LOCK_POLL)
+        blob = _remote_result(backend, key)
+        if blob is not None:
+            return blob
+        if time.monotonic() >= deadline:
+            return compute()
+
+async def coalesce_across_processes_async(key: str, compute, backend=None) -> str:
+    """
+    coalesce_across_processes for coroutines: compute is an async callable; the lease calls
+    (SQLite, which may sit out a busy_timeout) run on worker threads, waits don't block the loop.
+    """
+    import asyncio
+    backend = _lock_backend(backend)
+    if backend is None:
+        return await compute()
+    owner, counted = f"{_lock_owner()}:{id(asyncio.current_task())}", False
+    deadline = time.monotonic() + READING_LOCK_TTL
+    while True:
+        if await run_blocking(backend.try_lock, key, owner, READING_LOCK_TTL):
+            try:
+                return await compute()
+            finally:
+                await run_blocking(backend.unlock, key, owner)
+        if not counted:
+            _count("coalesced_remote")
+            counted = True
+        while await run_blocking(backend.lock_held, key) and time.monotonic() < deadline:
+            await asyncio.sleep(READING_LOCK_POLL)
+        blob = await run_blocking(_remote_result, backend, key)
+        if blob is not None:
+            return blob
+        if time.monotonic() >= deadline:
+            return await compute()
+
+# -----------------------------------------------------------------------------
+# Prompt budget (local token estimates, compaction, spread-sized max_tokens)
+# -----------------------------------------------------------------------------
+PROMPT_BUDGET = os.environ.get("PROMPT_BUDGET", "1") != "0"
+PROMPT_MAX_TOKENS = int(os.environ.get("PROMPT_MAX_TOKENS", "4096"))  # ceiling for auto max_tokens
+DEFAULT_NUM_PREDICT = 1500  # max_tokens when the budget is off and none was requested
+# prompt_tokens_saved needs the full prompt built and counted too: only on request
+PROMPT_SAVINGS_STATS = os.environ.get("PROMPT_SAVINGS_STATS", "false").lower() == "true"
+# Model-irrelevant astro fields: free text and counts the reader derives from the spread itself
+_ASTRO_PROMPT_DROP = frozenset(("notes", "element_counts", "majors_count"))
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]+")
+# Output tokens per spread size: EWMA of mean and mean absolute deviation
+_OUTPUT_PROFILE: Dict[int, Dict[str, float]] = {}
+_OUTPUT_PROFILE_LOCK = threading.Lock()  # fed from worker threads and the event loop
+_OUTPUT_PROFILE_ALPHA = 0.2
+_OUTPUT_PROFILE_MIN_SAMPLES = 3
+_PERF_STATS.update(prompt_tokens=0, prompt_tokens_saved=0)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline BPE-style token estimate (no tokenizer download): one token per ~6 letters
+    of a word, per 3 digits and per 2 characters of a punctuation run. Errs slightly
+    high on JSON, which is the safe side for budgeting.
+    """
+    n = 0
+    for tok in _TOKEN_RE.findall(text or ""):
+        c = tok[0]
+        if c.isalpha():
+            n += 1 + (len(tok) - 1) // 6
+        elif c.isdigit():
+            n += 1 + (len(tok) - 1) // 3
+        else:
+            n += 1 + (len(tok) - 1) // 2
+    return n
+
+def _is_reversed(item: Dict[str, Any]) -> bool:
+    return str(item.get("orientation") or "").strip().lower().startswith("rev")
+
+def _compact_astro(astro: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(astro, dict):
+        return {}
+    return {k: v for k, v in astro.items() if k not in _ASTRO_PROMPT_DROP and v not in ("", None, [], {})}
+
+def _compact_spread(spread: List[Dict[str, Any]], kb_slice: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Spread entries without facts the KB slice already carries (element) or defaults (upright)."""
+    out = []
+    for item in spread or []:
+        if not isinstance(item, dict):
+            continue
+        card = (item.get("card") or "").strip()
+        entry = {k: v for k, v in item.items()
+                 if v not in ("", None) and not k.startswith("_") and k not in ("orientation", "element")}
+        if _is_reversed(item):
+            entry["orientation"] = "reversed"
+        if item.get("element") and card not in kb_slice:
+            entry["element"] = item["element"]
+        out.append(entry)
+    return out
+
+def record_output_tokens(positions: int, tokens: int, model: Optional[str] = None):
+    """Fold one completion length into the profile for this spread size (and the router's EWMA for model)."""
+    if model:
+        _ROUTER.record_tokens(model, tokens)
+    with _OUTPUT_PROFILE_LOCK:
+        prof = _OUTPUT_PROFILE.get(positions)
+        if prof is None:
+            _OUTPUT_PROFILE[positions] = {"n": 1, "mean": float(tokens), "dev": 0.0}
+            return
+        a = _OUTPUT_PROFILE_ALPHA
+        prof["dev"] = (1 - a) * prof["dev"] + a * abs(tokens - prof["mean"])
+        prof["mean"] = (1 - a) * prof["mean"] + a * tokens
+        prof["n"] += 1
+
+def output_budget(positions: int) -> int:
+    """
+    max_tokens for a spread size: the learned mean + 3 deviations once there are enough
+    samples, else a per-position prior; 20% headroom, rounded up to 64, capped.
+    """
+    prior = 350 + 200 * max(1, positions)
+    with _OUTPUT_PROFILE_LOCK:
+        prof = dict(_OUTPUT_PROFILE.get(positions) or {})
+    if prof and prof["n"] >= _OUTPUT_PROFILE_MIN_SAMPLES:
+        base = max(prof["mean"] + 3 * prof["dev"], 0.5 * prior)
+    else:
+        base = prior
+    return max(256, min(PROMPT_MAX_TOKENS, -(-int(base * 1.2) // 64) * 64))
+
+@timed("prompt_build")
+def build_reading_prompt(question: str, timeframe: str, astro: Dict[str, Any],
+                         spread: List[Dict[str, Any]], num: int = 0):
+    """(user prompt, max_tokens) for one reading; num > 0 pins max_tokens, 0 sizes it from the spread."""
+    if not PROMPT_BUDGET:
+        return _reading_prompt(question, timeframe, astro, spread), (num or DEFAULT_NUM_PREDICT)
+    prompt = _reading_prompt(question, timeframe, astro, spread, compact=True)
+    tokens = estimate_tokens(prompt)
+    _count("prompt_tokens", tokens)
+    if PROMPT_SAVINGS_STATS:
+        _count("prompt_tokens_saved", max(0, estimate_tokens(_reading_prompt(question, timeframe, astro, spread)) - tokens))
+    return prompt, (num if num > 0 else output_budget(len(spread or [])))
+
+def get_output_profile() -> Dict[str, Any]:
+    with _OUTPUT_PROFILE_LOCK:
+        profile = {k: dict(v) for k, v in _OUTPUT_PROFILE.items()}
+    return {str(k): {"n": v["n"], "mean": round(v["mean"], 1), "dev": round(v["dev"], 1),
+                     "max_tokens": output_budget(k)} for k, v in sorted(profile.items())}
+
 # -----------------------------------------------------------------------------
 # Synthesis
 # -----------------------------------------------------------------------------
-def _kb_slice_for_spread(spread: List[Dict[str, Any]]) -> dict:
+def _kb_slice_for_spread(spread: List[Dict[str, Any]], compact: bool = False) -> dict:
+    """
+    KB facts for the drawn cards. compact keeps arcana, element and only the keyword list
+    for each orientation actually drawn (the suit is already in the card name).
+    """
     out = {}
-    card_kb = get_card_kb()
+    index = get_knowledge_index()
     for it in spread or []:
         name = (it.get("card") or "").strip()
-        if name and name not in out and name in card_kb:
-            info = card_kb[name]
-            out[name] = {
-                "arcana": info.get("arcana"),
-                "element": info.get("element"),
-                "keywords_upright": info.get("keywords_upright"),
-                "keywords_reversed": info.get("keywords_reversed"),
-                "suit": info.get("suit")
-            }
+        info = index.card(name)
+        if not info:
+            continue
+        if not compact:
+            if name not in out:
+                out[name] = {
+                    "arcana": info.get("arcana"),
+                    "element": info.get("element"),
+                    "keywords_upright": info.get("keywords_upright"),
+                    "keywords_reversed": info.get("keywords_reversed"),
+                    "suit": info.get("suit")
+                }
+            continue
+        entry = out.setdefault(name, {k: info[k] for k in ("arcana", "element") if info.get(k)})
+        field = "keywords_reversed" if _is_reversed(it) else "keywords_upright"
+        if info.get(field):
+            entry[field] = info[field]
     return out
 
-def synthesize_reading(question: str, timeframe: str,
-                       astro: Dict[str, Any], spread: List[Dict[str, str]],
-                       model: str, temp: float, num: int) -> Dict[str, Any]:
+def _reading_prompt(question: str, timeframe: str,
+                    astro: Dict[str, Any], spread: List[Dict[str, str]], compact: bool = False) -> str:
+    # Provide a compact KB slice (RAG-lite) for model grounding
+    kb_slice = _kb_slice_for_spread(spread, compact)
+    if compact:
+        astro, spread = _compact_astro(astro), _compact_spread(spread, kb_slice)
     astro_json  = json.dumps(astro, ensure_ascii=False, separators=(',', ':'))
     spread_json = json.dumps(spread, ensure_ascii=False, separators=(',', ':'))
-
-    # Provide a compact KB slice (RAG-lite) for model grounding
-    kb_slice = _kb_slice_for_spread(spread)
     kb_json  = json.dumps(kb_slice, ensure_ascii=False, separators=(',', ':'))
 
-    user_prompt = f"""
+    return f"""
 Create ONE unified Astro-Tarot reading that directly answers this question:
 
 QUESTION: {question}
@@ -907,133 +3046,1240 @@ INSTRUCTIONS:
 Return exactly one JSON matching the schema above.
 """.strip()
 
-    raw = call_ollama(SYSTEM_PROMPT, user_prompt, model, temp, num)
-
+def _finish_reading(raw: str, question: str, timeframe: str,
+                    spread: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Parse raw model output and normalize it to the strict schema."""
     # Debug logs
     try:
-        with open("last_model_output.txt", "w", encoding="utf-8") as f:
+        with open(LAST_OUTPUT_PATH, "w", encoding="utf-8") as f:
             f.write(raw)
     except Exception:
         pass
 
     # Parse; repair on failure
-    try:
-        data = parse_model_json(raw)
-    except Exception:
-        # Try to extract JSON without calling repair (which hangs)
-        extracted = _extract_balanced_json(raw)
-        if extracted:
-            data = parse_model_json(extracted)
-        else:
-            repaired = _basic_json_repairs(raw)
-            data = parse_model_json(repaired)
+    data = None
+    with timed_stage("json_extract"):
+        try:
+            data = parse_model_json(raw)
+        except Exception:
+            pass
+    if data is None:
+        with timed_stage("json_repair"):
+            # Try to extract JSON without calling repair (which hangs)
+            extracted = _extract_balanced_json(raw)
+            if extracted:
+                data = parse_model_json(extracted)
+            else:
+                repaired = _basic_json_repairs(raw)
+                data = parse_model_json(repaired)
 
     # Meta defaults
     meta = data.setdefault("meta", {})
     meta.setdefault("question", question)
     meta.setdefault("timeframe", timeframe)
-    meta.setdefault("spread_name", (spread[0].get("spread","") if (spread and isinstance(spread[0], dict)) else "") or "Custom")
+    meta.setdefault("spread_name", _spread_name(spread))
     meta["timestamp"] = datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
 
     # Normalize to strict schema (uses Tarot KB + Constellation KB)
     data = _coerce_to_schema(data, spread)
     return data
 
+def synthesize_reading(question: str, timeframe: str,
+                       astro: Dict[str, Any], spread: List[Dict[str, str]],
+                       model: str, temp: float, num: int) -> Dict[str, Any]:
+    key = reading_cache_key(question, timeframe, astro, spread, model, temp, num)
+    reading = _cached_reading(key, question, timeframe, spread)
+    if reading is not None:
+        return reading
+
+    def compute() -> str:
+        user_prompt, max_tokens = build_reading_prompt(question, timeframe, astro, spread, num)
+        raw = call_ollama(SYSTEM_PROMPT, user_prompt, model, temp, max_tokens)
+        record_output_tokens(len(spread or []), estimate_tokens(raw), model)
+        return _store_reading(key, _finish_reading(raw, question, timeframe, spread))
+
+    blob = _SINGLE_FLIGHT.do(key, lambda: coalesce_across_processes(key, compute))
+    return _reading_from_blob(blob, question, timeframe, spread)
+
+def synthesize_reading_stream(question: str, timeframe: str,
+                              astro: Dict[str, Any], spread: List[Dict[str, str]],
+                              model: str, temp: float, num: int, on_event=None) -> Dict[str, Any]:
+    """
+    synthesize_reading over a streamed completion: on_event(path, value) fires per block.
+    A truncated generation keeps only the blocks that closed; _coerce_to_schema fills the rest.
+    """
+    key = reading_cache_key(question, timeframe, astro, spread, model, temp, num)
+    reading = _cached_reading(key, question, timeframe, spread)
+    streamed = False
+
+    def compute() -> str:
+        nonlocal streamed
+        streamed = True
+        user_prompt, max_tokens = build_reading_prompt(question, timeframe, astro, spread, num)
+        parser = IncrementalJSONParser()
+        raw = call_chatgpt_stream(SYSTEM_PROMPT, user_prompt, model, temp, max_tokens, on_event=on_event, parser=parser)
+        record_output_tokens(len(spread or []), estimate_tokens(raw), model)
+        truncated = not parser.done and (parser.blocks or any(parser.items.values()))
+        if truncated:
+            print("[stream] Object never closed — keeping completed blocks only", file=sys.stderr)
+            raw = json.dumps(parser.partial(), ensure_ascii=False)
+        return _store_reading(key, _finish_reading(raw, question, timeframe, spread), cache=not truncated)
+
+    if reading is None:
+        blob = _SINGLE_FLIGHT.do(key, lambda: coalesce_across_processes(key, compute))
+        reading = _reading_from_blob(blob, question, timeframe, spread)
+    # Cache hits and coalesced waiters still report every block, just all at once
+    for path, value in reading.items() if (on_event is not None and not streamed) else ():
+        on_event(path, value)
+    return reading
+
+async def synthesize_reading_async(question: str, timeframe: str,
+                                   astro: Dict[str, Any], spread: List[Dict[str, str]],
+                                   model: str, temp: float, num: int) -> Dict[str, Any]:
+    """synthesize_reading on the async client; many can share one event loop."""
+    key = reading_cache_key(question, timeframe, astro, spread, model, temp, num)
+    reading = await cache_io(_cached_reading, key, question, timeframe, spread)
+    if reading is not None:
+        return reading
+
+    async def compute() -> str:
+        user_prompt, max_tokens = build_reading_prompt(question, timeframe, astro, spread, num)
+        raw = await call_chatgpt_async(SYSTEM_PROMPT, user_prompt, model, temp, max_tokens)
+        record_output_tokens(len(spread or []), estimate_tokens(raw), model)
+        # _finish_reading writes LAST_OUTPUT_PATH and parses/coerces: run it off the loop
+        reading = await run_blocking(_finish_reading, raw, question, timeframe, spread)
+        return await cache_io(_store_reading, key, reading)
+
+    blob = await _SINGLE_FLIGHT.do_async(key, lambda: coalesce_across_processes_async(key, compute))
+    return _reading_from_blob(blob, question, timeframe, spread)
+
+# -----------------------------------------------------------------------------
+# Local synthesis engine (no model call; deterministic templating over the KBs)
+# -----------------------------------------------------------------------------
+# model = LLM only, local = templated reading, auto = LLM with local fallback on failure
+READER_ENGINES = ("model", "local", "auto")
+DEFAULT_ENGINE = os.environ.get("READER_ENGINE", "model").lower()
+SYMBOLIC_MEANINGS_PATH = os.environ.get("SYMBOLIC_MEANINGS_PATH", "data/tarot_528_symbolic_meanings.json")
+_SYMBOLIC_MEANINGS_CACHE: Optional[Dict[str, List[str]]] = None
+
+_SYMBOL_RE = re.compile(r"^(.*?)\s*\(([^)]+)\)\s*$")
+_PIP_NUMBERS = {"ace": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+_ELEMENTS = ("Fire", "Earth", "Air", "Water")
+_ELEMENT_ACTIONS = {
+    "Fire": "Take one bold step this week that expresses {kw}.",
+    "Earth": "Schedule one concrete task that builds {kw}.",
+    "Air": "Write down your thinking on {kw} and share it with one trusted person.",
+    "Water": "Set aside quiet time to reflect on {kw} and how it feels.",
+}
+_SPIRIT_ACTION = "Pause once a day to notice where {kw} is already showing up."
+_REVERSED_ACTION = "Name one place where {kw} holds you back, and take one small step to shift it."
+# Traditional astrological correspondences of the major arcana (symbol tag per card)
+_MAJOR_CORRESPONDENCES = {
+    "the fool": "Air", "the magician": "Mercury", "the high priestess": "Moon", "the empress": "Venus",
+    "the emperor": "Aries", "the hierophant": "Taurus", "the lovers": "Gemini", "the chariot": "Cancer",
+    "strength": "Leo", "the hermit": "Virgo", "wheel of fortune": "Jupiter", "justice": "Libra",
+    "the hanged man": "Water", "death": "Scorpio", "temperance": "Sagittarius", "the devil": "Capricorn",
+    "the tower": "Mars", "the star": "Aquarius", "the moon": "Pisces", "the sun": "Sun",
+    "judgement": "Fire", "the world": "Saturn",
+}
+_LUNAR_TIMING = (
+    ("new", "New Moon: set one intention and begin small."),
+    ("waxing", "Waxing Moon: build momentum with steady, visible effort."),
+    ("full", "Full Moon week: review and release what’s not aligned."),
+    ("waning", "Waning Moon: finish, simplify and rest before the next cycle."),
+)
+
+def _compile_symbolic_meanings(raw) -> Optional[Dict[str, Any]]:
+    """Group "Quality of Symbol (Tag)" entries by normalised tag (element, sign, planet, "number n")."""
+    meanings = raw.get("meanings") if isinstance(raw, dict) else raw
+    if not isinstance(meanings, list):
+        return None
+    groups: Dict[str, List[str]] = {}
+    for entry in meanings:
+        m = _SYMBOL_RE.match(entry) if isinstance(entry, str) else None
+        if m:
+            groups.setdefault(_kb_key(m.group(2)), []).append(m.group(1))
+    return {"groups": groups, "count": len(meanings)}
+
+def get_symbolic_meanings() -> Dict[str, List[str]]:
+    """Symbolic meanings grouped by tag, loaded once (through the KB snapshot cache)."""
+    global _SYMBOLIC_MEANINGS_CACHE
+    if _SYMBOLIC_MEANINGS_CACHE is None:
+        compiled = load_compiled_kb(SYMBOLIC_MEANINGS_PATH, "symbols", _compile_symbolic_meanings)
+        _SYMBOLIC_MEANINGS_CACHE = compiled["groups"] if compiled else {}
+    return _SYMBOLIC_MEANINGS_CACHE
+
+def _pick(options: List[str], *seed: str) -> str:
+    """Stable choice from options for a given seed (same request -> same wording)."""
+    if not options:
+        return ""
+    digest = hashlib.sha256("|".join(seed).encode("utf-8")).digest()
+    return options[int.from_bytes(digest[:4], "big") % len(options)]
+
+def _symbol(tag: str, *seed: str) -> str:
+    return _pick(get_symbolic_meanings().get(_kb_key(tag), []), tag, *seed)
+
+def _sign_of(placement) -> str:
+    return placement.split()[0] if isinstance(placement, str) and placement.strip() else ""
+
+def _local_positions(question: str, spread: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    positions = []
+    for item in spread or []:
+        if not isinstance(item, dict):
+            continue
+        card = (item.get("card") or "").strip()
+        pos = (item.get("position") or "").strip() or "Position"
+        if not card:
+            continue
+        orientation = (item.get("orientation") or "upright").strip()
+        element = kb_element(card) or item.get("element") or _guess_element(card)
+        kws = kb_keywords(card, orientation=orientation)
+        parts = [f"{card}{' reversed' if orientation.lower().startswith('rev') else ''} in the {pos} position"]
+        parts[0] += f" speaks of {', '.join(k.lower() for k in kws[:3])}." if kws else "."
+        tag = element if element in _ELEMENTS else _MAJOR_CORRESPONDENCES.get(_kb_key(card), "")
+        symbol = _symbol(tag, question, pos, card) if tag else ""
+        if symbol:
+            parts.append(f"Symbol ({tag}): {symbol}.")
+        number = _PIP_NUMBERS.get(card.split()[0].lower()) if " of " in card else None
+        if number:
+            parts.append(f"Number {number}: {_symbol(f'Number {number}', question, card)}.")
+        positions.append({"card": card, "position": pos, "element": element,
+                          "orientation": orientation, "insight": " ".join(parts), "_keywords": kws})
+    return positions
+
+def synthesize_reading_local(question: str, timeframe: str,
+                             astro: Dict[str, Any], spread: List[Dict[str, str]],
+                             note: str = "") -> Dict[str, Any]:
+    """
+    Schema-valid reading built only from the spread, astro input and KBs: no model call.
+    Deterministic for a given request (apart from meta.timestamp).
+    """
+    astro = astro if isinstance(astro, dict) else {}
+    positions = _local_positions(question, spread)
+    counts = {e: sum(p["element"] == e for p in positions) for e in _ELEMENTS}
+    lead = max(_ELEMENTS, key=lambda e: counts[e]) if any(counts.values()) else ""
+    dominant = [e for e in astro.get("dominant_elements") or [] if e in _ELEMENTS]
+
+    themes = []
+    for label, key in (("Sun", "sun"), ("Moon", "moon"), ("Ascendant", "asc")):
+        sign = _sign_of(astro.get(key))
+        symbol = _symbol(sign, question, label) if sign else ""
+        if symbol:
+            themes.append(f"{label} in {sign}: {symbol}")
+
+    matches, tensions = [], []
+    for p in positions:
+        if p["element"] in dominant:
+            matches.append({"type": "element", "detail": f'{p["card"]} ({p["element"]}) echoes the chart’s {p["element"]} emphasis',
+                            "why": "Card element matches a dominant astro element"})
+        if p["orientation"].lower().startswith("rev"):
+            tensions.append({"type": "reversal", "detail": f'{p["card"]} reversed in {p["position"]}',
+                             "why": ", ".join(p["_keywords"][:2]) or "Blocked or internalised energy"})
+
+    first_kws = [k.lower() for p in positions for k in p["_keywords"][:1]]
+    quality = _symbol(lead, question, "theme").split(" of ")[0] if lead else ""
+    theme = f"{quality or 'Clarity'} through {' and '.join(first_kws[:2]) or 'steady attention'}."
+
+    phase = str(astro.get("lunar_phase") or "").lower()
+    timing = [line for key, line in _LUNAR_TIMING if key in phase][:1]
+    timing += ["Act within 72 hours on one concrete commitment.",
+               f"Review progress halfway through the {timeframe or 'coming weeks'}."]
+
+    actions, affirmations = [], []
+    for p in positions:
+        kw = (p["_keywords"][0] if p["_keywords"] else p["card"]).lower()
+        if p["orientation"].lower().startswith("rev"):
+            actions.append(_REVERSED_ACTION.format(kw=kw))
+        else:
+            actions.append(_ELEMENT_ACTIONS.get(p["element"], _SPIRIT_ACTION).format(kw=kw))
+        upright = kb_keywords(p["card"])
+        if upright and len(affirmations) < 3:
+            line = f"I welcome {upright[0].lower()} into my {p['position'].lower()}."
+            if line not in affirmations:
+                affirmations.append(line)
+
+    d = {
+        "meta": {"question": question, "timeframe": timeframe, "spread_name": _spread_name(spread),
+                 "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")},
+        "astro_summary": {
+            "core": {k: astro.get(k, "") for k in ("sun", "moon", "asc", "lunar_phase")}
+                    | {"dominant_elements": dominant, "notable_aspects": astro.get("notable_aspects") or []},
+            "themes": themes,
+        },
+        "resonance": {
+            "matches": matches,
+            "tensions": tensions,
+            "element_balance": {"comment": (f"Chart emphasises {', '.join(dominant)}; cards lean {lead}." if dominant and lead
+                                            else "Derived from normalized positions.")},
+        },
+        "interpretation": {
+            "theme": theme,
+            "positions": [{k: v for k, v in p.items() if not k.startswith("_")} for p in positions],
+            "timing": timing,
+            "action_items": actions or None,
+            "affirmations": affirmations or None,
+        },
+        "confidence": {"overall": 0.6, "notes": note or "Local synthesis from the knowledge bases; no model call."},
+    }
+    return _coerce_to_schema(d, spread)
+
+def _local_fallback(e: Exception, question: str, timeframe: str,
+                    astro: Dict[str, Any], spread: List[Dict[str, str]]) -> Dict[str, Any]:
+    _count("local_fallbacks")
+    print(f"⚠️  Model call failed ({type(e).__name__}: {e}) — serving a local reading", file=sys.stderr)
+    return synthesize_reading_local(question, timeframe, astro, spread,
+                                    note=f"Model unavailable ({type(e).__name__}); local synthesis from the knowledge bases.")
+
 # ---------------------- Faith-aware postprocessing ----------------------
-import subprocess, tempfile
-from pathlib import Path
+_VALIDATOR_PATH = pathlib.Path(__file__).resolve().parent / "scripts" / "validate_reading_faith.py"
+_VALIDATOR = None
+
+def get_validator():
+    """Import scripts/validate_reading_faith.py once and keep the module; None if missing."""
+    global _VALIDATOR
+    if _VALIDATOR is None:
+        if not _VALIDATOR_PATH.exists():
+            print("⚠️  Validator script not found at", _VALIDATOR_PATH, file=sys.stderr)
+            return None
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("validate_reading_faith", _VALIDATOR_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _VALIDATOR = module
+    return _VALIDATOR
 
 def postprocess_reading(reading: dict,
-                        require_literal_faith: bool = False,
-                        enrich_actions: bool = True,
-                        inclusive_audit: bool = True,
-                        soft_rewrite: bool = True,
-                        max_actions: int = 12) -> dict:
-    """Run the inclusive Faith-aware validator on the reading JSON."""
-    validator_path = Path(__file__).parent / "scripts" / "validate_reading_faith.py"
-    if not validator_path.exists():
-        print("⚠️  Validator script not found at", validator_path, file=sys.stderr)
+                        require_literal_faith: Optional[bool] = None,
+                        enrich_actions: Optional[bool] = None,
+                        inclusive_audit: Optional[bool] = None,
+                        soft_rewrite: Optional[bool] = None,
+                        max_actions: Optional[int] = None) -> dict:
+    """
+    Run the inclusive Faith-aware validator on the reading JSON (in-process), with the
+    validator's READER_OPTIONS (shared with scripts/revalidate_readings.py); arguments override them.
+    """
+    validator = get_validator()
+    if validator is None:
+        return reading
+
+    options = dict(validator.READER_OPTIONS)
+    for name, value in (("require_faith_word", require_literal_faith), ("enrich_actions", enrich_actions),
+                        ("inclusive_audit", inclusive_audit), ("soft_rewrite", soft_rewrite),
+                        ("max_actions", max_actions)):
+        if value is not None:
+            options[name] = value
+    try:
+        with timed_stage("validator"):
+            fixed, report = validator.validate(reading, options)
+    except Exception as e:
+        print(f"⚠️  Validator failed ({e}) — returning unmodified reading.", file=sys.stderr)
         return reading
 
-    with tempfile.TemporaryDirectory() as td:
-        raw_path = Path(td) / "raw.json"
-        fixed_path = Path(td) / "fixed.json"
-        raw_path.write_text(json.dumps(reading, indent=2, ensure_ascii=False), encoding="utf-8")
+    print("Validator report:\n", json.dumps(report, indent=2, ensure_ascii=False), file=sys.stderr)
+    return fixed
+
+# -----------------------------------------------------------------------------
+# Readings archive (SQLite, one compact row per reading)
+# -----------------------------------------------------------------------------
+# files = reading_<id>_{raw,fixed}.json per reading (legacy layout), archive = SQLite only, both = both
+READINGS_STORE = os.environ.get("READINGS_STORE", "files").lower()
+READINGS_ARCHIVE_PATH = os.environ.get("READINGS_ARCHIVE_PATH", "")  # default: <outdir>/archive.sqlite3
+
+def new_reading_id() -> str:
+    """Sortable, collision-free reading id: <UTC second>-<random suffix>."""
+    ts = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    return f"{ts}-{os.urandom(4).hex()}"
+
+def question_hash(question: str) -> str:
+    """Hash of the case-folded, whitespace-collapsed question."""
+    return hashlib.sha256(_kb_key(question or "").encode("utf-8")).hexdigest()[:16]
+
+def spread_signature(spread: List[Dict[str, Any]]) -> str:
+    """Hash of the ordered (position, card, orientation) triples; orientation defaults to upright."""
+    parts = []
+    for item in spread or []:
+        if isinstance(item, dict):
+            parts.append("%s:%s:%s" % (_kb_key(str(item.get("position", ""))), _kb_key(str(item.get("card", ""))),
+                                       _kb_key(str(item.get("orientation") or item.get("_orientation") or "upright"))))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def _reading_spread(reading: Dict[str, Any]) -> List[Dict[str, Any]]:
+    positions = (reading.get("interpretation") or {}).get("positions") or []
+    return [p for p in positions if isinstance(p, dict)]
+
+def _to_epoch(value) -> Optional[float]:
+    """Accept epoch seconds, a datetime, or an ISO-8601 / reading-id timestamp string."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        text = value.strip().replace("Z", "+00:00")
+        try:
+            value = datetime.datetime.fromisoformat(text)
+        except ValueError:
+            value = datetime.datetime.strptime(value[:16], "%Y%m%dT%H%M%SZ")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+class ReadingArchive:
+    """
+    Append-only readings archive in SQLite (WAL mode): one row per reading with the
+    raw and fixed JSON stored compactly, indexed by id, timestamp, question hash and
+    spread signature. Queries stream in timestamp order without loading the table.
+    """
+
+    _COLUMNS = ("id", "ts", "question_hash", "spread_sig", "question", "raw", "fixed")
+
+    def __init__(self, path):
+        import sqlite3
+        self.path = str(path)
+        self._lock = threading.Lock()
+        pathlib.Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=10000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            " id TEXT PRIMARY KEY, ts REAL NOT NULL, question_hash TEXT NOT NULL, spread_sig TEXT NOT NULL,"
+            " question TEXT NOT NULL, raw TEXT NOT NULL, fixed TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS readings_ts ON readings(ts, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS readings_question ON readings(question_hash, ts)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS readings_spread ON readings(spread_sig, ts)")
+
+    @staticmethod
+    def _dump(obj) -> Optional[str]:
+        return None if obj is None else json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def put(self, raw: Dict[str, Any], fixed: Optional[Dict[str, Any]] = None,
+            spread: Optional[List[Dict[str, Any]]] = None, reading_id: Optional[str] = None,
+            ts: Optional[float] = None) -> str:
+        """Append one reading; returns its id. An existing id is left untouched."""
+        reading_id = reading_id or new_reading_id()
+        question = str((raw.get("meta") or {}).get("question", ""))
+        row = (reading_id, time.time() if ts is None else float(ts), question_hash(question),
+               spread_signature(spread if spread is not None else _reading_spread(raw)),
+               question, self._dump(raw), self._dump(fixed))
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO readings VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+        return reading_id
+
+    def _record(self, row) -> Dict[str, Any]:
+        rec = dict(zip(self._COLUMNS, row))
+        rec["raw"] = json.loads(rec["raw"])
+        rec["fixed"] = json.loads(rec["fixed"]) if rec["fixed"] is not None else None
+        return rec
+
+    def get(self, reading_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM readings WHERE id = ?", (reading_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def query(self, since=None, until=None, question: Optional[str] = None,
+              spread: Optional[List[Dict[str, Any]]] = None, spread_sig: Optional[str] = None,
+              limit: Optional[int] = None, batch: int = 500):
+        """
+        Yield readings with since <= ts < until (epoch, datetime or ISO string), oldest first,
+        optionally only those for a question and/or spread. Reads in keyset pages of `batch` rows.
+        """
+        where, args = [], []
+        if since is not None:
+            where.append("ts >= ?"); args.append(_to_epoch(since))
+        if until is not None:
+            where.append("ts < ?"); args.append(_to_epoch(until))
+        if question is not None:
+            where.append("question_hash = ?"); args.append(question_hash(question))
+        if spread is not None:
+            spread_sig = spread_signature(spread)
+        if spread_sig is not None:
+            where.append("spread_sig = ?"); args.append(spread_sig)
+        remaining = limit if limit is not None else float("inf")
+        after = None
+        while remaining > 0:
+            page_where, page_args = list(where), list(args)
+            if after is not None:
+                page_where.append("(ts > ? OR (ts = ? AND id > ?))")
+                page_args += [after[0], after[0], after[1]]
+            sql = "SELECT * FROM readings"
+            if page_where:
+                sql += " WHERE " + " AND ".join(page_where)
+            sql += " ORDER BY ts, id LIMIT ?"
+            with self._lock:
+                rows = self._db.execute(sql, page_args + [int(min(batch, remaining))]).fetchall()
+            for row in rows:
+                yield self._record(row)
+            if len(rows) < batch:
+                return
+            remaining -= len(rows)
+            after = (rows[-1][1], rows[-1][0])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
 
-        args = [sys.executable, str(validator_path), str(raw_path), str(fixed_path)]
-        if not require_literal_faith:
-            args.append("--no-require-faith-word")
-        if not enrich_actions:
-            args.append("--no-enrich-actions")
-        if not inclusive_audit:
-            args.append("--no-inclusive-audit")
-        if soft_rewrite:
-            args.append("--soft-rewrite")
-        args.extend(["--max-actions", str(max_actions)])
+    def export_jsonl(self, fp, **filters) -> int:
+        """Stream matching readings to a text file object as one JSON record per line."""
+        n = 0
+        for rec in self.query(**filters):
+            fp.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+            n += 1
+        return n
 
-        proc = subprocess.run(args, capture_output=True, text=True)
-        print("Validator report:\\n", proc.stdout, file=sys.stderr)
+    def export_files(self, outdir, **filters) -> int:
+        """Write matching readings in the per-file layout (reading_<id>_raw.json / _fixed.json)."""
+        n = 0
+        for rec in self.query(**filters):
+            save_reading(outdir, rec["raw"], "raw", rec["id"])
+            if rec["fixed"] is not None:
+                save_reading(outdir, rec["fixed"], "fixed", rec["id"])
+            n += 1
+        return n
 
-        if proc.returncode != 0 or not fixed_path.exists():
-            print("⚠️  Validator failed — returning unmodified reading.", file=sys.stderr)
-            return reading
+    def import_files(self, readings_dir) -> int:
+        """Load a per-file readings directory (raw/fixed pairs or fixed-only); returns rows added."""
+        stems: Dict[str, Dict[str, pathlib.Path]] = {}
+        for path in pathlib.Path(readings_dir).glob("reading_*_*.json"):
+            stem, _, kind = path.stem.rpartition("_")
+            if kind in ("raw", "fixed"):
+                stems.setdefault(stem[len("reading_"):], {})[kind] = path
+        before = self.count()
+        for reading_id in sorted(stems):
+            paths = stems[reading_id]
+            try:
+                fixed = json.loads(paths["fixed"].read_text(encoding="utf-8")) if "fixed" in paths else None
+                raw = json.loads(paths["raw"].read_text(encoding="utf-8")) if "raw" in paths else fixed
+                stamp = (raw.get("meta") or {}).get("timestamp") or reading_id
+                ts = _to_epoch(stamp)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping {reading_id}: {e}", file=sys.stderr)
+                continue
+            self.put(raw, fixed, reading_id=reading_id, ts=ts)
+        return self.count() - before
 
-        return json.loads(fixed_path.read_text(encoding="utf-8"))
+    def compact(self, before=None) -> Dict[str, Any]:
+        """Optionally drop readings older than `before`, then checkpoint the WAL and VACUUM."""
+        removed = 0
+        with self._lock:
+            if before is not None:
+                removed = self._db.execute("DELETE FROM readings WHERE ts < ?", (_to_epoch(before),)).rowcount
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.execute("VACUUM")
+        return {"removed": removed, **self.stats()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, first, last = self._db.execute("SELECT COUNT(*), MIN(ts), MAX(ts) FROM readings").fetchone()
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {"path": self.path, "entries": entries, "first_ts": first, "last_ts": last, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_READING_ARCHIVES: Dict[str, ReadingArchive] = {}
+_READING_ARCHIVES_LOCK = threading.Lock()
+
+def get_readings_archive(outdir="./readings") -> ReadingArchive:
+    """Archive at READINGS_ARCHIVE_PATH, or <outdir>/archive.sqlite3; one handle per path."""
+    path = str(pathlib.Path(READINGS_ARCHIVE_PATH or pathlib.Path(outdir) / "archive.sqlite3").resolve())
+    with _READING_ARCHIVES_LOCK:
+        if path not in _READING_ARCHIVES:
+            _READING_ARCHIVES[path] = ReadingArchive(path)
+        return _READING_ARCHIVES[path]
+
+# -----------------------------------------------------------------------------
+# Reading requests (shared by the CLI and the stdio worker)
+# -----------------------------------------------------------------------------
+DEFAULT_QUESTION = "What should I focus on in my career over the next 30 days?"
+DEFAULT_TIMEFRAME = "next 30 days"
+DEFAULT_ASTRO = {"sun":"Leo 10°","moon":"Taurus 5°","asc":"Capricorn 12°"}
+DEFAULT_SPREAD = [
+    {"position":"Past","card":"The Hermit","orientation":"upright","element":"Earth"},
+    {"position":"Present","card":"The Lovers","orientation":"upright","element":"Air"},
+    {"position":"Future","card":"Ten of Stones","orientation":"upright","element":"Earth"}
+]
+
+def save_reading(outdir, reading: dict, kind: str, ts: Optional[str] = None) -> pathlib.Path:
+    """Write one reading as reading_<ts>_<kind>.json under outdir (ts may be a reading id)."""
+    outdir = pathlib.Path(outdir); outdir.mkdir(exist_ok=True)
+    ts = ts or datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    path = outdir / f"reading_{ts}_{kind}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(reading, f, indent=2, ensure_ascii=False)
+    return path
+
+def _finalize_reading(reading: Dict[str, Any], postprocess: bool = False, outdir=None,
+                      spread: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Save the raw reading, optionally postprocess it, and save the fixed copy (per READINGS_STORE)."""
+    reading_id = new_reading_id()
+    to_files = outdir and READINGS_STORE in ("files", "both")
+    if to_files:
+        with timed_stage("files_write"):
+            raw_path = save_reading(outdir, reading, "raw", reading_id)
+        print(f"Saved raw reading to: {raw_path}", file=sys.stderr)
+
+    reading_fixed = None
+    if postprocess:
+        # Non-dogmatic, Faith-aware, inclusive, 3 action items (validator READER_OPTIONS)
+        reading_fixed = postprocess_reading(reading)
+        if to_files:
+            with timed_stage("files_write"):
+                fixed_path = save_reading(outdir, reading_fixed, "fixed", reading_id)
+            print(f"Saved inclusive fixed reading to: {fixed_path}", file=sys.stderr)
+
+    if outdir and READINGS_STORE in ("archive", "both"):
+        archive = get_readings_archive(outdir)
+        with timed_stage("archive_write"):
+            archive.put(reading, reading_fixed, spread=spread, reading_id=reading_id)
+        print(f"Archived reading {reading_id} in: {archive.path}", file=sys.stderr)
+    return reading_fixed if postprocess else reading
+
+def _synthesize_routed(question: str, timeframe: str, astro: Dict[str, Any], spread: List[Dict[str, str]],
+                       model: str, temp: float, num: int, priority: str, on_event=None) -> Dict[str, Any]:
+    """synthesize_reading on the routed model, failing over down the router's order."""
+    models = route_models(model, len(spread or []), priority)
+    if on_event is not None:  # streamed blocks cannot be taken back, so no failover mid-stream
+        return synthesize_reading_stream(question, timeframe, astro, spread, models[0], temp, num, on_event)
+    for tried, m in enumerate(models, 1):
+        try:
+            return synthesize_reading(question, timeframe, astro, spread, m, temp, num)
+        except Exception as e:
+            if not _failover(models, e, tried):
+                raise
+
+async def _synthesize_routed_async(question: str, timeframe: str, astro: Dict[str, Any],
+                                   spread: List[Dict[str, str]], model: str, temp: float, num: int,
+                                   priority: str) -> Dict[str, Any]:
+    models = route_models(model, len(spread or []), priority)
+    for tried, m in enumerate(models, 1):
+        try:
+            return await synthesize_reading_async(question, timeframe, astro, spread, m, temp, num)
+        except Exception as e:
+            if not _failover(models, e, tried):
+                raise
+
+def run_reading(question: str, timeframe: str,
+                astro: Dict[str, Any], spread: List[Dict[str, str]],
+                model: str = DEFAULT_MODEL, temp: float = 0.2, num: int = 0,
+                postprocess: bool = False, outdir=None, on_event=None,
+                engine: str = DEFAULT_ENGINE, deadline: Optional[float] = None,
+                priority: str = "interactive", report: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Synthesize one reading, optionally postprocess it and save raw/fixed copies to outdir.
+    Passing on_event(path, value) streams the completion and reports blocks as they close.
+    engine: "model", "local" (no model call) or "auto" (model, local reading if it fails).
+    deadline: seconds for all model attempts together (default READING_DEADLINE).
+    model "auto" lets the router pick by spread size and priority ("interactive" or "batch").
+    A `report` dict gets "engine": the engine that served the reading ("model" or "local"),
+    which the schema has no field for.
+    """
+    served = "local" if engine == "local" else "model"
+    with pinned_knowledge_index(), reading_deadline(deadline):
+        if engine == "local":
+            reading = synthesize_reading_local(question, timeframe, astro, spread)
+            for key, value in reading.items() if on_event is not None else ():
+                on_event(key, value)
+        else:
+            try:
+                reading = _synthesize_routed(question, timeframe, astro, spread, model, temp, num, priority, on_event)
+            except Exception as e:
+                if engine != "auto":
+                    raise
+                reading = _local_fallback(e, question, timeframe, astro, spread)
+                served = "local"
+    if report is not None:
+        report["engine"] = served
+    return _finalize_reading(reading, postprocess, outdir, spread)
+
+async def run_reading_async(question: str, timeframe: str,
+                            astro: Dict[str, Any], spread: List[Dict[str, str]],
+                            model: str = DEFAULT_MODEL, temp: float = 0.2, num: int = 0,
+                            postprocess: bool = False, outdir=None,
+                            engine: str = DEFAULT_ENGINE, deadline: Optional[float] = None,
+                            priority: str = "interactive",
+                            report: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Async run_reading (model call on the async client)."""
+    served = "local" if engine == "local" else "model"
+    with pinned_knowledge_index(), reading_deadline(deadline):
+        if engine == "local":
+            reading = synthesize_reading_local(question, timeframe, astro, spread)
+        else:
+            try:
+                reading = await _synthesize_routed_async(question, timeframe, astro, spread, model, temp, num, priority)
+            except Exception as e:
+                if engine != "auto":
+                    raise
+                reading = _local_fallback(e, question, timeframe, astro, spread)
+                served = "local"
+    if report is not None:
+        report["engine"] = served
+    # Validator, file and archive writes block: keep them off the event loop
+    return await run_blocking(_finalize_reading, reading, postprocess, outdir, spread)
+
+def _reading_kwargs(req: Dict[str, Any], outdir=None) -> Dict[str, Any]:
+    """Validate a reading request frame and map it to run_reading() arguments."""
+    spread = req.get("spread") or DEFAULT_SPREAD
+    if not isinstance(spread, list):
+        raise ValueError("spread must be a list of {position, card, orientation}")
+    astro = req.get("astro") or DEFAULT_ASTRO
+    if not isinstance(astro, dict):
+        raise ValueError("astro must be an object")
+    engine = (req.get("engine") or DEFAULT_ENGINE).lower()
+    if engine not in READER_ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(READER_ENGINES)}")
+    priority = (req.get("priority") or "interactive").lower()
+    if priority not in READING_PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(READING_PRIORITIES)}")
+    deadline = req.get("deadline")
+    if deadline is not None and (isinstance(deadline, bool) or not isinstance(deadline, (int, float))):
+        raise ValueError("deadline must be a number of seconds")
+    opts = req.get("options") or {}
+    return {
+        "question": req.get("question") or DEFAULT_QUESTION,
+        "timeframe": req.get("timeframe") or DEFAULT_TIMEFRAME,
+        "astro": astro,
+        "spread": spread,
+        "model": req.get("model") or DEFAULT_MODEL,
+        "temp": float(req.get("temperature", 0.2)),
+        "num": int(req.get("num_predict") or 0),
+        "postprocess": bool(opts.get("postprocess", True)),
+        "outdir": outdir if opts.get("save", True) else None,
+        "engine": engine,
+        "deadline": deadline,
+        "priority": priority,
+    }
+
+def _control_response(req: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Answer non-reading ops (ping/stats/metrics); None for reading requests."""
+    op = req.get("op") or "reading"
+    if op == "ping":
+        return {"id": req.get("id"), "ok": True, "result": {"pong": True}}
+    if op == "stats":
+        return {"id": req.get("id"), "ok": True, "result": get_cache_stats()}
+    if op == "metrics":
+        return {"id": req.get("id"), "ok": True, "result": get_metrics()}
+    if op != "reading":
+        raise ValueError(f"unknown op: {op}")
+    return None
+
+def _error_response(req_id, e: Exception) -> Dict[str, Any]:
+    print(f"[worker] Request {req_id!r} failed: {e}", file=sys.stderr)
+    return {"id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+def handle_request(req: Dict[str, Any], outdir=None, emit=None) -> Dict[str, Any]:
+    """
+    Serve one framed request and return its framed response.
+    Request:  {"id", "op": "reading"|"ping"|"stats"|"metrics", "question", "timeframe", "astro",
+               "spread", "model", "temperature", "num_predict", "engine": "model"|"local"|"auto", "deadline",
+               "priority": "interactive"|"batch", "options": {"postprocess", "save", "stream"}}
+    Response: {"id", "ok": true, "result": {...}, "engine": "model"|"local"} or {"id", "ok": false, "error": "..."}
+    With options.stream and an `emit` callback, block frames
+    {"id", "ok": true, "event": "block", "path", "value"} are emitted before the response.
+    """
+    req_id = req.get("id")
+    try:
+        control = _control_response(req)
+        if control is not None:
+            return control
+        on_event = None
+        if emit is not None and (req.get("options") or {}).get("stream"):
+            def on_event(path, value):
+                emit({"id": req_id, "ok": True, "event": "block", "path": path, "value": value})
+        report = {}
+        reading = run_reading(**_reading_kwargs(req, outdir), on_event=on_event, report=report)
+        return {"id": req_id, "ok": True, "result": reading, **report}
+    except Exception as e:
+        return _error_response(req_id, e)
+
+async def handle_request_async(req: Dict[str, Any], outdir=None) -> Dict[str, Any]:
+    """Async handle_request (same frames)."""
+    req_id = req.get("id")
+    try:
+        control = _control_response(req)
+        if control is not None:
+            return control
+        report = {}
+        reading = await run_reading_async(**_reading_kwargs(req, outdir), report=report)
+        return {"id": req_id, "ok": True, "result": reading, **report}
+    except Exception as e:
+        return _error_response(req_id, e)
+
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "8"))
+
+def serve_stdio(stdin=None, stdout=None, outdir=None, concurrency: int = WORKER_CONCURRENCY):
+    """
+    Long-lived worker: one JSON request per stdin line, one JSON response per stdout line.
+    Up to `concurrency` requests run at once on a thread pool, so responses can arrive
+    out of order; callers match them by id. Frames are written whole, one line each.
+    KBs, the HTTP session and the response cache stay warm across requests.
+    Everything else printed while serving goes to stderr so stdout carries frames only.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    stdin = stdin or sys.stdin
+    out = stdout or sys.stdout
+    write_lock = threading.Lock()
+
+    def emit(frame: Dict[str, Any]):
+        line = json.dumps(frame, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with write_lock:
+            out.write(line)
+            out.flush()
+
+    def serve_one(req: Dict[str, Any]):
+        emit(handle_request(req, outdir=outdir, emit=emit))
+
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        warm_kbs()
+        emit({"id": None, "ok": True, "event": "ready", "pid": os.getpid(), "concurrency": concurrency})
+        with ThreadPoolExecutor(max_workers=max(1, int(concurrency)), thread_name_prefix="stdio") as pool:
+            for line in stdin:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    req = json.loads(line)
+                    if not isinstance(req, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    emit({"id": None, "ok": False, "error": f"bad request: {e}"})
+                    continue
+                pool.submit(serve_one, req)
+    finally:
+        sys.stdout = real_stdout
+
+# -----------------------------------------------------------------------------
+# Batch mode (JSONL in -> JSONL out, bounded parallelism, resumable)
+# -----------------------------------------------------------------------------
+def _read_checkpoint(path: pathlib.Path) -> set:
+    done = set()
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    done.add(line)
+    return done
+
+def _batch_items(in_path, done: set, summary: Dict[str, Any]):
+    """Yield (line_no, id, request) for input lines not yet checkpointed, counting the rest in summary["skipped"]."""
+    with open(in_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                yield line_no, line_no, e
+                continue
+            req_id = req.get("id", line_no)
+            if json.dumps(req_id) in done:
+                summary["skipped"] += 1
+                continue
+            yield line_no, req_id, req
+
+async def run_batch_async(in_path, out_path, concurrency: int = 8, checkpoint_path=None) -> Dict[str, Any]:
+    """
+    Run every request line of in_path (stdio frame format) with `concurrency` readings in flight.
+    Results stream to out_path (appended) in completion order as {"id", "line", "ok", ...}.
+    Successful ids are appended to the checkpoint (default: <out>.ckpt), so a re-run skips them;
+    failed ids are retried on the next run and the last line per id wins.
+    """
+    import asyncio
+    out_path = pathlib.Path(out_path)
+    ckpt_path = pathlib.Path(checkpoint_path) if checkpoint_path else out_path.with_name(out_path.name + ".ckpt")
+    done = _read_checkpoint(ckpt_path)
+    concurrency = max(1, int(concurrency))
+    set_model_concurrency(concurrency)
+    warm_kbs()
+
+    summary = {"ok": 0, "failed": 0, "skipped": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    started = time.perf_counter()
+
+    with open(out_path, "a", encoding="utf-8") as out, open(ckpt_path, "a", encoding="utf-8") as ckpt:
+        def write(line_no, frame):
+            frame = {"id": frame.get("id"), "line": line_no, **{k: v for k, v in frame.items() if k != "id"}}
+            out.write(json.dumps(frame, ensure_ascii=False, separators=(',', ':')) + "\n")
+            out.flush()
+            if frame["ok"]:
+                summary["ok"] += 1
+                ckpt.write(json.dumps(frame["id"]) + "\n")
+                ckpt.flush()
+            else:
+                summary["failed"] += 1
+            finished = summary["ok"] + summary["failed"]
+            if finished % 10 == 0:
+                print(f"[batch] {finished} done ({summary['failed']} failed) "
+                      f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                line_no, req_id, req = item
+                if isinstance(req, Exception):
+                    write(line_no, {"id": req_id, "ok": False, "error": f"bad request: {req}"})
+                    continue
+                write(line_no, await handle_request_async({"priority": "batch", **req, "id": req_id}))
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for item in _batch_items(in_path, done, summary):
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+            await close_async_http_client()
+
+    summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+    print(f"✓ Batch complete: {summary['ok']} ok, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped (checkpoint) in {summary['elapsed_s']}s", file=sys.stderr)
+    return summary
+
+def run_batch(in_path, out_path, concurrency: int = 8, checkpoint_path=None) -> Dict[str, Any]:
+    import asyncio
+    return asyncio.run(run_batch_async(in_path, out_path, concurrency, checkpoint_path))
+
+# -----------------------------------------------------------------------------
+# HTTP server mode (asyncio, many readings in flight per process)
+# -----------------------------------------------------------------------------
+READER_MAX_INFLIGHT = int(os.environ.get("READER_MAX_INFLIGHT", "32"))
+MAX_BODY_BYTES = 1 << 20
+GZIP_MIN_BYTES = 1024
+# Failed readings whose cause is upstream health, not the request, map to gateway statuses
+_ERROR_STATUS = {"CircuitOpenError": 503, "DeadlineExceeded": 504}
+
+def _timed_validate(validator, reading, options):
+    with timed_stage("validator"):
+        return validator.validate(reading, options)
+
+def kbs_loaded() -> bool:
+    return _CARD_KB_CACHE is not None and _CONSTELLATION_KB_CACHE is not None
+
+class ReaderHTTPServer:
+    """
+    Minimal HTTP/1.1 server on asyncio streams.
+      POST /reading   body = stdio request frame (without id); returns the reading
+      POST /validate  body = {"reading": {...}, "options": {...}}; returns {"fixed", "report"}
+      GET  /health    readiness: 200 once KBs are loaded, 503 before
+      GET  /metrics   per-stage timing histograms and counters (Prometheus text format)
+    Readings use the async model client; max_inflight sets the global model-call semaphore.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 max_inflight: int = READER_MAX_INFLIGHT, outdir=None):
+        self.host, self.port = host, port
+        self.max_inflight = max(1, int(max_inflight))
+        self.outdir = outdir
+        self.inflight = 0
+        self._server = None
+
+    async def start(self):
+        import asyncio
+        set_model_concurrency(self.max_inflight)
+        self._server = await asyncio.start_server(self._handle_conn, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        asyncio.get_running_loop().run_in_executor(None, warm_kbs)
+        print(f"✓ Reader HTTP server on http://{self.host}:{self.port} (max in-flight {self.max_inflight})", file=sys.stderr)
+        return self
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        await close_async_http_client()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        """Route one request; returns (status, payload)."""
+        path = path.split("?", 1)[0]
+        if path in ("/health", "/ready"):
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            ready = kbs_loaded()
+            return (200 if ready else 503), {
+                "status": "ok" if ready else "starting",
+                "kbs_loaded": ready,
+                "inflight": self.inflight,
+                "max_inflight": self.max_inflight,
+            }
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, metrics_prometheus()
+        if path not in ("/reading", "/validate"):
+            return 404, {"error": f"no route for {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            req = json.loads(body or b"{}")
+            if not isinstance(req, dict):
+                raise ValueError("body must be a JSON object")
+        except ValueError as e:
+            return 400, {"error": f"bad request: {e}"}
+
+        if path == "/validate":
+            reading = req.get("reading")
+            if not isinstance(reading, dict):
+                return 400, {"error": "reading must be an object"}
+            validator = get_validator()
+            if validator is None:
+                return 503, {"error": "validator unavailable"}
+            fixed, report = await run_blocking(_timed_validate, validator, reading, req.get("options") or {})
+            return 200, {"fixed": fixed, "report": report}
+
+        self.inflight += 1
+        try:
+            resp = await handle_request_async(req, self.outdir)
+        finally:
+            self.inflight -= 1
+        if resp["ok"]:
+            return 200, resp["result"]
+        return _ERROR_STATUS.get(resp["error"].split(":", 1)[0], 500), {"error": resp["error"]}
+
+    @staticmethod
+    def _encode(status: int, payload: Any, accept_encoding: str, keep_alive: bool) -> bytes:
+        from http import HTTPStatus
+        if isinstance(payload, str):  # /metrics: Prometheus text exposition
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        headers = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Type: {content_type}",
+        ]
+        if "gzip" in accept_encoding.lower() and len(body) >= GZIP_MIN_BYTES:
+            import gzip
+            body = gzip.compress(body, compresslevel=5)
+            headers.append("Content-Encoding: gzip")
+            headers.append("Vary: Accept-Encoding")
+        headers.append(f"Content-Length: {len(body)}")
+        headers.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _handle_conn(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        import asyncio
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(self._encode(400, {"error": "malformed request line"}, "", False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(self._encode(400, {"error": "invalid Content-Length"}, "", False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(self._encode(413, {"error": "body too large"}, "", False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self._dispatch(method.upper(), target, body)
+                except Exception as e:
+                    print(f"[http] {method} {target} failed: {e}", file=sys.stderr)
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                writer.write(self._encode(status, payload, headers.get("accept-encoding", ""), keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+def serve_http(host: str = "127.0.0.1", port: int = 8765,
+               max_inflight: int = READER_MAX_INFLIGHT, outdir=None):
+    """Run ReaderHTTPServer until interrupted."""
+    import asyncio
+
+    async def _run():
+        server = await ReaderHTTPServer(host, port, max_inflight, outdir).start()
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        print("✓ Reader HTTP server stopped", file=sys.stderr)
+
+# -----------------------------------------------------------------------------
+# Startup profiling
+# -----------------------------------------------------------------------------
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """Parse `python -X importtime` stderr into [{"module", "self_us", "cumulative_us", "depth"}]."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header row
+        name = parts[2].rstrip()
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(name.lstrip(" ")) - 1) // 2,
+        })
+    return rows
+
+def startup_report(targets=("astro_tarot_reader", "validate_reading_faith")) -> Dict[str, Any]:
+    """Cold-import each target in a fresh interpreter under -X importtime; slowest modules first."""
+    import subprocess
+    here = pathlib.Path(__file__).resolve().parent
+    paths = [str(here), str(_VALIDATOR_PATH.parent)]
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "targets": {}}
+    for target in targets:
+        code = f"import sys; sys.path[:0] = {paths!r}; import {target}"
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, cwd=str(here))
+        wall_ms = (time.perf_counter() - start) * 1000
+        rows = parse_importtime(proc.stderr)
+        own = next((r for r in reversed(rows) if r["module"] == target), None)
+        report["targets"][target] = {
+            "ok": proc.returncode == 0,
+            "process_ms": round(wall_ms, 1),
+            "import_us": own["cumulative_us"] if own else None,
+            "modules": sorted(rows, key=lambda r: r["cumulative_us"], reverse=True),
+        }
+    return report
 
 # -----------------------------------------------------------------------------
 # CLI
 # -----------------------------------------------------------------------------
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--question", default="What should I focus on in my career over the next 30 days?")
-    p.add_argument("--timeframe", default="next 30 days")
+    p.add_argument("--question", default=DEFAULT_QUESTION)
+    p.add_argument("--timeframe", default=DEFAULT_TIMEFRAME)
     p.add_argument("--astro", default="./data/astrology_context.json")
     p.add_argument("--spread", default="./data/my_spread.json")
-    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--model", default=DEFAULT_MODEL,
+                   help=f"Model name, or '{ROUTER_MODEL}' to route by spread size, latency and error rate (ROUTER_MODELS)")
+    p.add_argument("--priority", choices=READING_PRIORITIES, default="interactive",
+                   help="Routing priority with --model auto: interactive readings must meet ROUTER_SLA_S")
     p.add_argument("--temperature", type=float, default=0.2)
-    p.add_argument("--num-predict", type=int, default=1500)
+    p.add_argument("--num-predict", type=int, default=0,
+                   help="max_tokens for the reading (default 0: sized from the spread, see PROMPT_BUDGET)")
+    p.add_argument("--engine", choices=READER_ENGINES, default=DEFAULT_ENGINE if DEFAULT_ENGINE in READER_ENGINES else "model",
+                   help="model = LLM, local = deterministic KB synthesis (no model call), auto = LLM with local fallback")
+    p.add_argument("--deadline", type=float, default=None,
+                   help=f"Seconds for all model attempts of the reading (default READING_DEADLINE={READING_DEADLINE:g}, 0 = none)")
     p.add_argument("--outdir", default="./readings")
     p.add_argument("--postprocess", action="store_true", help="Enable faith-aware postprocessing")
+    p.add_argument("--stream", action="store_true",
+                   help="Stream the completion and report each JSON block to stderr as it closes")
+    p.add_argument("--serve-stdio", action="store_true",
+                   help="Run as a persistent worker speaking JSON lines over stdin/stdout")
+    p.add_argument("--worker-concurrency", type=int, default=WORKER_CONCURRENCY,
+                   help="Requests handled at once in --serve-stdio mode (responses may arrive out of order)")
+    p.add_argument("--serve-http", action="store_true",
+                   help="Run an asyncio HTTP server (POST /reading, POST /validate, GET /health, GET /metrics)")
+    p.add_argument("--host", default=os.environ.get("READER_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.environ.get("READER_PORT", "8765")))
+    p.add_argument("--max-inflight", type=int, default=READER_MAX_INFLIGHT,
+                   help="Cap on concurrent upstream model calls in --serve-http mode")
+    p.add_argument("--batch", metavar="REQUESTS_JSONL",
+                   help="Run every request line (stdio frame format) and write results to --out")
+    p.add_argument("--out", metavar="RESULTS_JSONL", help="Batch results file (appended, completion order)")
+    p.add_argument("--concurrency", type=int, default=8, help="Readings in flight during --batch")
+    p.add_argument("--checkpoint", help="Batch checkpoint file (default: <out>.ckpt)")
+    p.add_argument("--watch-kbs", type=float, metavar="SECONDS", default=KB_WATCH_INTERVAL,
+                   help="In --serve-stdio/--serve-http mode, poll data/*.json and hot-reload KBs (0 = off)")
+    p.add_argument("--startup-report", action="store_true",
+                   help="Print per-module cold import times (-X importtime) as JSON and exit")
+    p.add_argument("--archive-import", metavar="DIR",
+                   help="Load per-file readings from DIR into the readings archive and exit")
+    p.add_argument("--archive-export", metavar="PATH",
+                   help="Export archived readings to PATH (*.jsonl = one record per line, else per-file layout)")
+    p.add_argument("--since", help="--archive-export: first timestamp (ISO-8601 or reading id)")
+    p.add_argument("--until", help="--archive-export: end timestamp, exclusive")
+    p.add_argument("--archive-compact", nargs="?", const="", metavar="BEFORE",
+                   help="VACUUM the readings archive, dropping readings older than BEFORE if given")
     a = p.parse_args()
 
-    astro = load_json_if_exists(a.astro) or {"sun":"Leo 10°","moon":"Taurus 5°","asc":"Capricorn 12°"}
-    spread = load_json_if_exists(a.spread) or [
-        {"position":"Past","card":"The Hermit","orientation":"upright","element":"Earth"},
-        {"position":"Present","card":"The Lovers","orientation":"upright","element":"Air"},
-        {"position":"Future","card":"Ten of Stones","orientation":"upright","element":"Earth"}
-    ]
+    if a.startup_report:
+        print(json.dumps(startup_report(), indent=2))
+        return
 
-    # 1) Generate raw reading
-    reading = synthesize_reading(a.question, a.timeframe, astro, spread, a.model, a.temperature, a.num_predict)
+    if a.archive_import or a.archive_export or a.archive_compact is not None:
+        archive = get_readings_archive(a.outdir)
+        if a.archive_import:
+            print(f"✓ Imported {archive.import_files(a.archive_import)} readings into {archive.path}", file=sys.stderr)
+        if a.archive_export:
+            if a.archive_export.endswith(".jsonl"):
+                with open(a.archive_export, "w", encoding="utf-8") as f:
+                    n = archive.export_jsonl(f, since=a.since, until=a.until)
+            else:
+                n = archive.export_files(a.archive_export, since=a.since, until=a.until)
+            print(f"✓ Exported {n} readings to {a.archive_export}", file=sys.stderr)
+        if a.archive_compact is not None:
+            print(json.dumps(archive.compact(a.archive_compact or None), indent=2))
+        return
 
-    outdir = pathlib.Path(a.outdir); outdir.mkdir(exist_ok=True)
-    ts = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
-    raw_path = outdir / f"reading_{ts}_raw.json"
-    with open(raw_path, "w", encoding="utf-8") as f:
-        json.dump(reading, f, indent=2, ensure_ascii=False)
-    print(f"Saved raw reading to: {raw_path}", file=sys.stderr)
-
-    # 2) Optionally postprocess to non-dogmatic, Faith-aware, inclusive
-    if a.postprocess:
-        reading_fixed = postprocess_reading(
-            reading,
-            require_literal_faith=False,   # inclusive + non-dogmatic
-            enrich_actions=True,
-            inclusive_audit=True,
-            soft_rewrite=True,
-            max_actions=3  # Reduce to 3 action items
-        )
+    if a.batch:
+        if not a.out:
+            p.error("--batch requires --out")
+        summary = run_batch(a.batch, a.out, a.concurrency, a.checkpoint)
+        sys.exit(1 if summary["failed"] else 0)
 
-        fixed_path = outdir / f"reading_{ts}_fixed.json"
-        with open(fixed_path, "w", encoding="utf-8") as f:
-            json.dump(reading_fixed, f, indent=2, ensure_ascii=False)
-        print(f"Saved inclusive fixed reading to: {fixed_path}", file=sys.stderr)
+    if (a.serve_stdio or a.serve_http) and a.watch_kbs > 0:
+        start_kb_watcher(a.watch_kbs)
+    if a.serve_stdio:
+        serve_stdio(outdir=a.outdir, concurrency=a.worker_concurrency)
+        return
+    if a.serve_http:
+        serve_http(a.host, a.port, a.max_inflight, outdir=a.outdir)
+        return
 
-        # Print final (fixed) reading to stdout
-        print(json.dumps(reading_fixed, indent=2, ensure_ascii=False))
-    else:
-        # Print raw reading to stdout
-        print(json.dumps(reading, indent=2, ensure_ascii=False))
+    astro = load_json_if_exists(a.astro) or DEFAULT_ASTRO
+    spread = load_json_if_exists(a.spread) or DEFAULT_SPREAD
+
+    on_event = None
+    if a.stream:
+        def on_event(path, _value):
+            print(f"[stream] {path} ready", file=sys.stderr)
+    reading = run_reading(a.question, a.timeframe, astro, spread, a.model, a.temperature,
+                          a.num_predict, postprocess=a.postprocess, outdir=a.outdir, on_event=on_event,
+                          engine=a.engine, deadline=a.deadline, priority=a.priority)
+    print(json.dumps(reading, indent=2, ensure_ascii=False))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+revalidate_readings.py — Bulk re-validation of a readings archive
+-------------------------------------------------------------------------------
+Runs validate_reading_faith.validate() over every reading in a directory on a
+process pool, writes the fixed outputs and prints one aggregate JSON report:
+issue types, inclusive findings per rule, actions_enriched rate, safety notes.
+
+Each reading is validated from reading_<ts>_raw.json when present, otherwise
+its reading_<ts>_fixed.json is re-validated in place.
+
+USAGE
+  python scripts/revalidate_readings.py [READINGS_DIR] [--out-dir DIR] [--jobs N] \
+     [--changed-only] [--report report.json] [--no-write] \
+     [--[no-]require-faith-word] [--no-enrich-actions] [--no-inclusive-audit] [--[no-]soft-rewrite] \
+     [--max-affs 6] [--max-actions 3]
+
+Option defaults are validate_reading_faith.READER_OPTIONS, the options the reader's
+postprocess step applies, so rewritten *_fixed.json files match what it would produce.
+
+--changed-only skips readings whose source bytes and rules version (hash of the
+validator source + options) match the previous run, recorded in
+READINGS_DIR/.revalidate_state.json.
+"""
+
+from __future__ import annotations
+import json, argparse, sys, re, time, hashlib, os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import validate_reading_faith as vrf
+
+STATE_FILE = ".revalidate_state.json"
+
+# ------------------------------- Selection --------------------------------
+
+def rules_version(options: Dict[str, Any]) -> str:
+    """Hash of the validator source and the effective options; changes whenever the rules do."""
+    h = hashlib.sha256(Path(vrf.__file__).read_bytes())
+    opts = dict(vrf.DEFAULT_OPTIONS)
+    opts.update(options or {})
+    h.update(json.dumps(opts, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def find_sources(readings_dir: Path) -> List[Path]:
+    """One source per reading stem: the _raw file when there is one, else the _fixed file."""
+    stems: Dict[str, Path] = {}
+    for path in sorted(readings_dir.glob("reading_*_fixed.json")):
+        stems.setdefault(path.name[:-len("_fixed.json")], path)
+    for path in sorted(readings_dir.glob("reading_*_raw.json")):
+        stems[path.name[:-len("_raw.json")]] = path
+    return [stems[k] for k in sorted(stems)]
+
+def fixed_path_for(source: Path, out_dir: Path) -> Path:
+    stem = re.sub(r"_(raw|fixed)\.json$", "", source.name)
+    return out_dir / f"{stem}_fixed.json"
+
+def load_state(readings_dir: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((readings_dir / STATE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"files": {}}
+
+def save_state(readings_dir: Path, state: Dict[str, Any]):
+    path = readings_dir / STATE_FILE
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+# -------------------------------- Worker ----------------------------------
+
+def revalidate_one(task) -> Dict[str, Any]:
+    """Validate one file (runs in a pool worker). Returns its report or error plus the source hash."""
+    source, out_path, options, write = task
+    try:
+        data = Path(source).read_bytes()
+        fixed, report = vrf.validate(json.loads(data), options)
+        digest = hashlib.sha256(data).hexdigest()
+        if write:
+            out = json.dumps(fixed, indent=2, ensure_ascii=False).encode("utf-8")
+            Path(out_path).write_bytes(out)
+            if Path(out_path) == Path(source):
+                digest = hashlib.sha256(out).hexdigest()
+        return {"source": Path(source).name, "ok": True, "report": report, "sha256": digest}
+    except Exception as e:
+        return {"source": Path(source).name, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+# ------------------------------ Aggregation -------------------------------
+
+def issue_type(issue: str) -> str:
+    """'majors_count mismatch: found 2 ...' -> 'majors_count mismatch'; 'trimmed to max=6.' -> 'trimmed to max'."""
+    return re.split(r"[:=]", issue, maxsplit=1)[0].strip().rstrip(".")
+
+class Aggregate:
+    def __init__(self):
+        self.processed = 0
+        self.enriched = 0
+        self.issues: Counter = Counter()
+        self.rules: Counter = Counter()
+        self.safety: Counter = Counter()
+        self.intents: Counter = Counter()
+        self.failed: List[Dict[str, str]] = []
+
+    def add(self, result: Dict[str, Any]):
+        if not result["ok"]:
+            self.failed.append({"source": result["source"], "error": result["error"]})
+            return
+        report = result["report"]
+        self.processed += 1
+        self.enriched += bool(report.get("actions_enriched"))
+        self.issues.update(issue_type(i) for i in report.get("issues_found", []))
+        self.rules.update(f.get("rule", "unknown") for f in report.get("inclusive_findings", []))
+        self.safety.update(report.get("safety_notes", []))
+        self.intents.update(i["intent"] for i in report.get("intents", []))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "issues_by_type": dict(self.issues.most_common()),
+            "findings_by_rule": dict(self.rules.most_common()),
+            "actions_enriched_rate": round(self.enriched / self.processed, 4) if self.processed else 0.0,
+            "safety_notes": dict(self.safety.most_common()),
+            "intents": dict(self.intents.most_common()),
+        }
+
+# -------------------------------- Runner ----------------------------------
+
+def revalidate(readings_dir, out_dir=None, options: Optional[Dict[str, Any]] = None, jobs: int = 0,
+               changed_only: bool = False, write: bool = True, progress=None) -> Dict[str, Any]:
+    """
+    Re-validate every reading under readings_dir; returns the aggregate report.
+    options override vrf.READER_OPTIONS, the ones the reader's postprocess step uses.
+    jobs=0 uses one worker per CPU; jobs=1 runs in-process.
+    progress(done, total) is called as results arrive (default: stderr line every ~5%).
+    """
+    readings_dir = Path(readings_dir)
+    out_dir = Path(out_dir) if out_dir else readings_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    options = dict(vrf.READER_OPTIONS, **(options or {}))
+    version = rules_version(options)
+    state = load_state(readings_dir)
+    known = state.get("files", {}) if state.get("rules_version") == version else {}
+
+    sources = find_sources(readings_dir)
+    tasks, skipped = [], 0
+    for src in sources:
+        if changed_only and src.name in known:
+            if known[src.name] == hashlib.sha256(src.read_bytes()).hexdigest():
+                skipped += 1
+                continue
+        tasks.append((str(src), str(fixed_path_for(src, out_dir)), options, write))
+
+    total = len(tasks)
+    step = max(1, total // 20)
+    if progress is None:
+        def progress(done, n):
+            if done == n or done % step == 0:
+                rate = done / max(time.perf_counter() - started, 1e-9)
+                print(f"[revalidate] {done}/{n} ({done * 100 // max(n, 1)}%) {rate:.1f} files/s", file=sys.stderr)
+
+    agg = Aggregate()
+    files = dict(known)
+    started = time.perf_counter()
+
+    def collect(results):
+        for done, result in enumerate(results, 1):
+            agg.add(result)
+            if result["ok"]:
+                files[result["source"]] = result["sha256"]
+            progress(done, total)
+
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or total <= 1:
+        collect(map(revalidate_one, tasks))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, total)) as pool:
+            collect(pool.map(revalidate_one, tasks, chunksize=max(1, total // (workers * 4))))
+    elapsed = time.perf_counter() - started
+
+    if write:
+        save_state(readings_dir, {"rules_version": version, "files": files})
+
+    report = {
+        "rules_version": version,
+        "files_total": len(sources),
+        "skipped_unchanged": skipped,
+        "elapsed_s": round(elapsed, 3),
+        "files_per_s": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+    report.update(agg.summary())
+    return report
+
+# ------------------------------- Main Flow --------------------------------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("readings_dir", nargs="?", default="readings", help="Directory of reading_*_{raw,fixed}.json")
+    ap.add_argument("--out-dir", help="Where to write *_fixed.json (default: the readings directory)")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes (default: CPU count; 1 = in-process)")
+    ap.add_argument("--changed-only", action="store_true",
+                    help="Skip readings unchanged since the last run under the same rules version")
+    ap.add_argument("--report", help="Also write the aggregate report to this path")
+    ap.add_argument("--no-write", action="store_true", help="Validate and report only; write no files")
+    # Defaults are the reader's postprocess options, so rewritten files match live readings
+    defaults = vrf.READER_OPTIONS
+    ap.add_argument("--require-faith-word", action=argparse.BooleanOptionalAction,
+                    default=defaults["require_faith_word"])
+    ap.add_argument("--no-enrich-actions", action="store_true")
+    ap.add_argument("--no-inclusive-audit", action="store_true")
+    ap.add_argument("--soft-rewrite", action=argparse.BooleanOptionalAction, default=defaults["soft_rewrite"])
+    ap.add_argument("--max-affs", type=int, default=defaults["max_affs"])
+    ap.add_argument("--max-actions", type=int, default=defaults["max_actions"])
+    args = ap.parse_args()
+
+    report = revalidate(args.readings_dir, args.out_dir, {
+        "require_faith_word": args.require_faith_word,
+        "enrich_actions": not args.no_enrich_actions,
+        "inclusive_audit": not args.no_inclusive_audit,
+        "soft_rewrite": args.soft_rewrite,
+        "max_affs": args.max_affs,
+        "max_actions": args.max_actions,
+    }, jobs=args.jobs, changed_only=args.changed_only, write=not args.no_write)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.report:
+        Path(args.report).write_text(text, encoding="utf-8")
+    print(text)
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
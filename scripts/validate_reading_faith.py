@@ -21,12 +21,15 @@ USAGE
      [--max-affs 6] [--max-actions 12]
 
 Exit code 0 on success. Writes fixed JSON to OUTPUT and prints audit report to stdout.
+
+In-process:  fixed, report = validate(reading, {"soft_rewrite": True, "max_actions": 3})
 """
 
 from __future__ import annotations
 import json, argparse, sys, copy, re, datetime
 from pathlib import Path
 from typing import Any, Dict, List
+from functools import lru_cache
 
 # ----------------------------- Strict Schema -----------------------------
 
@@ -108,25 +111,38 @@ REWRITE_RULES = [
     (r"\bworthless\b|\bidiot(ic)?\b|\bstupid\b|\bhopeless\b", "unhelpful")
 ]
 
+# Rule id and SUGGESTIONS key per EXCLUSIONARY_PATTERNS / REWRITE_RULES entry (same order)
+INCLUSIVE_RULES = [
+    ("only_true_path", "only true path"),
+    ("one_true", "one true"),
+    ("heresy", "heresy"),
+    ("blasphemy", "blasphemy"),
+    ("anathema", "anathema"),
+    ("damnation", "damnation/hellfire"),
+    ("ashamed", "should be ashamed/shameful"),
+    ("shameful", "should be ashamed/shameful"),
+    ("toxicity", "toxicity"),
+]
+
 # -------------------------- Intent + Action Sets -------------------------
 
-INTENT_PATTERNS = {
-    "career": re.compile(r"\b(career|job|work|promotion|manager|lead|stakeholder|roadmap|deliverable|deadline)\b", re.I),
-    "early_career": re.compile(r"\b(intern(ship)?|first\s+job|entry[-\s]?level|junior|college|university|grad(uate)?|fresh\s*grad)\b", re.I),
-    "relationships": re.compile(r"\b(relationship|team|partner|collaborat(e|ion)|conflict|boundar(y|ies))\b", re.I),
-    "money": re.compile(r"\b(finance|salary|comp(ensation)?|budget|savings|debt|rate|pricing|offer|negotiat(e|ion))\b", re.I),
-    "wellbeing": re.compile(r"\b(burnout|overwhelmed|exhaust(ed|ion)|rest|self[-\s]?care|balance|stress|anxiety)\b", re.I),
-    "study": re.compile(r"\b(study|exam|course|class|learn|certificate|bootcamp|syllabus|thesis|paper)\b", re.I),
-    "creativity": re.compile(r"\b(portfolio|creative|publish|post|article|design|prototype|draft|compose|record)\b", re.I),
-    "spiritual": re.compile(r"\b(meaning|purpose|faith|trust|presence|blessing|grace|conscience|gratitude)\b", re.I),
+INTENT_PATTERN_SOURCES = {
+    "career": r"\b(career|job|work|promotion|manager|lead|stakeholder|roadmap|deliverable|deadline)\b",
+    "early_career": r"\b(intern(ship)?|first\s+job|entry[-\s]?level|junior|college|university|grad(uate)?|fresh\s*grad)\b",
+    "relationships": r"\b(relationship|team|partner|collaborat(e|ion)|conflict|boundar(y|ies))\b",
+    "money": r"\b(finance|salary|comp(ensation)?|budget|savings|debt|rate|pricing|offer|negotiat(e|ion))\b",
+    "wellbeing": r"\b(burnout|overwhelmed|exhaust(ed|ion)|rest|self[-\s]?care|balance|stress|anxiety)\b",
+    "study": r"\b(study|exam|course|class|learn|certificate|bootcamp|syllabus|thesis|paper)\b",
+    "creativity": r"\b(portfolio|creative|publish|post|article|design|prototype|draft|compose|record)\b",
+    "spiritual": r"\b(meaning|purpose|faith|trust|presence|blessing|grace|conscience|gratitude)\b",
 
     # NEW broader domains
-    "sports": re.compile(r"\b(sport|athlet(ic|e|ics)|game|match|meet|race|tournament|league|season|practice|drill|coach|team|playoffs?)\b", re.I),
-    "fitness": re.compile(r"\b(fitness|training|workout|cardio|strength|mobility|endurance|conditioning|recovery|nutrition)\b", re.I),
-    "travel": re.compile(r"\b(travel|trip|itinerary|flight|visa|lodging|hotel|packing|packing\s*list|route|transport)\b", re.I),
-    "productivity": re.compile(r"\b(productivity|focus|time\s*block|calendar|ritual|habit|okrs?|goals?)\b", re.I),
-    "entrepreneurship": re.compile(r"\b(startup|founder|mvp|product[-\s]?market\s*fit|pitch|deck|fund(ing|raise)|customer|sales)\b", re.I),
-    "parenting": re.compile(r"\b(parent|child|kids?|toddler|teen|school|homework|screen\s*time|bedtime)\b", re.I),
+    "sports": r"\b(sport|athlet(ic|e|ics)|game|match|meet|race|tournament|league|season|practice|drill|coach|team|playoffs?)\b",
+    "fitness": r"\b(fitness|training|workout|cardio|strength|mobility|endurance|conditioning|recovery|nutrition)\b",
+    "travel": r"\b(travel|trip|itinerary|flight|visa|lodging|hotel|packing|packing\s*list|route|transport)\b",
+    "productivity": r"\b(productivity|focus|time\s*block|calendar|ritual|habit|okrs?|goals?)\b",
+    "entrepreneurship": r"\b(startup|founder|mvp|product[-\s]?market\s*fit|pitch|deck|fund(ing|raise)|customer|sales)\b",
+    "parenting": r"\b(parent|child|kids?|toddler|teen|school|homework|screen\s*time|bedtime)\b",
 }
 
 ACTION_SETS = {
@@ -216,36 +232,145 @@ ASTRO_THEME_BOOSTS = {
 
 # ---------------------------- Safety Flags -------------------------------
 
-SAFETY_FLAGS = [
-    (re.compile(r"\b(injury|rehab|tear|sprain|concussion|fracture|pain|inflammation)\b", re.I),
+SAFETY_FLAG_SOURCES = [
+    (r"\b(injury|rehab|tear|sprain|concussion|fracture|pain|inflammation)\b",
      "Sports injury indicators detected. Encourage consulting a qualified medical professional; avoid medical protocols."),
-    (re.compile(r"\b(diagnos(e|is)|prescribe|medication|dosage|treatment\s*plan)\b", re.I),
+    (r"\b(diagnos(e|is)|prescribe|medication|dosage|treatment\s*plan)\b",
      "Clinical language detected. Avoid medical advice; suggest seeking licensed care."),
-    (re.compile(r"\b(contract|legal|lawsuit|liability|attorney|negligence)\b", re.I),
+    (r"\b(contract|legal|lawsuit|liability|attorney|negligence)\b",
      "Legal topic detected. Avoid legal advice; suggest consulting a licensed attorney."),
-    (re.compile(r"\b(invest(ing|ment)|securities|stock|crypto|retirement|tax)\b", re.I),
+    (r"\b(invest(ing|ment)|securities|stock|crypto|retirement|tax)\b",
      "Financial topic detected. Avoid personalized financial advice; suggest consulting a fiduciary professional.")
 ]
 
+# ------------------------- Lazily Compiled Tables ------------------------
+# Patterns compile on first use so importing the validator stays cheap.
+# INTENT_PATTERNS / SAFETY_FLAGS / SMART_FIXES remain module attributes (PEP 562).
+
+@lru_cache(maxsize=None)
+def _intent_patterns() -> Dict[str, "re.Pattern[str]"]:
+    return {name: re.compile(pat, re.I) for name, pat in INTENT_PATTERN_SOURCES.items()}
+
+@lru_cache(maxsize=None)
+def _intent_scanner() -> "re.Pattern[str]":
+    """
+    Every intent pattern in one alternation, so a (lower-cased) text is scanned once.
+    The shared leading \\b is hoisted into a word-start guard so only word starts are tried.
+    """
+    bodies = []
+    for pat in INTENT_PATTERN_SOURCES.values():
+        if pat.startswith(r"\b"):
+            pat = pat[2:]
+        if pat.endswith(r"\b"):
+            pat = pat[:-2]
+        bodies.append(f"(?:{pat})")
+    return re.compile(r"(?<!\w)(?=[a-z])(?:" + "|".join(bodies) + r")\b")
+
+@lru_cache(maxsize=8192)
+def _intents_for_hit(phrase: str) -> tuple:
+    """Intents occurring in one matched phrase ("first job" -> career + early_career)."""
+    return tuple(name for name, rx in _intent_patterns().items() if rx.search(phrase))
+
+@lru_cache(maxsize=None)
+def _astro_boost_scanner() -> "re.Pattern[str]":
+    return re.compile("|".join(re.escape(k) for k in ASTRO_THEME_BOOSTS))
+
+@lru_cache(maxsize=None)
+def _safety_flags() -> List[tuple]:
+    return [(re.compile(pat, re.I), msg) for pat, msg in SAFETY_FLAG_SOURCES]
+
+@lru_cache(maxsize=None)
+def _smart_fixes() -> List[tuple]:
+    return [(re.compile(pat, re.I), tip) for pat, tip in SMART_FIX_SOURCES]
+
+class InclusiveScanner:
+    """
+    All inclusive-language rules compiled into one alternation, used as a single-pass
+    prefilter: clean strings (nearly all of them) are scanned once however many rules
+    there are. A string it flags is rescanned rule by rule, since one leftmost alternation
+    drops overlapping or adjacent hits of different rules; rewrites likewise apply
+    REWRITE_RULES in order, as soft_rewrite_text always has.
+    """
+
+    def __init__(self, rules=None, audit_patterns=None, rewrite_rules=None):
+        rules = rules or INCLUSIVE_RULES
+        audit_patterns = audit_patterns or EXCLUSIONARY_PATTERNS
+        rewrite_rules = rewrite_rules or REWRITE_RULES
+        self.suggestion_keys = {rid: key for rid, key in rules}
+        self.patterns = {rid: pat for (rid, _), pat in zip(rules, audit_patterns)}
+        self._audit_rules = [(rid, re.compile(pat, re.I)) for (rid, _), pat in zip(rules, audit_patterns)]
+        self._rewrite_rules = [(re.compile(pat, re.I), sub) for pat, sub in rewrite_rules]
+        self._audit = re.compile("|".join(f"(?:{pat})" for pat in audit_patterns), re.I)
+        self._rewrite = re.compile("|".join(f"(?:{pat})" for pat, _ in rewrite_rules), re.I)
+
+    def scan(self, text: str) -> List[tuple]:
+        """[(rule_id, start, end)] for every hit of every rule, ordered by position."""
+        if not self._audit.search(text):
+            return []
+        hits = [(rid, m.start(), m.end()) for rid, rx in self._audit_rules for m in rx.finditer(text)]
+        return sorted(hits, key=lambda hit: (hit[1], hit[2]))
+
+    def rewrite(self, text: str) -> str:
+        if not self._rewrite.search(text):
+            return text
+        for rx, sub in self._rewrite_rules:
+            text = rx.sub(sub, text)
+        return text
+
+@lru_cache(maxsize=None)
+def _inclusive_scanner() -> InclusiveScanner:
+    return InclusiveScanner()
+
+_LAZY_TABLES = {"INTENT_PATTERNS": _intent_patterns, "SAFETY_FLAGS": _safety_flags, "SMART_FIXES": _smart_fixes}
+
+def __getattr__(name: str):
+    if name in _LAZY_TABLES:
+        return _LAZY_TABLES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # ---------------------------- Helper Functions ---------------------------
 
+@lru_cache(maxsize=4096)
+def classify_intents(text: str) -> tuple:
+    """
+    Ranked ((intent, hits), ...) for text from a single scan: most hits first,
+    ties in INTENT_PATTERN_SOURCES order. Results are cached by text.
+    """
+    counts: Dict[str, int] = {}
+    for m in _intent_scanner().finditer(text.lower()):
+        for name in _intents_for_hit(m.group()):
+            counts[name] = counts.get(name, 0) + 1
+    order = {name: i for i, name in enumerate(INTENT_PATTERN_SOURCES)}
+    return tuple(sorted(counts.items(), key=lambda kv: (-kv[1], order[kv[0]])))
+
+def describe_intents(ranked) -> str:
+    """Plain summary of ranked intents, e.g. "mostly career, a little wellbeing"."""
+    total = sum(hits for _, hits in ranked)
+    parts = []
+    for name, hits in ranked:
+        share = hits / total
+        label = "mostly" if share >= 0.5 else "some" if share >= 0.25 else "a little"
+        parts.append(f"{label} {name.replace('_', ' ')}")
+    return ", ".join(parts)
+
+def _intent_text(meta_question: str, interp_theme: str, astro_themes: List[str]) -> str:
+    return " ".join([meta_question or "", interp_theme or "", " ".join(astro_themes or [])])
+
 def detect_intents(meta_question: str, interp_theme: str, astro_themes: List[str]) -> List[str]:
-    text = " ".join([meta_question or "", interp_theme or "", " ".join(astro_themes or [])])
-    matches = []
-    for name, rx in INTENT_PATTERNS.items():
-        if rx.search(text):
-            matches.append(name)
+    """Matched intents, strongest first."""
+    matches = [name for name, _ in classify_intents(_intent_text(meta_question, interp_theme, astro_themes))]
     # If no matches but looks career-ish, include career
-    if not matches and INTENT_PATTERNS["career"].search(meta_question or ""):
+    if not matches and _intent_patterns()["career"].search(meta_question or ""):
         matches.append("career")
     return matches
 
 def boost_from_astro(astro_themes: List[str]) -> List[str]:
     boosts = []
+    scanner = _astro_boost_scanner()
     for t in astro_themes or []:
-        t_low = t.lower()
+        found = set(scanner.findall(t.lower()))
         for key, items in ASTRO_THEME_BOOSTS.items():
-            if key in t_low:
+            if key in found:
                 boosts.extend(items)
     return boosts
 
@@ -316,68 +441,69 @@ def contains_broad(text):
     t = (text or "").lower()
     return any(term in t for term in BROAD_TERMS)
 
+def _walk_strings(node, prefix=""):
+    """Yield (path, parent, key, text) for every string leaf under node."""
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        return
+    for k, v in items:
+        path = (f"{prefix}.{k}" if prefix else k) if isinstance(node, dict) else f"{prefix}[{k}]"
+        if isinstance(v, str):
+            yield path, node, k, v
+        else:
+            yield from _walk_strings(v, path)
+
+def scan_inclusive(obj):
+    """
+    One scanner pass per string. Returns (findings, flagged): one finding per
+    (path, rule) with the span of its first hit, and the (parent, key) slots to rewrite.
+    """
+    scanner = _inclusive_scanner()
+    findings, flagged = [], []
+    for path, parent, key, text in _walk_strings(obj):
+        hits = scanner.scan(text)
+        if not hits:
+            continue
+        flagged.append((parent, key))
+        seen = set()
+        for rule, start, end in hits:
+            if rule in seen:
+                continue
+            seen.add(rule)
+            findings.append({
+                "path": path,
+                "rule": rule,
+                "span": [start, end],
+                "excerpt": text[:240],
+                "pattern": scanner.patterns[rule],
+                "suggestion": SUGGESTIONS.get(scanner.suggestion_keys[rule],
+                                              "Consider inclusive, invitational phrasing.")
+            })
+    return findings, flagged
+
 def inclusive_audit(obj):
     """Scan strings for exclusionary/toxic patterns. Return findings."""
-    findings = []
-    paths_to_text = []
-
-    def collect(prefix, node):
-        if isinstance(node, dict):
-            for k, v in node.items():
-                collect(f"{prefix}.{k}" if prefix else k, v)
-        elif isinstance(node, list):
-            for i, v in enumerate(node):
-                collect(f"{prefix}[{i}]", v)
-        else:
-            if isinstance(node, str):
-                paths_to_text.append((prefix, node))
-
-    collect("", obj)
-    for path, text in paths_to_text:
-        low = text.lower()
-        for pat in EXCLUSIONARY_PATTERNS:
-            if re.search(pat, low):
-                key = "toxicity"
-                if "only\\s+true\\s+path" in pat:
-                    key = "only true path"
-                elif "\\bone\\s+true\\b" in pat:
-                    key = "one true"
-                elif "heresy" in pat:
-                    key = "heresy"
-                elif "blasphem" in pat:
-                    key = "blasphemy"
-                elif "anathema" in pat:
-                    key = "anathema"
-                elif "damn" in pat or "hellfire" in pat:
-                    key = "damnation/hellfire"
-                elif "ashamed" in pat or "shameful" in pat:
-                    key = "should be ashamed/shameful"
-                findings.append({
-                    "path": path,
-                    "excerpt": text[:240],
-                    "pattern": pat,
-                    "suggestion": SUGGESTIONS.get(key, "Consider inclusive, invitational phrasing.")
-                })
-    return findings
+    return scan_inclusive(obj)[0]
 
 def soft_rewrite_text(text):
-    new = text
-    for pat, sub in REWRITE_RULES:
-        new = re.sub(pat, sub, new, flags=re.IGNORECASE)
-    return new
-
-def deep_soft_rewrite(obj):
-    if isinstance(obj, dict):
-        return {k: deep_soft_rewrite(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [deep_soft_rewrite(v) for v in obj]
-    elif isinstance(obj, str):
-        return soft_rewrite_text(obj)
-    return obj
+    return _inclusive_scanner().rewrite(text)
+
+def rewrite_flagged(flagged) -> int:
+    """Soft-rewrite only the flagged (parent, key) string slots, in place. Returns strings changed."""
+    changed = 0
+    for parent, key in flagged:
+        new = soft_rewrite_text(parent[key])
+        if new != parent[key]:
+            parent[key] = new
+            changed += 1
+    return changed
 
 def soft_safety_scan(text_blob: str) -> list[str]:
     notes = []
-    for rx, msg in SAFETY_FLAGS:
+    for rx, msg in _safety_flags():
         if rx.search(text_blob):
             notes.append(msg)
     # de-dupe keep order
@@ -387,27 +513,52 @@ def soft_safety_scan(text_blob: str) -> list[str]:
             seen.add(n); out.append(n)
     return out
 
-# ------------------------------- Main Flow --------------------------------
+# ------------------------------ SMART Actions -----------------------------
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("in_path", help="Input reading JSON")
-    ap.add_argument("out_path", help="Output path for fixed JSON")
-    ap.add_argument("--no-require-faith-word", action="store_true",
-                    help="Do not require the literal word 'faith' (still checks for broad spiritual language)")
-    ap.add_argument("--no-enrich-actions", action="store_true",
-                    help="Do not add practical actions if missing or vague")
-    ap.add_argument("--no-inclusive-audit", action="store_true",
-                    help="Skip inclusive language audit (not recommended)")
-    ap.add_argument("--soft-rewrite", action="store_true",
-                    help="Autorewrite flagged phrases to neutral/inclusive alternatives (very conservative)")
-    ap.add_argument("--max-affs", type=int, default=6, help="Max affirmations to keep (deduped)")
-    ap.add_argument("--max-actions", type=int, default=12, help="Max action items to keep (deduped)")
-    args = ap.parse_args()
+SMART_FIX_SOURCES = [
+    (r"^\s*(be|stay|become)\s+\w+",
+     "Define one observable behavior and schedule it this week."),
+    (r"^\s*(improve|increase|reduce)\s+\w+",
+     "Quantify the change and set a 7-day target you can measure."),
+    (r"\b(someday|soon|eventually)\b",
+     "Replace with a real date or a 48-hour first step.")
+]
 
-    data = json.loads(Path(args.in_path).read_text(encoding="utf-8"))
+def smartify(items: list[str]) -> list[str]:
+    out = []
+    for it in items:
+        fixed_line = it
+        for rx, tip in _smart_fixes():
+            if rx.search(fixed_line):
+                fixed_line = f"{fixed_line} — {tip}"
+        out.append(fixed_line)
+    return out
+
+# ------------------------------- Validation -------------------------------
+
+DEFAULT_OPTIONS = {
+    "require_faith_word": True,
+    "enrich_actions": True,
+    "inclusive_audit": True,
+    "soft_rewrite": False,
+    "max_affs": 6,
+    "max_actions": 12,
+}
+
+# What the reader's postprocess step applies (non-dogmatic, soft rewrites, 3 actions);
+# revalidate_readings.py defaults to the same, so a bulk re-run reproduces live output
+READER_OPTIONS = dict(DEFAULT_OPTIONS, require_faith_word=False, soft_rewrite=True, max_actions=3)
 
-    fixed = coerce_schema(copy.deepcopy(data))
+def validate(reading: Dict[str, Any], options: Dict[str, Any] | None = None):
+    """
+    Validate and repair one reading in memory.
+    Returns (fixed, report); `reading` itself is left untouched.
+    Options mirror the CLI flags (see DEFAULT_OPTIONS).
+    """
+    opts = dict(DEFAULT_OPTIONS)
+    opts.update(options or {})
+
+    fixed = coerce_schema(copy.deepcopy(reading))
     issues = []
 
     # Meta defaults & timestamp sanity
@@ -435,7 +586,7 @@ def main():
     affs = interp.get("affirmations", []) or []
     faith_ok = (contains_broad(theme) or any(contains_broad(a) for a in affs))
 
-    literal_required = not args.no_require_faith_word
+    literal_required = opts["require_faith_word"]
     literal_present = ("faith" in (theme or "").lower()) or any("faith" in (a or "").lower() for a in affs)
 
     literal_added = False
@@ -445,20 +596,23 @@ def main():
 
     # Affirmation dedupe and clamp
     affs = dedupe_keep_order(affs)
-    if len(affs) > args.max_affs:
-        issues.append(f"affirmations trimmed to max={args.max_affs}.")
-        affs = affs[:args.max_affs]
+    if len(affs) > opts["max_affs"]:
+        issues.append(f"affirmations trimmed to max={opts['max_affs']}.")
+        affs = affs[:opts["max_affs"]]
     fixed["interpretation"]["affirmations"] = affs
 
     # 4) Action enrichment (intent-aware)
     actions = interp.get("action_items", []) or []
     enriched = False
-    if not args.no_enrich_actions:
-        intents = detect_intents(
+    ranked_intents = ()
+    if opts["enrich_actions"]:
+        intent_args = dict(
             meta_question=fixed.get("meta", {}).get("question", ""),
             interp_theme=interp.get("theme", ""),
             astro_themes=fixed.get("astro_summary", {}).get("themes", [])
         )
+        intents = detect_intents(**intent_args)
+        ranked_intents = classify_intents(_intent_text(**intent_args))
         selected = []
         if "early_career" in intents:
             selected.extend(ACTION_SETS["early_career"])
@@ -474,38 +628,21 @@ def main():
             enriched = True
 
     # SMART-ify vague actions (gentle tips appended)
-    SMART_FIXES = [
-        (re.compile(r"^\s*(be|stay|become)\s+\w+", re.I),
-         "Define one observable behavior and schedule it this week."),
-        (re.compile(r"^\s*(improve|increase|reduce)\s+\w+", re.I),
-         "Quantify the change and set a 7-day target you can measure."),
-        (re.compile(r"\b(someday|soon|eventually)\b", re.I),
-         "Replace with a real date or a 48-hour first step.")
-    ]
-    def smartify(items: list[str]) -> list[str]:
-        out = []
-        for it in items:
-            fixed_line = it
-            for rx, tip in SMART_FIXES:
-                if rx.search(fixed_line):
-                    fixed_line = f"{fixed_line} — {tip}"
-            out.append(fixed_line)
-        return out
     if actions:
         actions = smartify(actions)
 
     # Clamp actions
-    if len(actions) > args.max_actions:
-        issues.append(f"action_items trimmed to max={args.max_actions}.")
-        actions = actions[:args.max_actions]
+    if len(actions) > opts["max_actions"]:
+        issues.append(f"action_items trimmed to max={opts['max_actions']}.")
+        actions = actions[:opts["max_actions"]]
     fixed["interpretation"]["action_items"] = actions
 
     # 5) Inclusive audit (report or soft rewrite)
     audit_findings = []
-    if not args.no_inclusive_audit:
-        audit_findings = inclusive_audit(fixed)
-        if args.soft_rewrite and audit_findings:
-            fixed = deep_soft_rewrite(fixed)
+    if opts["inclusive_audit"]:
+        audit_findings, flagged = scan_inclusive(fixed)
+        if opts["soft_rewrite"] and flagged:
+            rewrite_flagged(flagged)
 
     # 6) Confidence normalization
     conf = fixed.setdefault("confidence", {"overall": 0.0, "notes": ""})
@@ -535,10 +672,41 @@ def main():
         "faith_language_present": bool(faith_ok or literal_present),
         "literal_faith_added": literal_added,
         "actions_enriched": enriched,
+        "intents": [{"intent": name, "hits": hits} for name, hits in ranked_intents],
+        "intent_summary": describe_intents(ranked_intents),
         "inclusive_findings_count": len(audit_findings),
         "inclusive_findings": audit_findings[:50],
         "safety_notes": safety_notes
     }
+    return fixed, report
+
+# ------------------------------- Main Flow --------------------------------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("in_path", help="Input reading JSON")
+    ap.add_argument("out_path", help="Output path for fixed JSON")
+    ap.add_argument("--no-require-faith-word", action="store_true",
+                    help="Do not require the literal word 'faith' (still checks for broad spiritual language)")
+    ap.add_argument("--no-enrich-actions", action="store_true",
+                    help="Do not add practical actions if missing or vague")
+    ap.add_argument("--no-inclusive-audit", action="store_true",
+                    help="Skip inclusive language audit (not recommended)")
+    ap.add_argument("--soft-rewrite", action="store_true",
+                    help="Autorewrite flagged phrases to neutral/inclusive alternatives (very conservative)")
+    ap.add_argument("--max-affs", type=int, default=6, help="Max affirmations to keep (deduped)")
+    ap.add_argument("--max-actions", type=int, default=12, help="Max action items to keep (deduped)")
+    args = ap.parse_args()
+
+    data = json.loads(Path(args.in_path).read_text(encoding="utf-8"))
+    fixed, report = validate(data, {
+        "require_faith_word": not args.no_require_faith_word,
+        "enrich_actions": not args.no_enrich_actions,
+        "inclusive_audit": not args.no_inclusive_audit,
+        "soft_rewrite": args.soft_rewrite,
+        "max_affs": args.max_affs,
+        "max_actions": args.max_actions,
+    })
 
     Path(args.out_path).write_text(json.dumps(fixed, indent=2, ensure_ascii=False), encoding="utf-8")
     print(json.dumps(report, indent=2, ensure_ascii=False))
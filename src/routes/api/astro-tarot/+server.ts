@@ -1,6 +1,8 @@
 import { json, error } from '@sveltejs/kit';
 import type { RequestHandler } from '@sveltejs/kit';
 import { spawn, execSync } from 'child_process';
+import type { ChildProcess } from 'child_process';
+import { createInterface } from 'readline';
 import { join } from 'path';
 
 // Detect if running in serverless environment
@@ -185,7 +187,7 @@ function executePythonScript(payload: AstroTarotRequest): Promise<PythonOutput>
       '--timeframe', payload.timeframe,
       '--model', payload.model || 'gpt-4o-mini',
       '--temperature', String(payload.temperature || 0.2),
-      '--num-predict', String(payload.num_predict || 1500),
+      '--num-predict', String(payload.num_predict || 0),
       '--postprocess', // Enable postprocessing with faith-aware validator
     ];
 
@@ -238,6 +240,211 @@ function executePythonScript(payload: AstroTarotRequest): Promise<PythonOutput>
   });
 }
 
+// Persistent reader workers: a small pool of long-lived `astro_tarot_reader.py --serve-stdio`
+// processes keeps KBs, the HTTP pool and the response cache warm. Each worker runs up to
+// WORKER_CONCURRENCY requests at once and answers with id-tagged frames that may arrive out
+// of order. Requests go to the least-loaded worker and wait while every worker is full.
+// A worker whose request times out is retired: it takes no new requests and is killed once
+// its remaining requests settle. Set ASTRO_TAROT_WORKER=0 to spawn one process per reading.
+interface WorkerFrame {
+  id: number | null;
+  ok: boolean;
+  event?: string;
+  path?: string;
+  value?: unknown;
+  result?: PythonOutput;
+  error?: string;
+}
+
+interface PendingRequest {
+  resolve: (value: PythonOutput) => void;
+  reject: (reason: Error) => void;
+  timer: ReturnType<typeof setTimeout>;
+}
+
+interface ReaderWorker {
+  proc: ChildProcess;
+  pending: Map<number, PendingRequest>;
+  retired: boolean;
+}
+
+function envInt(name: string, fallback: number): number {
+  const value = Number.parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const WORKER_POOL_SIZE = envInt('ASTRO_TAROT_WORKERS', 2);
+const WORKER_CONCURRENCY = envInt('ASTRO_TAROT_WORKER_CONCURRENCY', 8);
+// Python bounds each reading with READING_DEADLINE (300 s); this only catches a stuck worker
+const WORKER_REQUEST_TIMEOUT_MS = envInt('ASTRO_TAROT_WORKER_TIMEOUT_MS', 330000);
+
+const workers: ReaderWorker[] = [];
+const waiting: Array<() => void> = [];
+let nextRequestId = 1;
+
+function wakeWaiters(all = false) {
+  do {
+    const wake = waiting.shift();
+    if (!wake) return;
+    wake();
+  } while (all);
+}
+
+function dropWorker(worker: ReaderWorker) {
+  const index = workers.indexOf(worker);
+  if (index >= 0) workers.splice(index, 1);
+}
+
+function settle(worker: ReaderWorker, id: number): PendingRequest | undefined {
+  const entry = worker.pending.get(id);
+  if (!entry) return undefined;
+  worker.pending.delete(id);
+  clearTimeout(entry.timer);
+  if (worker.retired && worker.pending.size === 0) {
+    worker.proc.kill();
+  }
+  wakeWaiters();
+  return entry;
+}
+
+function retire(worker: ReaderWorker, reason: string) {
+  if (worker.retired) return;
+  console.warn(`[astro-tarot worker] Retiring pid ${worker.proc.pid}: ${reason}`);
+  worker.retired = true;
+  dropWorker(worker);
+  if (worker.pending.size === 0) worker.proc.kill();
+  wakeWaiters(true);
+}
+
+function failAll(worker: ReaderWorker, reason: Error) {
+  for (const id of [...worker.pending.keys()]) {
+    settle(worker, id)?.reject(reason);
+  }
+}
+
+function spawnWorker(): ReaderWorker {
+  const pythonCmd = findPythonExecutable();
+  const projectRoot = process.cwd();
+  const scriptPath = join(projectRoot, 'astro_tarot_reader.py');
+
+  console.log('[astro-tarot] Starting persistent worker:', pythonCmd, scriptPath);
+
+  const proc = spawn(
+    pythonCmd,
+    [scriptPath, '--serve-stdio', '--worker-concurrency', String(WORKER_CONCURRENCY)],
+    {
+      cwd: projectRoot,
+      stdio: ['pipe', 'pipe', 'pipe'],
+      env: {
+        ...process.env,
+        OPENAI_API_KEY: process.env.OPENAI_API_KEY || '',
+      },
+    }
+  );
+  const worker: ReaderWorker = { proc, pending: new Map(), retired: false };
+
+  const lines = createInterface({ input: proc.stdout! });
+  lines.on('line', (line: string) => {
+    let frame: WorkerFrame;
+    try {
+      frame = JSON.parse(line) as WorkerFrame;
+    } catch {
+      console.error('[astro-tarot worker] Unframed stdout line:', line);
+      return;
+    }
+    if (frame.id === null || frame.id === undefined) {
+      if (frame.event === 'ready') {
+        console.log('[astro-tarot worker] Ready');
+      } else if (!frame.ok) {
+        console.error('[astro-tarot worker]', frame.error);
+      }
+      return;
+    }
+    if (frame.event) {
+      // Incremental block frames (options.stream) precede the final response
+      return;
+    }
+    const entry = settle(worker, frame.id);
+    if (!entry) return;
+    if (frame.ok && frame.result) {
+      entry.resolve(frame.result);
+    } else {
+      entry.reject(new Error(frame.error || 'Worker returned no result'));
+    }
+  });
+
+  proc.stderr?.on('data', (data: Buffer) => {
+    console.error('[Python stderr]', data.toString());
+  });
+
+  proc.on('error', (err: Error) => {
+    dropWorker(worker);
+    failAll(worker, new Error(`Failed to spawn Python worker: ${err.message}`));
+    wakeWaiters(true);
+  });
+
+  proc.on('close', (code: number | null) => {
+    dropWorker(worker);
+    failAll(worker, new Error(`Python worker exited with code ${code}`));
+    wakeWaiters(true);
+  });
+
+  workers.push(worker);
+  return worker;
+}
+
+// Least-loaded worker with a free slot; grows the pool before sharing a busy worker
+function pickWorker(): ReaderWorker | null {
+  let best: ReaderWorker | null = null;
+  for (const worker of workers) {
+    if (!best || worker.pending.size < best.pending.size) best = worker;
+  }
+  if ((!best || best.pending.size > 0) && workers.length < WORKER_POOL_SIZE) {
+    return spawnWorker();
+  }
+  return best && best.pending.size < WORKER_CONCURRENCY ? best : null;
+}
+
+function sendToWorker(worker: ReaderWorker, payload: AstroTarotRequest): Promise<PythonOutput> {
+  return new Promise((resolvePromise, reject) => {
+    const id = nextRequestId++;
+    const timer = setTimeout(() => {
+      settle(worker, id)?.reject(new Error('Python worker timed out'));
+      retire(worker, `request ${id} timed out`);
+    }, WORKER_REQUEST_TIMEOUT_MS);
+    worker.pending.set(id, { resolve: resolvePromise, reject, timer });
+
+    const frame = {
+      id,
+      op: 'reading',
+      question: payload.question,
+      timeframe: payload.timeframe,
+      astro: payload.astro,
+      spread: payload.spread,
+      model: payload.model || 'gpt-4o-mini',
+      temperature: payload.temperature || 0.2,
+      num_predict: payload.num_predict || 0,
+      options: { postprocess: true },
+    };
+    worker.proc.stdin?.write(JSON.stringify(frame) + '\n');
+  });
+}
+
+async function requestFromWorker(payload: AstroTarotRequest): Promise<PythonOutput> {
+  let worker = pickWorker();
+  while (!worker) {
+    await new Promise<void>((resolve) => waiting.push(resolve));
+    worker = pickWorker();
+  }
+  // pickWorker and the pending registration in sendToWorker run in one synchronous step
+  return sendToWorker(worker, payload);
+}
+
+function useWorker(): boolean {
+  const flag = (process.env.ASTRO_TAROT_WORKER || 'true').toLowerCase();
+  return flag !== '0' && flag !== 'false';
+}
+
 export const POST: RequestHandler = async ({ request }) => {
   try {
     const payload = (await request.json()) as AstroTarotRequest;
@@ -251,8 +458,8 @@ export const POST: RequestHandler = async ({ request }) => {
       return error(400, 'Spread must contain at least one card');
     }
 
-    // Execute Python script
-    const result = await executePythonScript(payload);
+    // Execute via the persistent worker (or a one-off Python process)
+    const result = useWorker() ? await requestFromWorker(payload) : await executePythonScript(payload);
 
     return json(result);
   } catch (err) {
@@ -7,16 +7,137 @@ and that caching utilities behave as expected.
 
 from __future__ import annotations
 
+import asyncio
+import datetime
 import importlib
+import io
 import json
+import gzip
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
 import time
 import unittest
+import urllib.error
+import urllib.request
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from unittest import mock
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 MAX_LOAD_SECONDS = 2.0  # Generous threshold for CI / constrained environments
 MAX_PROCESS_SECONDS = 1.0
+STARTUP_BUDGET_SECONDS = 2.0  # Cold interpreter start, per CLI invocation
+SAMPLE_MODEL_OUTPUT = (PROJECT_ROOT / "last_model_output.txt").read_text(encoding="utf-8")
+
+
+class FakeOpenAIServer:
+    """Local OpenAI-compatible /v1/chat/completions endpoint for network-free tests."""
+
+    def __init__(self, content=SAMPLE_MODEL_OUTPUT, delay=0.0):
+        self.content = content
+        self.delay = delay
+        self.chunk_size = 16
+        self.finish_reason = "stop"
+        # Scripted replies consumed one per request before normal service: {"status", "headers", "delay"}
+        self.script = []
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with fake._lock:
+                    fake.requests.append(json.loads(body))
+                    fake.active += 1
+                    fake.max_active = max(fake.max_active, fake.active)
+                    step = fake.script.pop(0) if fake.script else {}
+                try:
+                    time.sleep(step.get("delay", fake.delay))
+                    if step.get("status", 200) != 200:
+                        self._fail(step)
+                        return
+                    if fake.requests[-1].get("stream"):
+                        self._stream()
+                        return
+                    reply = json.dumps({"choices": [{"message": {"content": fake.content}}]}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(reply)))
+                    self.end_headers()
+                    self.wfile.write(reply)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout or a cancelled hedge)
+                finally:
+                    with fake._lock:
+                        fake.active -= 1
+
+            def _fail(self, step):
+                reply = json.dumps({"error": {"message": "scripted failure"}}).encode()
+                try:
+                    self.send_response(step["status"])
+                    for name, value in step.get("headers", {}).items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(reply)))
+                    self.end_headers()
+                    self.wfile.write(reply)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                text = fake.content
+                try:
+                    for i in range(0, len(text), fake.chunk_size):
+                        delta = {"choices": [{"delta": {"content": text[i:i + fake.chunk_size]},
+                                              "finish_reason": None}]}
+                        self.wfile.write(f"data: {json.dumps(delta)}\n\n".encode())
+                    done = {"choices": [{"delta": {}, "finish_reason": fake.finish_reason}]}
+                    self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *_args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/chat/completions"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *_exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def use_fake_openai(module, server):
+    """Point the reader module at a fake endpoint with caching off and debug output discarded."""
+    return mock.patch.multiple(
+        module,
+        OPENAI_API_URL=server.url,
+        OPENAI_API_KEY="test-key",
+        ENABLE_RESPONSE_CACHE=False,
+        ENABLE_READING_CACHE=False,
+        LAST_OUTPUT_PATH=str(Path(tempfile.gettempdir()) / "astro_tarot_last_output.txt"),
+    )
 
 
 def _load_json(path: str):
@@ -249,5 +370,1914 @@ class TestDataProcessingPerformance(unittest.TestCase):
         self.assertGreater(len(frequency), 0)
 
 
+class TestStdioWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def _serve(self, *requests):
+        stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests))
+        stdout = io.StringIO()
+        with mock.patch.object(self.module, "call_ollama", return_value=SAMPLE_MODEL_OUTPUT):
+            self.module.serve_stdio(stdin=stdin, stdout=stdout)
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_ready_frame_comes_first(self):
+        frames = self._serve()
+        self.assertEqual(frames[0]["event"], "ready")
+
+    def test_ping_echoes_request_id(self):
+        frames = self._serve({"id": "abc", "op": "ping"})
+        self.assertEqual(frames[1], {"id": "abc", "ok": True, "result": {"pong": True}})
+
+    def test_readings_are_framed_per_request(self):
+        start = time.perf_counter()
+        frames = self._serve(
+            {"id": 1, "question": "Career?", "timeframe": "next 30 days",
+             "spread": [{"position": "Past", "card": "The Hermit"}], "options": {"save": False}},
+            {"id": 2, "question": "Love?", "timeframe": "this week",
+             "spread": [{"position": "Present", "card": "Two of Tides"}], "options": {"save": False}},
+        )
+        duration = time.perf_counter() - start
+        self.assertEqual(sorted(f["id"] for f in frames[1:]), [1, 2])
+        self.assertTrue(all(f["ok"] for f in frames[1:]))
+        self.assertIn("interpretation", frames[1]["result"])
+        self.assertLess(duration, MAX_LOAD_SECONDS * 2)
+
+    def test_requests_are_served_concurrently(self):
+        def slow_model(*_args):
+            time.sleep(0.3)
+            return SAMPLE_MODEL_OUTPUT
+
+        requests = [{"id": i, "question": f"Parallel {i}?", "spread": [{"position": "Past", "card": "The Hermit"}],
+                     "options": {"save": False, "postprocess": False}} for i in range(4)]
+        stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests))
+        stdout = io.StringIO()
+        with mock.patch.object(self.module, "call_ollama", side_effect=slow_model), \
+                mock.patch.object(self.module, "ENABLE_READING_CACHE", False):
+            start = time.perf_counter()
+            self.module.serve_stdio(stdin=stdin, stdout=stdout, concurrency=4)
+            duration = time.perf_counter() - start
+        frames = [json.loads(line) for line in stdout.getvalue().splitlines()[1:]]
+        self.assertEqual(sorted(f["id"] for f in frames), [0, 1, 2, 3])
+        self.assertTrue(all(f["ok"] for f in frames))
+        self.assertLess(duration, 0.3 * 4 / 2)
+
+    def test_bad_lines_get_error_frames(self):
+        stdout = io.StringIO()
+        self.module.serve_stdio(stdin=io.StringIO("not json\n[1]\n"), stdout=stdout)
+        frames = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([f["ok"] for f in frames[1:]], [False, False])
+
+    def test_unknown_op_reports_error(self):
+        frames = self._serve({"id": 7, "op": "dance"})
+        self.assertFalse(frames[1]["ok"])
+        self.assertIn("unknown op", frames[1]["error"])
+
+
+class TestInProcessValidator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.validator = cls.module.get_validator()
+        cls.raw_paths = sorted((PROJECT_ROOT / "readings").glob("*_raw.json"))[:5]
+
+    def test_validate_matches_cli_output(self):
+        script = PROJECT_ROOT / "scripts" / "validate_reading_faith.py"
+        for raw_path in self.raw_paths:
+            reading = json.loads(raw_path.read_text(encoding="utf-8"))
+            with tempfile.TemporaryDirectory() as td:
+                out_path = Path(td) / "fixed.json"
+                proc = subprocess.run(
+                    [sys.executable, str(script), str(raw_path), str(out_path),
+                     "--no-require-faith-word", "--soft-rewrite", "--max-actions", "3"],
+                    capture_output=True, text=True, check=True,
+                )
+                cli_fixed = json.loads(out_path.read_text(encoding="utf-8"))
+            fixed, report = self.validator.validate(reading, {
+                "require_faith_word": False, "soft_rewrite": True, "max_actions": 3,
+            })
+            self.assertEqual(fixed, cli_fixed, raw_path.name)
+            self.assertEqual(report, json.loads(proc.stdout), raw_path.name)
+
+    def test_validate_leaves_input_untouched(self):
+        reading = json.loads(self.raw_paths[0].read_text(encoding="utf-8"))
+        before = json.dumps(reading, sort_keys=True)
+        self.validator.validate(reading)
+        self.assertEqual(json.dumps(reading, sort_keys=True), before)
+
+    def test_postprocess_reading_is_fast(self):
+        reading = json.loads(self.raw_paths[0].read_text(encoding="utf-8"))
+        self.module.postprocess_reading(reading)
+        start = time.perf_counter()
+        for _ in range(20):
+            fixed = self.module.postprocess_reading(reading, max_actions=3)
+        duration = time.perf_counter() - start
+        self.assertLess(duration, MAX_PROCESS_SECONDS)
+        self.assertLessEqual(len(fixed["interpretation"]["action_items"]), 3)
+
+
+class TestInclusiveScanner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.validator = importlib.import_module("astro_tarot_reader").get_validator()
+        cls.reading = json.loads(SAMPLE_MODEL_OUTPUT)
+
+    def _flagged_reading(self):
+        reading = json.loads(SAMPLE_MODEL_OUTPUT)
+        reading["interpretation"]["theme"] = "This is the one true way; doubt is heresy and hopeless."
+        reading["interpretation"]["positions"][1]["meaning"] = "You should be ashamed of the damned past."
+        return reading
+
+    def _reference_audit(self, obj):
+        """Previous per-pattern implementation: (path, pattern) pairs."""
+        pairs = []
+        for path, _parent, _key, text in self.validator._walk_strings(obj):
+            for pat in self.validator.EXCLUSIONARY_PATTERNS:
+                if re.search(pat, text.lower()):
+                    pairs.append((path, pat))
+        return pairs
+
+    def _reference_rewrite(self, text):
+        """Previous per-rule soft_rewrite_text."""
+        for pat, sub in self.validator.REWRITE_RULES:
+            text = re.sub(pat, sub, text, flags=re.IGNORECASE)
+        return text
+
+    def test_findings_match_per_pattern_audit(self):
+        reading = self._flagged_reading()
+        findings = self.validator.inclusive_audit(reading)
+        self.assertEqual(sorted((f["path"], f["pattern"]) for f in findings), sorted(self._reference_audit(reading)))
+
+    def test_findings_report_rule_and_span(self):
+        reading = self._flagged_reading()
+        theme = reading["interpretation"]["theme"]
+        by_rule = {f["rule"]: f for f in self.validator.inclusive_audit(reading)}
+        self.assertEqual(set(by_rule), {"one_true", "heresy", "toxicity", "ashamed", "damnation"})
+        start, end = by_rule["heresy"]["span"]
+        self.assertEqual(theme[start:end], "heresy")
+        self.assertEqual(by_rule["ashamed"]["path"], "interpretation.positions[1].meaning")
+
+    def test_soft_rewrite_touches_only_flagged_strings(self):
+        reading = self._flagged_reading()
+        fixed, _ = self.validator.validate(reading, {"soft_rewrite": True, "enrich_actions": False})
+        self.assertEqual(fixed["interpretation"]["theme"], self._reference_rewrite(reading["interpretation"]["theme"]))
+        self.assertNotIn("heresy", fixed["interpretation"]["theme"])
+        self.assertIn("can choose a better way", fixed["interpretation"]["positions"][1]["meaning"])
+        self.assertEqual(fixed["astro_summary"], reading["astro_summary"])
+
+    def test_every_rule_pair_matches_per_rule_scan(self):
+        samples = {"only_true_path": "only true path", "one_true": "one true", "heresy": "heresy",
+                   "blasphemy": "blasphemous", "anathema": "anathema", "damnation": "damned",
+                   "ashamed": "should be ashamed", "shameful": "shameful", "toxicity": "hopeless"}
+        scanner = self.validator.InclusiveScanner()
+        rules = [rid for rid, _ in self.validator.INCLUSIVE_RULES]
+        self.assertEqual(set(samples), set(rules))
+        for a in rules:
+            for b in rules:
+                for sep in (" ", "-", ""):
+                    text = f"Note: {samples[a]}{sep}{samples[b]}."
+                    with self.subTest(text=text):
+                        self.assertEqual({rule for rule, _, _ in scanner.scan(text)},
+                                         {path for path, _ in self._reference_rules(text)})
+                        self.assertEqual(scanner.rewrite(text), self._reference_rewrite(text))
+
+    def test_overlapping_hits_of_different_rules_are_all_reported(self):
+        scanner = self.validator.InclusiveScanner(
+            rules=[("one_true", "one true"), ("true_path", "only true path")],
+            audit_patterns=[r"\bone\s+true\b", r"\btrue\s+path\b"],
+            rewrite_rules=[(r"\bone\s+true\b", "a resonant"), (r"\bresonant\s+path\b", "meaningful path")])
+        self.assertEqual(scanner.scan("The one true path."), [("one_true", 4, 12), ("true_path", 8, 17)])
+        self.assertEqual(scanner.rewrite("The one true path."), "The a meaningful path.")
+
+    def _reference_rules(self, text):
+        return [(rid, pat) for (rid, _), pat in zip(self.validator.INCLUSIVE_RULES, self.validator.EXCLUSIONARY_PATTERNS)
+                if re.search(pat, text.lower())]
+
+    def test_scan_cost_tracks_text_size(self):
+        scanner = self.validator.InclusiveScanner()
+        text = " ".join(json.dumps(self.reading) for _ in range(20))
+        start = time.perf_counter()
+        for _ in range(10):
+            scanner.scan(text)
+        self.assertLess(time.perf_counter() - start, MAX_PROCESS_SECONDS)
+
+
+class TestIntentClassifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.validator = importlib.import_module("astro_tarot_reader").get_validator()
+        cls.texts = [p.read_text(encoding="utf-8") for p in sorted(PROJECT_ROOT.glob("readings/*.json"))]
+
+    def test_intents_are_ranked_by_hits(self):
+        ranked = self.validator.classify_intents("My job, my manager and the deadline at work; also some stress.")
+        self.assertEqual(ranked, (("career", 4), ("wellbeing", 1)))
+        self.assertEqual(self.validator.describe_intents(ranked), "mostly career, a little wellbeing")
+
+    def test_shared_keywords_count_for_every_intent(self):
+        ranked = dict(self.validator.classify_intents("Landing my first job on the team"))
+        self.assertEqual(ranked, {"career": 1, "early_career": 1, "relationships": 1, "sports": 1})
+
+    def test_matches_per_pattern_detection_on_archive(self):
+        patterns = {name: re.compile(pat, re.I) for name, pat in self.validator.INTENT_PATTERN_SOURCES.items()}
+        for text in self.texts:
+            expected = {name for name, rx in patterns.items() if rx.search(text)}
+            self.assertEqual({name for name, _ in self.validator.classify_intents(text)}, expected)
+
+    def test_results_are_cached_by_text(self):
+        text = "A cached question about my career path " + str(time.time())
+        first = self.validator.classify_intents(text)
+        hits = self.validator.classify_intents.cache_info().hits
+        self.assertIs(self.validator.classify_intents(text), first)
+        self.assertEqual(self.validator.classify_intents.cache_info().hits, hits + 1)
+
+    def test_report_includes_ranked_intents(self):
+        reading = json.loads(SAMPLE_MODEL_OUTPUT)
+        reading["meta"]["question"] = "Will my job search land a role with a good manager and salary?"
+        _, report = self.validator.validate(reading)
+        self.assertEqual(report["intents"][0], {"intent": "career", "hits": 2})
+        self.assertEqual(report["intent_summary"], "mostly career, some money")
+
+    def test_batch_classification_is_cheap(self):
+        readings = [json.loads(text) for text in self.texts]
+        intent_texts = [self.validator._intent_text(r.get("meta", {}).get("question", ""),
+                                                    r.get("interpretation", {}).get("theme", ""),
+                                                    r.get("astro_summary", {}).get("themes", []))
+                        for r in readings]
+        self.validator.classify_intents.cache_clear()
+        start = time.perf_counter()
+        for i in range(5000):
+            self.validator.classify_intents(f"{i} " + intent_texts[i % len(intent_texts)])
+        self.assertLess(time.perf_counter() - start, MAX_PROCESS_SECONDS)
+
+
+class TestRevalidateReadings(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Importable by name so pool workers can unpickle revalidate_one
+        sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+        cls.module = importlib.import_module("revalidate_readings")
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        src = PROJECT_ROOT / "readings"
+        for raw in sorted(src.glob("*_raw.json"))[:6]:
+            (self.dir / raw.name).write_bytes(raw.read_bytes())
+        self.legacy = sorted(p for p in src.glob("*_fixed.json")
+                             if not (src / p.name.replace("_fixed", "_raw")).exists())[0]
+        (self.dir / self.legacy.name).write_bytes(self.legacy.read_bytes())
+        self.options = {"require_faith_word": False, "soft_rewrite": True, "max_actions": 3}
+        self.progress = []
+
+    def _run(self, **kwargs):
+        kwargs.setdefault("jobs", 2)
+        return self.module.revalidate(self.dir, options=self.options,
+                                      progress=lambda done, n: self.progress.append((done, n)), **kwargs)
+
+    def test_pool_matches_in_process_validation(self):
+        report = self._run()
+        self.assertEqual(report["files_total"], 7)
+        self.assertEqual(report["processed"] + len(report["failed"]), 7)
+        self.assertEqual(self.progress[-1], (7, 7))
+        validator = self.module.vrf
+        enriched = 0
+        for raw in sorted(self.dir.glob("*_raw.json")):
+            fixed, single = validator.validate(json.loads(raw.read_text(encoding="utf-8")), self.options)
+            out = self.dir / raw.name.replace("_raw", "_fixed")
+            self.assertEqual(json.loads(out.read_text(encoding="utf-8")), fixed)
+            enriched += single["actions_enriched"]
+        self.assertIn("action_items trimmed to max", report["issues_by_type"])
+        self.assertTrue(0.0 <= report["actions_enriched_rate"] <= 1.0)
+        self.assertGreaterEqual(report["actions_enriched_rate"] * report["processed"], enriched)
+
+    def test_changed_only_skips_unchanged_readings(self):
+        first = self._run()
+        again = self._run(changed_only=True)
+        self.assertEqual(again["skipped_unchanged"], first["processed"])
+        self.assertEqual(again["processed"], 0)
+        raw = sorted(self.dir.glob("*_raw.json"))[0]
+        reading = json.loads(raw.read_text(encoding="utf-8"))
+        reading["meta"]["question"] = "Where is my career heading?"
+        raw.write_text(json.dumps(reading), encoding="utf-8")
+        third = self._run(changed_only=True)
+        self.assertEqual(third["processed"], 1)
+
+    def test_rules_version_change_revalidates_everything(self):
+        first = self._run()
+        self.options = dict(self.options, max_actions=4)
+        again = self._run(changed_only=True)
+        self.assertNotEqual(again["rules_version"], first["rules_version"])
+        self.assertEqual(again["skipped_unchanged"], 0)
+        self.assertEqual(again["processed"], first["processed"])
+
+    def test_defaults_match_reader_postprocess(self):
+        reader = importlib.import_module("astro_tarot_reader")
+        self.module.revalidate(self.dir, jobs=1, progress=lambda *_: None)
+        raw = sorted(self.dir.glob("*_raw.json"))[0]
+        expected = reader.postprocess_reading(json.loads(raw.read_text(encoding="utf-8")))
+        self.assertEqual(json.loads((self.dir / raw.name.replace("_raw", "_fixed")).read_text(encoding="utf-8")), expected)
+
+    def test_issue_types_drop_counts(self):
+        self.assertEqual(self.module.issue_type("affirmations trimmed to max=6."), "affirmations trimmed to max")
+        self.assertEqual(self.module.issue_type("majors_count mismatch: found 2, reported 3"), "majors_count mismatch")
+
+
+class TestReaderHTTPServer(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+
+    async def asyncSetUp(self):
+        self.server = await self.module.ReaderHTTPServer("127.0.0.1", 0, max_inflight=8).start()
+        self.base = f"http://127.0.0.1:{self.server.port}"
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def _request(self, path, payload=None, headers=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base + path, data=data, headers=headers or {})
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return resp.status, dict(resp.headers), resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+
+    async def _call(self, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: self._request(*args, **kwargs))
+
+    async def test_health_reports_kbs_loaded(self):
+        status, _, body = await self._call("/health")
+        self.assertEqual(status, 200)
+        self.assertTrue(json.loads(body)["kbs_loaded"])
+
+    async def test_unknown_route_is_404(self):
+        status, _, _ = await self._call("/nope")
+        self.assertEqual(status, 404)
+
+    async def test_validate_endpoint_gzips_large_bodies(self):
+        reading = json.loads(SAMPLE_MODEL_OUTPUT)
+        status, headers, body = await self._call(
+            "/validate", {"reading": reading}, {"Accept-Encoding": "gzip"})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers.get("Content-Encoding"), "gzip")
+        self.assertIn("report", json.loads(gzip.decompress(body)))
+
+    async def _raw(self, head: bytes) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(head)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+
+    async def test_non_numeric_content_length_is_rejected(self):
+        response = await self._raw(b"POST /validate HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+        self.assertIn(b"Connection: close", response)
+
+    async def test_negative_content_length_is_rejected(self):
+        response = await self._raw(b"POST /validate HTTP/1.1\r\nContent-Length: -1\r\n\r\n{}")
+        self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+        self.assertIn(b"Connection: close", response)
+
+    async def _health_while_blocked(self, request, blocked_call, target, attribute):
+        release = threading.Event()
+
+        def block(*args, **_kwargs):
+            release.wait(5)
+            return blocked_call(*args)
+
+        def probe_health():
+            # Timed on its own thread: the test shares the server's event loop
+            time.sleep(0.2)
+            start = time.perf_counter()
+            status, _, _ = self._request("/health")
+            elapsed = time.perf_counter() - start
+            release.set()
+            return status, elapsed
+
+        with mock.patch.object(target, attribute, side_effect=block):
+            loop = asyncio.get_running_loop()
+            blocked = asyncio.ensure_future(self._call(*request))
+            (status, elapsed), (blocked_status, _, _) = await asyncio.gather(
+                loop.run_in_executor(None, probe_health), blocked)
+        self.assertEqual((status, blocked_status), (200, 200))
+        self.assertLess(elapsed, 0.5)
+
+    async def test_health_answers_while_validate_blocks(self):
+        request = ("/validate", {"reading": json.loads(SAMPLE_MODEL_OUTPUT)})
+        await self._health_while_blocked(request, lambda reading, _options: (reading, {}),
+                                         self.module.get_validator(), "validate")
+
+    async def test_health_answers_while_finalize_blocks(self):
+        request = ("/reading", {"engine": "local", "options": {"save": False}})
+        await self._health_while_blocked(request, lambda reading, *_rest: reading, self.module, "_finalize_reading")
+
+    async def test_readings_run_concurrently(self):
+        payload = {"question": "Career?", "options": {"save": False},
+                   "spread": [{"position": "Past", "card": "The Hermit"}]}
+        with FakeOpenAIServer(delay=0.2) as fake, use_fake_openai(self.module, fake):
+            start = time.perf_counter()
+            # Distinct questions: identical ones would be coalesced onto one upstream call
+            results = await asyncio.gather(*[self._call("/reading", dict(payload, question=f"Career {i}?"))
+                                             for i in range(8)])
+            duration = time.perf_counter() - start
+        self.assertTrue(all(status == 200 for status, _, _ in results))
+        self.assertEqual(len(fake.requests), 8)
+        self.assertLess(duration, 0.2 * 8 / 2)
+
+
+class TestAsyncModelClient(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+
+    async def asyncTearDown(self):
+        await self.module.close_async_http_client()
+        self.module.set_model_concurrency(16)
+
+    async def test_call_chatgpt_async_returns_content(self):
+        with FakeOpenAIServer(content="hello") as fake, use_fake_openai(self.module, fake):
+            text = await self.module.call_chatgpt_async("sys", "user", "m", 0.2, 50)
+        self.assertEqual(text, "hello")
+        self.assertEqual(fake.requests[0]["max_tokens"], 50)
+
+    async def test_async_cache_hits_skip_the_network(self):
+        with FakeOpenAIServer(content="cached") as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "ENABLE_RESPONSE_CACHE", True):
+            hits = self.module._PERF_STATS["cache_hits"]
+            first = await self.module.call_chatgpt_async("sys", "async cache probe", "m", 0.2, 50)
+            second = await self.module.call_chatgpt_async("sys", "async cache probe", "m", 0.2, 50)
+        self.assertEqual(first, second)
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(self.module._PERF_STATS["cache_hits"], hits + 1)
+
+    async def test_semaphore_caps_inflight_calls(self):
+        self.module.set_model_concurrency(3)
+        with FakeOpenAIServer(content="x", delay=0.05) as fake, use_fake_openai(self.module, fake):
+            await asyncio.gather(*[
+                self.module.call_chatgpt_async("sys", f"u{i}", "m", 0.2, 10) for i in range(12)
+            ])
+        self.assertLessEqual(fake.max_active, 3)
+        self.assertEqual(len(fake.requests), 12)
+
+    async def test_synthesize_reading_async_fans_out(self):
+        spread = [{"position": "Past", "card": "The Hermit", "orientation": "upright"}]
+        with FakeOpenAIServer(delay=0.2) as fake, use_fake_openai(self.module, fake):
+            start = time.perf_counter()
+            readings = await asyncio.gather(*[
+                self.module.synthesize_reading_async(f"Q{i}", "now", {}, spread, "m", 0.2, 500)
+                for i in range(10)
+            ])
+            duration = time.perf_counter() - start
+        self.assertEqual(len(readings), 10)
+        self.assertTrue(all("interpretation" in r for r in readings))
+        self.assertLess(duration, 0.2 * 10 / 2)
+
+    async def test_retry_backoff_does_not_block_the_loop(self):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        with FakeOpenAIServer(content="slow", delay=0.3) as fake:
+            task = asyncio.create_task(ticker())
+            with self.assertRaises(Exception):
+                await self.module._post_with_retry_async(
+                    fake.url, {}, timeout=(1, 0.05), retries=1, backoff=0.1)
+            task.cancel()
+        self.assertGreater(len(ticks), 5)
+
+class TestRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    SPREAD = [{"position": "Past", "card": "The Hermit", "orientation": "upright"}]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+
+    def setUp(self):
+        self.module.reset_circuit_breakers()
+        patcher = mock.patch.multiple(self.module, RETRY_BACKOFF_BASE=0.01, RETRY_MAX_ATTEMPTS=4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.module.reset_circuit_breakers)
+
+    async def asyncTearDown(self):
+        await self.module.close_async_http_client()
+
+    def _reading(self, question="Retry?", **kwargs):
+        return self.module.run_reading(question, "now", {}, self.SPREAD, "m", 0.2, 500, **kwargs)
+
+    def test_transient_statuses_are_retried(self):
+        retries = self.module._PERF_STATS["http_retries"]
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            fake.script = [{"status": 503}, {"status": 502}]
+            reading = self._reading()
+        self.assertIn("interpretation", reading)
+        self.assertEqual(len(fake.requests), 3)
+        self.assertEqual(self.module._PERF_STATS["http_retries"], retries + 2)
+
+    def test_retry_after_is_honoured(self):
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            fake.script = [{"status": 429, "headers": {"Retry-After": "0.3"}}]
+            start = time.perf_counter()
+            self._reading()
+            duration = time.perf_counter() - start
+        self.assertEqual(len(fake.requests), 2)
+        self.assertGreaterEqual(duration, 0.3)
+
+    def test_client_errors_are_not_retried(self):
+        import requests
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            fake.script = [{"status": 400}]
+            with self.assertRaises(requests.HTTPError):
+                self._reading()
+        self.assertEqual(len(fake.requests), 1)
+
+    def test_deadline_bounds_all_attempts(self):
+        exceeded = self.module._PERF_STATS["deadline_exceeded"]
+        with FakeOpenAIServer(delay=2.0) as fake, use_fake_openai(self.module, fake):
+            start = time.perf_counter()
+            with self.assertRaises(self.module.DeadlineExceeded):
+                self._reading(deadline=0.4)
+            duration = time.perf_counter() - start
+        self.assertLess(duration, 1.5)
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(self.module._PERF_STATS["deadline_exceeded"], exceeded + 1)
+
+    def test_response_is_closed_when_the_deadline_cuts_retries_short(self):
+        response = mock.Mock(status_code=503, headers={"Retry-After": "5"},
+                             elapsed=datetime.timedelta(seconds=0.01))
+        session = mock.Mock(**{"post.return_value": response})
+        with mock.patch.object(self.module, "get_http_session", return_value=session), \
+                self.module.reading_deadline(1.0):
+            with self.assertRaises(self.module.DeadlineExceeded):
+                self.module._post_with_retry("http://upstream.test/v1", {})
+        response.close.assert_called_once_with()
+
+    async def test_async_response_is_closed_when_the_deadline_cuts_retries_short(self):
+        response = mock.Mock(status_code=503, headers={"Retry-After": "5"}, aclose=mock.AsyncMock())
+        client = mock.Mock(post=mock.AsyncMock(return_value=response))
+        with mock.patch.object(self.module, "get_async_http_client", return_value=client), \
+                self.module.reading_deadline(1.0):
+            with self.assertRaises(self.module.DeadlineExceeded):
+                await self.module._post_with_retry_async("http://upstream.test/v1", {})
+        response.aclose.assert_awaited_once_with()
+
+    def test_counters_are_exact_under_threads(self):
+        before = self.module._PERF_STATS["http_retries"]
+        threads = [threading.Thread(target=lambda: [self.module._count("http_retries") for _ in range(20000)])
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.module._PERF_STATS["http_retries"], before + 8 * 20000)
+
+    def test_breaker_opens_then_probes(self):
+        import requests
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.multiple(self.module, RETRY_MAX_ATTEMPTS=1, BREAKER_THRESHOLD=2, BREAKER_COOLDOWN=0.2):
+            self.module.reset_circuit_breakers()
+            fake.script = [{"status": 500}] * 2
+            for _ in range(2):
+                with self.assertRaises(requests.HTTPError):
+                    self._reading()
+            with self.assertRaises(self.module.CircuitOpenError):
+                self._reading()
+            self.assertEqual(len(fake.requests), 2)
+            fallback = self._reading(engine="auto")
+            self.assertIn("CircuitOpenError", fallback["confidence"]["notes"])
+            self.assertEqual(len(fake.requests), 2)
+            (state,) = self.module.get_cache_stats()["circuit_breakers"].values()
+            self.assertEqual(state["state"], "open")
+            time.sleep(0.25)
+            self.assertIn("interpretation", self._reading())
+            (state,) = self.module.circuit_breaker_stats().values()
+        self.assertEqual(state["state"], "closed")
+        self.assertEqual(len(fake.requests), 3)
+
+    async def test_async_client_retries_transient_statuses(self):
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            fake.script = [{"status": 503, "headers": {"Retry-After": "0"}}]
+            reading = await self.module.run_reading_async("Async retry?", "now", {}, self.SPREAD, "m", 0.2, 500)
+        self.assertIn("interpretation", reading)
+        self.assertEqual(len(fake.requests), 2)
+
+    def test_backoff_is_full_jitter_within_the_cap(self):
+        delays = [self.module._retry_delay(3, 5, 0.5) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 4.0 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertIsNone(self.module._retry_delay(5, 5, 0.5))
+        self.assertIsNone(self.module._retry_delay(0, 5, 0.5, retry_after=3600))
+        with self.module.reading_deadline(0.05), self.assertRaises(self.module.DeadlineExceeded):
+            self.module._retry_delay(0, 5, 0.5, retry_after=1.0)
+
+    def test_parse_retry_after(self):
+        from email.utils import format_datetime
+        self.assertEqual(self.module._parse_retry_after("2"), 2.0)
+        self.assertIsNone(self.module._parse_retry_after("soon"))
+        import datetime as dt
+        when = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=30)
+        self.assertAlmostEqual(self.module._parse_retry_after(format_datetime(when, usegmt=True)), 30, delta=2)
+
+
+class TestHedging(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def setUp(self):
+        for patcher in (mock.patch.dict(self.module._LATENCIES, clear=True),
+                        mock.patch.dict(self.module._HEDGE_BUDGET, tokens=1.0),
+                        mock.patch.object(self.module, "ENABLE_HEDGING", True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for _ in range(self.module.HEDGE_MIN_SAMPLES):
+            self.module.record_latency("m", 0.05)
+        self.stats = dict(self.module._PERF_STATS)
+
+    async def asyncTearDown(self):
+        await self.module.close_async_http_client()
+
+    def _delta(self, key):
+        return self.module._PERF_STATS[key] - self.stats[key]
+
+    def test_slow_primary_is_hedged(self):
+        with FakeOpenAIServer(content="fast") as fake, use_fake_openai(self.module, fake):
+            fake.script = [{"delay": 1.0}]
+            start = time.perf_counter()
+            text = self.module.call_chatgpt("sys", "hedge me", "m", 0.2, 50)
+            duration = time.perf_counter() - start
+        self.assertEqual(text, "fast")
+        self.assertLess(duration, 0.8)
+        self.assertEqual(len(fake.requests), 2)
+        self.assertEqual((self._delta("hedges_fired"), self._delta("hedges_won")), (1, 1))
+
+    async def test_async_hedge_cancels_the_loser(self):
+        with FakeOpenAIServer(content="fast") as fake, use_fake_openai(self.module, fake):
+            fake.script = [{"delay": 1.0}]
+            start = time.perf_counter()
+            text = await self.module.call_chatgpt_async("sys", "hedge me async", "m", 0.2, 50)
+            duration = time.perf_counter() - start
+        self.assertEqual(text, "fast")
+        self.assertLess(duration, 0.8)
+        self.assertEqual(len(fake.requests), 2)
+        self.assertEqual((self._delta("hedges_fired"), self._delta("hedges_won")), (1, 1))
+
+    async def test_fast_calls_are_not_hedged(self):
+        for _ in range(self.module.HEDGE_WINDOW):
+            self.module.record_latency("m", 1.0)
+        with FakeOpenAIServer(content="ok") as fake, use_fake_openai(self.module, fake):
+            await self.module.call_chatgpt_async("sys", "quick", "m", 0.2, 50)
+            self.module.call_chatgpt("sys", "quick sync", "m", 0.2, 50)
+        self.assertEqual(len(fake.requests), 2)
+        self.assertEqual(self._delta("hedges_fired"), 0)
+
+    def test_time_queued_for_a_pool_thread_is_not_hedged(self):
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        pool.submit(time.sleep, 0.4)
+        with FakeOpenAIServer(content="ok") as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "_HEDGE_POOL", pool):
+            self.assertEqual(self.module.call_chatgpt("sys", "queued", "m", 0.2, 50), "ok")
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(self._delta("hedges_fired"), 0)
+
+    async def test_no_async_hedge_without_a_free_slot(self):
+        sem = self.module._async_state()["sem"]
+        for _ in range(self.module.MODEL_MAX_CONCURRENCY):
+            await sem.acquire()
+        asyncio.get_running_loop().call_later(0.3, lambda: [sem.release() for _ in range(self.module.MODEL_MAX_CONCURRENCY)])
+        with FakeOpenAIServer(content="ok") as fake, use_fake_openai(self.module, fake):
+            self.assertEqual(await self.module.call_chatgpt_async("sys", "saturated", "m", 0.2, 50), "ok")
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(self._delta("hedges_fired"), 0)
+
+    def test_hedge_rate_is_capped(self):
+        with FakeOpenAIServer(content="ok") as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "HEDGE_MAX_RATE", 0.0), \
+                mock.patch.dict(self.module._HEDGE_BUDGET, tokens=0.0):
+            fake.script = [{"delay": 0.3}]
+            self.module.call_chatgpt("sys", "capped", "m", 0.2, 50)
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual((self._delta("hedges_fired"), self._delta("hedges_capped")), (0, 1))
+
+    def test_cold_or_disabled_models_are_not_hedged(self):
+        self.assertIsNone(self.module.hedge_delay("unseen-model"))
+        self.assertAlmostEqual(self.module.hedge_delay("m"), 0.05)
+        with mock.patch.object(self.module, "ENABLE_HEDGING", False):
+            self.assertIsNone(self.module.hedge_delay("m"))
+        self.assertIn("m", self.module.get_cache_stats()["hedging"]["models"])
+
+
+class TestModelRouter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+
+    def setUp(self):
+        self.router = self.module.ModelRouter(["fast", "strong"])
+        patcher = mock.patch.object(self.module, "_ROUTER", self.router)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.module.reset_circuit_breakers)
+
+    def _spread(self, n):
+        return [{"position": f"P{i}", "card": "The Hermit", "orientation": "upright"} for i in range(n)]
+
+    def test_spread_size_picks_the_tier(self):
+        self.assertEqual(self.router.candidates(3), ["fast", "strong"])
+        self.assertEqual(self.router.candidates(self.module.ROUTER_LARGE_SPREAD), ["strong", "fast"])
+        self.assertEqual(self.module.route_models("gpt-x", 10), ["gpt-x"])
+
+    def test_interactive_requests_respect_the_sla(self):
+        for _ in range(5):
+            self.router.record_call("fast", self.module.ROUTER_SLA_S * 2, True)
+        self.assertEqual(self.router.candidates(3, "interactive")[0], "strong")
+        self.assertEqual(self.router.candidates(3, "batch")[0], "fast")
+        self.assertGreater(self.router.snapshot()["models"]["fast"]["latency_s"], self.module.ROUTER_SLA_S)
+
+    def test_error_spike_fails_over_until_cooldown(self):
+        for _ in range(5):
+            self.router.record_call("fast", None, False)
+        self.assertEqual(self.router.candidates(3), ["strong", "fast"])
+        self.assertFalse(self.router.snapshot()["models"]["fast"]["healthy"])
+        with mock.patch.object(self.module, "ROUTER_COOLDOWN", 0.0):
+            self.assertEqual(self.router.candidates(3), ["fast", "strong"])
+
+    def test_ewma_tracks_latency_and_tokens(self):
+        self.router.record_call("fast", 1.0, True)
+        self.router.record_call("fast", 2.0, True)
+        self.router.record_tokens("fast", 500)
+        stats = self.router.snapshot()["models"]["fast"]
+        self.assertAlmostEqual(stats["latency_s"], 1.2)
+        self.assertEqual((stats["calls"], stats["errors"], stats["error_rate"], stats["output_tokens"]),
+                         (2, 0, 0.0, 500.0))
+
+    def test_auto_model_routes_and_fails_over(self):
+        failovers = self.module._PERF_STATS["router_failovers"]
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "RETRY_MAX_ATTEMPTS", 1):
+            fake.script = [{"status": 500}]
+            reading = self.module.run_reading("Route?", "now", {}, self._spread(2), "auto", 0.2, 500)
+            self.module.run_reading("Route big?", "now", {}, self._spread(6), "auto", 0.2, 500, priority="batch")
+        self.assertIn("interpretation", reading)
+        self.assertEqual([r["model"] for r in fake.requests], ["fast", "strong", "strong"])
+        self.assertEqual(self.module._PERF_STATS["router_failovers"], failovers + 1)
+        models = self.module.get_cache_stats()["router"]["models"]
+        self.assertEqual((models["fast"]["errors"], models["strong"]["calls"]), (1, 2))
+        self.assertIsNotNone(models["strong"]["output_tokens"])
+
+    def test_unparseable_output_neither_fails_over_nor_counts_as_an_error(self):
+        with FakeOpenAIServer(content="I cannot help with that.") as fake, use_fake_openai(self.module, fake):
+            with self.assertRaises(ValueError):
+                self.module.run_reading("Garbled?", "now", {}, self._spread(2), "auto", 0.2, 500)
+        self.assertEqual([r["model"] for r in fake.requests], ["fast"])
+        self.assertEqual(self.router.snapshot()["models"]["fast"]["errors"], 0)
+
+    def test_open_breaker_is_not_a_model_error(self):
+        self.assertTrue(self.module._upstream_error(TimeoutError("read timed out")))
+        self.assertFalse(self.module._upstream_error(self.module.DeadlineExceeded("late")))
+        self.assertFalse(self.module._upstream_error(self.module.CircuitOpenError("open")))
+        self.assertFalse(self.module._upstream_error(ValueError("bad json")))
+
+    def test_expired_deadline_neither_fails_over_nor_counts_as_an_error(self):
+        with FakeOpenAIServer(delay=1.0) as fake, use_fake_openai(self.module, fake):
+            with self.assertRaises(self.module.DeadlineExceeded):
+                self.module.run_reading("Late?", "now", {}, self._spread(2), "auto", 0.2, 500, deadline=0.3)
+        self.assertEqual([r["model"] for r in fake.requests], ["fast"])
+        models = self.router.snapshot()["models"]
+        self.assertEqual(models.get("fast", {}).get("errors", 0), 0)
+        self.assertNotIn("strong", models)
+
+    def test_request_frames_validate_priority(self):
+        self.assertEqual(self.module._reading_kwargs({"priority": "batch"})["priority"], "batch")
+        with self.assertRaises(ValueError):
+            self.module._reading_kwargs({"priority": "urgent"})
+
+
+class TestStageMetrics(unittest.IsolatedAsyncioTestCase):
+    SPREAD = [{"position": "Past", "card": "The Hermit", "orientation": "upright"}]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+
+    def setUp(self):
+        patcher = mock.patch.dict(self.module._STAGES, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    async def asyncTearDown(self):
+        await self.module.close_async_http_client()
+
+    def test_reading_stages_are_timed(self):
+        outdir = Path(self.tmp.name) / "readings"
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "READINGS_STORE", "both"):
+            self.module.clear_all_caches()  # fresh session: the first call opens a connection
+            self.module.run_reading("Stages?", "now", {}, self.SPREAD, "m", 0.2, 500,
+                                    postprocess=True, outdir=outdir)
+        self.addCleanup(self.module.get_readings_archive(outdir).close)
+        stages = self.module.get_metrics()["stages"]
+        for stage in ("kb_load", "prompt_build", "http_connect", "http_ttfb", "model_generation",
+                      "json_extract", "coerce", "validator", "files_write", "archive_write"):
+            self.assertGreaterEqual(stages.get(stage, {}).get("count", 0), 1, stage)
+        self.assertEqual(stages["files_write"]["count"], 2)
+        self.assertLessEqual(stages["http_ttfb"]["p50_s"], stages["model_generation"]["p50_s"])
+        self.assertIn("stages", self.module.get_cache_stats())
+
+    async def test_async_client_reports_connect_and_ttfb(self):
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            await self.module.run_reading_async("Async stages?", "now", {}, self.SPREAD, "m", 0.2, 500)
+        stages = self.module.stage_stats()
+        for stage in ("http_connect", "http_ttfb", "model_generation"):
+            self.assertEqual(stages[stage]["count"], 1, stage)
+
+    def test_quantiles_and_prometheus_export(self):
+        for ms in range(1, 101):
+            self.module.observe_stage("probe", ms / 1000)
+        snap = self.module.stage_stats()["probe"]
+        self.assertEqual((snap["count"], snap["p50_s"], snap["p95_s"], snap["p99_s"], snap["max_s"]),
+                         (100, 0.05, 0.095, 0.099, 0.1))
+        text = self.module.metrics_prometheus()
+        self.assertIn("# TYPE astro_tarot_stage_seconds histogram", text)
+        self.assertIn('astro_tarot_stage_seconds_bucket{stage="probe",le="+Inf"} 100', text)
+        self.assertIn('astro_tarot_stage_seconds_count{stage="probe"} 100', text)
+        self.assertIn('astro_tarot_stage_quantile_seconds{stage="probe",quantile="0.95"} 0.095', text)
+        self.assertIn("astro_tarot_cache_hits_total ", text)
+        buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                   if line.startswith('astro_tarot_stage_seconds_bucket{stage="probe"')]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertEqual(buckets[list(self.module.STAGE_BUCKETS).index(0.01)], 10)
+
+    async def test_metrics_endpoint_and_stdio_op(self):
+        self.module.observe_stage("probe", 0.01)
+        server = await self.module.ReaderHTTPServer("127.0.0.1", 0).start()
+        try:
+            def fetch():
+                with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=10) as resp:
+                    return resp.headers["Content-Type"], resp.read().decode()
+            content_type, body = await asyncio.get_running_loop().run_in_executor(None, fetch)
+        finally:
+            await server.close()
+        self.assertTrue(content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn('astro_tarot_stage_seconds_count{stage="probe"} 1', body)
+        frame = self.module.handle_request({"id": 7, "op": "metrics"})
+        self.assertEqual(frame["result"]["stages"]["probe"]["count"], 1)
+
+
+class TestBatchMode(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.in_path = Path(self.tmp.name) / "requests.jsonl"
+        self.out_path = Path(self.tmp.name) / "results.jsonl"
+        lines = [json.dumps({"id": f"r{i}", "question": f"Question {i}?",
+                             "spread": [{"position": "Now", "card": "The Star"}]}) for i in range(6)]
+        lines.insert(3, "{broken")
+        self.in_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _results(self):
+        return [json.loads(line) for line in self.out_path.read_text(encoding="utf-8").splitlines()]
+
+    def test_batch_writes_one_result_per_line(self):
+        with FakeOpenAIServer(delay=0.05) as fake, use_fake_openai(self.module, fake):
+            summary = self.module.run_batch(self.in_path, self.out_path, concurrency=3)
+        results = self._results()
+        self.assertEqual(summary["ok"], 6)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(len(fake.requests), 6)
+        self.assertEqual({r["id"] for r in results if r["ok"]}, {f"r{i}" for i in range(6)})
+        self.assertEqual([r["line"] for r in results if not r["ok"]], [4])
+
+    def test_batch_resumes_from_checkpoint(self):
+        ckpt = self.out_path.with_name(self.out_path.name + ".ckpt")
+        ckpt.write_text('"r0"\n"r1"\n"dropped-from-input"\n', encoding="utf-8")
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            summary = self.module.run_batch(self.in_path, self.out_path, concurrency=2)
+            self.assertEqual(summary["skipped"], 2)
+            self.assertEqual(len(fake.requests), 4)
+            again = self.module.run_batch(self.in_path, self.out_path, concurrency=2)
+        self.assertEqual(again["skipped"], 6)
+        self.assertEqual(again["ok"], 0)
+        self.assertEqual(len(fake.requests), 4)
+
+
+class TestLocalEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.astro = _load_json("data/astrology_context.json")
+        cls.spread = _load_json("data/my_spread.json")
+
+    def _local(self, question="Where is my career heading?"):
+        reading = self.module.synthesize_reading_local(question, "next 30 days", self.astro, self.spread)
+        reading["meta"].pop("timestamp")
+        return reading
+
+    def test_local_reading_is_deterministic_and_schema_valid(self):
+        first = self._local()
+        self.assertEqual(first, self._local())
+        self.assertNotEqual(first["interpretation"]["positions"], self._local("Will my novel sell?")["interpretation"]["positions"])
+        self.assertNotIn("engine", first["meta"])
+        self.assertEqual([p["card"] for p in first["interpretation"]["positions"]], [c["card"] for c in self.spread])
+        self.assertIn("Symbol (Virgo)", first["interpretation"]["positions"][0]["insight"])
+        self.assertIn("Number 10", first["interpretation"]["positions"][2]["insight"])
+        _fixed, report = self.module.get_validator().validate(first, {"require_faith_word": False})
+        self.assertEqual(report["issues_found"], [])
+
+    def test_local_reading_is_fast(self):
+        self._local()
+        start = time.perf_counter()
+        for i in range(500):
+            self.module.synthesize_reading_local(f"Question {i}?", "next 30 days", self.astro, self.spread)
+        self.assertLess(time.perf_counter() - start, MAX_PROCESS_SECONDS)
+
+    def test_local_engine_makes_no_model_call(self):
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            resp = self.module.handle_request({"id": 1, "engine": "local", "spread": self.spread,
+                                               "options": {"save": False}})
+        self.assertTrue(resp["ok"], resp)
+        self.assertEqual(resp["engine"], "local")
+        self.assertNotIn("engine", resp["result"]["meta"])
+        self.assertEqual(fake.requests, [])
+        bad = self.module.handle_request({"id": 2, "engine": "psychic", "options": {"save": False}})
+        self.assertFalse(bad["ok"])
+
+    def test_auto_engine_falls_back_when_model_fails(self):
+        before = self.module._PERF_STATS["local_fallbacks"]
+        with mock.patch.object(self.module, "call_ollama", side_effect=ConnectionError("upstream down")):
+            report = {}
+            reading = self.module.run_reading("Q?", "next 30 days", self.astro, self.spread, engine="auto",
+                                              postprocess=True, report=report)
+            with self.assertRaises(ConnectionError):
+                self.module.run_reading("Q?", "next 30 days", self.astro, self.spread, engine="model")
+        self.assertEqual(report, {"engine": "local"})
+        self.assertNotIn("engine", reading["meta"])
+        self.assertIn("ConnectionError", reading["confidence"]["notes"])
+        self.assertEqual(self.module._PERF_STATS["local_fallbacks"], before + 1)
+
+
+class TestSQLiteResponseCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "cache.sqlite3"
+
+    def _cache(self, **kwargs):
+        cache = self.module.SQLiteResponseCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_entries_are_shared_across_processes(self):
+        self._cache().set("k", "from parent")
+        code = (
+            "import sys, astro_tarot_reader as m;"
+            f"c = m.SQLiteResponseCache({str(self.path)!r});"
+            "print(c.get('k')); c.set('k2', 'from child')"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True)
+        self.assertEqual(proc.stdout.strip(), "from parent")
+        self.assertEqual(self._cache().get("k2"), "from child")
+
+    def test_expired_entries_are_not_served(self):
+        cache = self._cache()
+        cache.set("k", "v", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+
+    def test_size_cap_evicts_least_recently_used(self):
+        cache = self._cache(max_bytes=100)
+        cache.set("a", "x" * 40)
+        time.sleep(0.01)
+        cache.set("b", "x" * 40)
+        time.sleep(0.01)
+        cache.get("a")
+        cache.set("c", "x" * 40)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertLessEqual(cache.stats()["bytes"], 100)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_call_chatgpt_is_served_from_disk(self):
+        cache = self._cache()
+        with FakeOpenAIServer(content="disk") as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "ENABLE_RESPONSE_CACHE", True), \
+                mock.patch.object(self.module, "_CACHE_BACKEND", cache):
+            self.module.call_chatgpt("sys", "disk probe", "m", 0.2, 10)
+            self.module._RESPONSE_CACHE.clear()
+            start = time.perf_counter()
+            text = self.module.call_chatgpt("sys", "disk probe", "m", 0.2, 10)
+            duration = time.perf_counter() - start
+        self.assertEqual(text, "disk")
+        self.assertEqual(len(fake.requests), 1)
+        self.assertLess(duration, 0.05)
+
+
+class TestReadingArchive(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.raw = json.loads(sorted((PROJECT_ROOT / "readings").glob("*_raw.json"))[0].read_text(encoding="utf-8"))
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archive = self.module.ReadingArchive(Path(self.tmp.name) / "archive.sqlite3")
+        self.addCleanup(self.archive.close)
+
+    def _reading(self, question):
+        reading = json.loads(json.dumps(self.raw))
+        reading["meta"]["question"] = question
+        return reading
+
+    def test_ids_are_unique_within_a_second(self):
+        ids = {self.archive.put(self.raw) for _ in range(50)}
+        self.assertEqual(len(ids), 50)
+        self.assertEqual(self.archive.count(), 50)
+
+    def test_put_get_roundtrip(self):
+        reading_id = self.archive.put(self.raw, {"fixed": True})
+        rec = self.archive.get(reading_id)
+        self.assertEqual(rec["raw"], self.raw)
+        self.assertEqual(rec["fixed"], {"fixed": True})
+        self.assertIsNone(self.archive.get("missing"))
+
+    def test_range_question_and_spread_queries(self):
+        spread_a = [{"position": "Now", "card": "The Star"}]
+        spread_b = [{"position": "Now", "card": "The Moon", "orientation": "reversed"}]
+        for i in range(10):
+            self.archive.put(self._reading("Career?" if i % 2 else "Love?"),
+                             spread=spread_a if i < 5 else spread_b, ts=1000 + i)
+        ts = [r["ts"] for r in self.archive.query(since=1002, until=1008, batch=2)]
+        self.assertEqual(ts, [1002 + i for i in range(6)])
+        self.assertEqual(len(list(self.archive.query(question="  career? "))), 5)
+        self.assertEqual([r["ts"] for r in self.archive.query(spread=spread_b, question="Love?")],
+                         [1006, 1008])
+        self.assertEqual(len(list(self.archive.query(limit=3, batch=2))), 3)
+
+    def test_exports_and_import_roundtrip(self):
+        added = self.archive.import_files(PROJECT_ROOT / "readings")
+        total = len({p.name.rsplit("_", 1)[0] for p in (PROJECT_ROOT / "readings").glob("reading_*.json")})
+        self.assertEqual(added, total)
+        self.assertEqual(self.archive.import_files(PROJECT_ROOT / "readings"), 0)
+        buf = io.StringIO()
+        self.assertEqual(self.archive.export_jsonl(buf), total)
+        ids = [json.loads(line)["id"] for line in buf.getvalue().splitlines()]
+        self.assertEqual(len(set(ids)), total)
+        outdir = Path(self.tmp.name) / "export"
+        self.assertEqual(self.archive.export_files(outdir, since="2025-11-01"),
+                         len(list(self.archive.query(since="2025-11-01"))))
+        first = self.archive.get(ids[-1])
+        exported = json.loads((outdir / f"reading_{ids[-1]}_fixed.json").read_text(encoding="utf-8"))
+        self.assertEqual(exported, first["fixed"])
+
+    def test_compact_drops_old_readings(self):
+        for i in range(4):
+            self.archive.put(self.raw, ts=1000 + i)
+        stats = self.archive.compact(before=1002)
+        self.assertEqual(stats["removed"], 2)
+        self.assertEqual(stats["entries"], 2)
+
+    def test_finalize_reading_writes_archive(self):
+        outdir = Path(self.tmp.name) / "readings"
+        with mock.patch.object(self.module, "READINGS_STORE", "archive"):
+            self.module._finalize_reading(self.raw, outdir=outdir, spread=[{"position": "Now", "card": "The Star"}])
+        self.assertEqual(list(outdir.glob("*.json")), [])
+        archive = self.module.get_readings_archive(outdir)
+        self.addCleanup(archive.close)
+        self.assertEqual([r["raw"] for r in archive.query(spread=[{"position": "now", "card": "the star"}])],
+                         [self.raw])
+
+
+class TestLRUResponseCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def test_entry_cap_evicts_least_recently_used(self):
+        cache = self.module.LRUResponseCache(max_entries=2)
+        cache["a"], cache["b"] = "1", "2"
+        cache.get("a")
+        cache["c"] = "3"
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_cap_bounds_memory(self):
+        cache = self.module.LRUResponseCache(max_entries=1000, max_bytes=10_000)
+        for idx in range(100):
+            cache[f"k{idx}"] = "x" * 500
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 10_000)
+        self.assertEqual(stats["entries"], 20)
+
+    def test_ttl_expires_entries(self):
+        cache = self.module.LRUResponseCache(ttl=0.01)
+        cache["k"] = "v"
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_compression_round_trips_and_shrinks(self):
+        cache = self.module.LRUResponseCache(compress=True)
+        cache["k"] = SAMPLE_MODEL_OUTPUT
+        self.assertEqual(cache["k"], SAMPLE_MODEL_OUTPUT)
+        self.assertLess(cache.stats()["bytes"], len(SAMPLE_MODEL_OUTPUT.encode("utf-8")))
+
+    def test_stats_report_hit_ratio(self):
+        cache = self.module.LRUResponseCache()
+        cache["k"] = "v"
+        cache.get("k"); cache.get("k"); cache.get("missing")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertAlmostEqual(stats["hit_ratio"], 0.6667, places=3)
+
+    def test_get_cache_stats_includes_lru_stats(self):
+        stats = self.module.get_cache_stats()
+        self.assertIn("hit_ratio", stats["response_cache"])
+        self.assertIn("evictions", stats["response_cache"])
+
+
+class TestReadingCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def setUp(self):
+        self.module._READING_CACHE.clear()
+        self.astro = {"sun": "Leo 10°", "moon": "Taurus 5°", "asc": "Capricorn 12°"}
+        self.spread = [{"position": "Past", "card": "The Hermit", "orientation": "upright"},
+                       {"position": "Future", "card": "Ten of Stones"}]
+
+    def _key(self, question="What about my career?", astro=None, spread=None, **kw):
+        args = {"timeframe": "next 30 days", "model": "gpt-4o-mini", "temp": 0.2, "num": 1500, **kw}
+        return self.module.reading_cache_key(question, args["timeframe"], astro or self.astro,
+                                             spread or self.spread, args["model"], args["temp"], args["num"])
+
+    def test_formatting_differences_share_a_key(self):
+        base = self._key()
+        self.assertEqual(base, self._key("  what ABOUT my   career? "))
+        self.assertEqual(base, self._key(astro={"asc": "Capricorn  12°", "moon": "Taurus 5°", "sun": "Leo 10°"}))
+        self.assertEqual(base, self._key(spread=[
+            {"card": "the hermit", "position": "past", "element": "Earth"},
+            {"position": "Future", "card": "Ten of Pentacles", "orientation": "Upright"}]))
+        self.assertEqual(base, self._key(timeframe=" Next 30 days"))
+
+    def test_meaningful_differences_change_the_key(self):
+        base = self._key()
+        reversed_spread = [dict(self.spread[0], orientation="reversed"), self.spread[1]]
+        self.assertNotEqual(base, self._key(spread=reversed_spread))
+        self.assertNotEqual(base, self._key(model="gpt-4o"))
+        self.assertNotEqual(base, self._key(temp=0.7))
+        self.assertNotEqual(base, self._key(spread=[dict(self.spread[0], spread="Celtic Cross"), self.spread[1]]))
+        with mock.patch.object(self.module, "PROMPT_TEMPLATE_VERSION", "test-bump"):
+            self.assertNotEqual(base, self._key())
+
+    def test_hit_skips_model_call_and_parsing(self):
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "ENABLE_READING_CACHE", True):
+            first = self.module.synthesize_reading("What about my career?", "next 30 days",
+                                                   self.astro, self.spread, "gpt-4o-mini", 0.2, 1500)
+            hits = self.module._PERF_STATS["reading_cache_hits"]
+            with mock.patch.object(self.module, "_finish_reading", side_effect=AssertionError("parsed again")):
+                second = self.module.synthesize_reading(" what about my career? ", "next 30 days",
+                                                        dict(reversed(list(self.astro.items()))),
+                                                        self.spread, "gpt-4o-mini", 0.2, 1500)
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(self.module._PERF_STATS["reading_cache_hits"], hits + 1)
+        self.assertEqual(second["meta"]["question"], " what about my career? ")
+        self.assertEqual(second["interpretation"], first["interpretation"])
+        second["interpretation"]["positions"].clear()
+        again = self.module.synthesize_reading("What about my career?", "next 30 days",
+                                               self.astro, self.spread, "gpt-4o-mini", 0.2, 1500)
+        self.assertEqual(again["interpretation"], first["interpretation"])
+
+    def test_hit_keeps_each_requests_spelling_of_the_spread(self):
+        respelled = [{"position": "past", "card": "the hermit"},
+                     {"position": "FUTURE", "card": "Ten of Pentacles", "orientation": "Upright"}]
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "ENABLE_READING_CACHE", True):
+            first = self.module.synthesize_reading("Spelling?", "next 30 days", self.astro, self.spread,
+                                                   "gpt-4o-mini", 0.2, 1500)
+            second = self.module.synthesize_reading("Spelling?", "next 30 days", self.astro, respelled,
+                                                    "gpt-4o-mini", 0.2, 1500)
+            again = self.module.synthesize_reading("Spelling?", "next 30 days", self.astro, self.spread,
+                                                   "gpt-4o-mini", 0.2, 1500)
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(first["spread_summary"]["layout"][::2], ["Past: The Hermit", "Future: Ten of Stones"])
+        self.assertEqual(second["spread_summary"]["layout"][::2], ["past: the hermit", "FUTURE: Ten of Pentacles"])
+        self.assertEqual([(p["position"], p["card"]) for p in second["interpretation"]["positions"]][::2],
+                         [("past", "the hermit"), ("FUTURE", "Ten of Pentacles")])
+        self.assertEqual(again["spread_summary"], first["spread_summary"])
+        self.assertEqual(again["interpretation"], first["interpretation"])
+
+    def test_readings_have_their_own_lru_and_stats(self):
+        self.module._RESPONSE_CACHE.clear()
+        before = self.module.get_cache_stats()["reading_cache"]
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.multiple(self.module, ENABLE_RESPONSE_CACHE=True, ENABLE_READING_CACHE=True):
+            for _ in range(2):
+                self.module.synthesize_reading("Stats?", "next 30 days", self.astro, self.spread,
+                                               "gpt-4o-mini", 0.2, 1500)
+        after = self.module.get_cache_stats()["reading_cache"]
+        self.assertEqual(len(self.module._READING_CACHE), 1)
+        self.assertTrue(all(not key.startswith("reading:") for key in self.module._RESPONSE_CACHE._data))
+        self.assertEqual((after["hits"] - before["hits"], after["misses"] - before["misses"]), (1, 1))
+
+    def test_fallback_readings_are_not_cached(self):
+        with mock.patch.object(self.module, "call_ollama", side_effect=ConnectionError("down")):
+            self.module.run_reading("Q?", "next 30 days", self.astro, self.spread, engine="auto")
+        key = self._key("Q?")
+        self.assertNotIn(key, self.module._READING_CACHE)
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+        cls.args = ("Daily card?", "today", {"sun": "Leo 10°"}, [{"position": "Today", "card": "The Star"}],
+                    "gpt-4o-mini", 0.2, 1500)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    async def asyncTearDown(self):
+        await self.module.close_async_http_client()
+
+    def test_threads_share_one_upstream_call(self):
+        results = []
+        with FakeOpenAIServer(delay=0.3) as fake, use_fake_openai(self.module, fake):
+            threads = [threading.Thread(target=lambda: results.append(self.module.synthesize_reading(*self.args)))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len({id(r) for r in results}), 8)
+        self.assertTrue(all(r["interpretation"] == results[0]["interpretation"] for r in results))
+
+    async def test_coroutines_share_one_upstream_call(self):
+        with FakeOpenAIServer(delay=0.2) as fake, use_fake_openai(self.module, fake):
+            results = await asyncio.gather(*[self.module.synthesize_reading_async(*self.args) for _ in range(8)])
+        self.assertEqual(len(fake.requests), 1)
+        self.assertTrue(all(r["interpretation"] == results[0]["interpretation"] for r in results))
+
+    async def test_cache_and_lease_calls_stay_off_the_loop(self):
+        backend = self.module.SQLiteResponseCache(Path(self.tmp.name) / "cache.sqlite3")
+        self.addCleanup(backend.close)
+
+        def slow(fn):
+            # Stands in for a write lock held elsewhere (busy_timeout)
+            return lambda *args, **kwargs: time.sleep(0.3) or fn(*args, **kwargs)
+
+        gaps, done = [], asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.02)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        previous = self.module.get_cache_backend()
+        self.module.set_cache_backend(backend)
+        self.addCleanup(self.module.set_cache_backend, previous)
+        self.module._RESPONSE_CACHE.clear()
+        self.module._READING_CACHE.clear()
+        ticking = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0.05)
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.multiple(self.module, ENABLE_RESPONSE_CACHE=True, ENABLE_READING_CACHE=True), \
+                mock.patch.object(backend, "get", side_effect=slow(backend.get)), \
+                mock.patch.object(backend, "try_lock", side_effect=slow(backend.try_lock)):
+            reading = await self.module.synthesize_reading_async("Loop?", *self.args[1:])
+        done.set()
+        await ticking
+        self.assertIn("interpretation", reading)
+        self.assertLess(max(gaps), 0.2)
+
+    async def test_cancelled_leader_leaves_waiters_their_result(self):
+        flight, runs = self.module.SingleFlight(), []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.1)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do_async("k", work))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(flight.do_async("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        self.assertEqual(await waiter, "done")
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(runs, [1])
+
+    async def test_flight_is_cancelled_when_every_caller_is(self):
+        flight, cancelled = self.module.SingleFlight(), asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.ensure_future(flight.do_async("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertEqual(await flight.do_async("k", lambda: asyncio.sleep(0, "fresh")), "fresh")
+
+    def test_errors_reach_every_waiter_and_are_not_sticky(self):
+        flight = self.module.SingleFlight()
+        gate = threading.Event()
+        errors = []
+
+        def boom():
+            gate.wait(1)
+            raise RuntimeError("upstream down")
+
+        def call():
+            try:
+                flight.do("k", boom)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(flight.do("k", lambda: "ok"), "ok")
+
+    def test_waiter_picks_up_result_from_other_process(self):
+        path = Path(self.tmp.name) / "cache.sqlite3"
+        ours, theirs = self.module.SQLiteResponseCache(path), self.module.SQLiteResponseCache(path)
+        self.addCleanup(ours.close)
+        self.addCleanup(theirs.close)
+        self.assertTrue(theirs.try_lock("reading:k", "other-process", ttl=5))
+        self.assertFalse(ours.try_lock("reading:k", "me", ttl=5))
+
+        def finish():
+            time.sleep(0.2)
+            theirs.set("reading:k", '{"from": "other"}')
+            theirs.unlock("reading:k", "other-process")
+
+        threading.Thread(target=finish).start()
+        computed = []
+        blob = self.module.coalesce_across_processes("reading:k", lambda: computed.append(1) or "{}", backend=ours)
+        self.assertEqual(blob, '{"from": "other"}')
+        self.assertEqual(computed, [])
+
+    def test_expired_or_abandoned_lease_is_taken_over(self):
+        backend = self.module.SQLiteResponseCache(Path(self.tmp.name) / "cache.sqlite3")
+        self.addCleanup(backend.close)
+        self.assertTrue(backend.try_lock("reading:x", "crashed", ttl=0.1))
+        blob = self.module.coalesce_across_processes("reading:x", lambda: "mine", backend=backend)
+        self.assertEqual(blob, "mine")
+        self.assertFalse(backend.lock_held("reading:x"))
+
+    def test_processes_share_one_upstream_call(self):
+        script = (
+            "import json, sys; sys.path.insert(0, %r); import astro_tarot_reader as m; "
+            "r = m.synthesize_reading('Daily card?', 'today', {'sun': 'Leo 10°'}, "
+            "[{'position': 'Today', 'card': 'The Star'}], 'gpt-4o-mini', 0.2, 1500); "
+            "print(json.dumps(r['interpretation']))" % str(PROJECT_ROOT)
+        )
+        with FakeOpenAIServer(delay=1.0) as fake:
+            env = dict(os.environ, OPENAI_API_URL=fake.url, OPENAI_API_KEY="test-key",
+                       RESPONSE_CACHE_BACKEND="sqlite", RESPONSE_CACHE_PATH=str(Path(self.tmp.name) / "shared.sqlite3"),
+                       LAST_MODEL_OUTPUT_PATH=str(Path(self.tmp.name) / "last.txt"))
+            procs = [subprocess.Popen([sys.executable, "-c", script], cwd=PROJECT_ROOT, env=env,
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                     for _ in range(3)]
+            outputs = [p.communicate(timeout=30)[0] for p in procs]
+        self.assertEqual([p.returncode for p in procs], [0, 0, 0])
+        self.assertEqual(len(fake.requests), 1)
+        self.assertEqual(len(set(outputs)), 1)
+
+
+class TestPromptBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.astro = dict(_load_json("data/astrology_context.json"), notes="Long free-text notes " * 20)
+        cls.spread = _load_json("data/my_spread.json") + [
+            {"position": "Advice", "card": "The Comet", "element": "Fire", "orientation": "upright"}]
+
+    def setUp(self):
+        patcher = mock.patch.dict(self.module._OUTPUT_PROFILE, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_estimate_tokens_is_in_a_sane_range(self):
+        self.assertEqual(self.module.estimate_tokens(""), 0)
+        n = self.module.estimate_tokens(SAMPLE_MODEL_OUTPUT)
+        self.assertGreater(n, len(SAMPLE_MODEL_OUTPUT) / 5)
+        self.assertLess(n, len(SAMPLE_MODEL_OUTPUT) / 3)
+
+    def test_compact_prompt_drops_redundant_fields(self):
+        full = self.module._reading_prompt("Q?", "next 30 days", self.astro, self.spread)
+        prompt, _ = self.module.build_reading_prompt("Q?", "next 30 days", self.astro, self.spread)
+        self.assertLess(self.module.estimate_tokens(prompt), 0.8 * self.module.estimate_tokens(full))
+        for dropped in ("notes", "element_counts", "majors_count", '"suit"'):
+            self.assertNotIn(dropped, prompt)
+        kb_json = prompt.split("TAROT CARDS IN THIS SPREAD: ")[1].split("\n")[0]
+        kb_slice = json.loads(kb_json)
+        self.assertNotIn("keywords_reversed", kb_slice["The Hermit"])
+        self.assertNotIn("keywords_upright", kb_slice["The Lovers"])
+        spread_json = json.loads(prompt.split("TAROT SPREAD: ")[1].split("\n")[0])
+        self.assertEqual([c["card"] for c in spread_json], [c["card"] for c in self.spread])
+        self.assertEqual(spread_json[1]["orientation"], "reversed")
+        self.assertNotIn("element", spread_json[2])            # known card: the KB slice has it
+        self.assertEqual(spread_json[3]["element"], "Fire")     # unknown card keeps the hint
+
+    def test_max_tokens_scales_with_spread_and_learns(self):
+        budget = self.module.output_budget
+        self.assertLess(budget(1), budget(3))
+        self.assertLess(budget(3), 1500)
+        self.assertGreater(budget(10), 1500)
+        self.assertLessEqual(budget(40), self.module.PROMPT_MAX_TOKENS)
+        prior = budget(3)
+        for _ in range(5):
+            self.module.record_output_tokens(3, 600)
+        self.assertLess(budget(3), prior)
+        self.assertGreaterEqual(budget(3), 600)
+
+    def test_full_prompt_is_only_built_for_savings_stats(self):
+        saved = self.module._PERF_STATS["prompt_tokens_saved"]
+        with mock.patch.object(self.module, "_reading_prompt", wraps=self.module._reading_prompt) as build:
+            self.module.build_reading_prompt("Q?", "next 30 days", self.astro, self.spread)
+            self.assertEqual([c.kwargs.get("compact") for c in build.call_args_list], [True])
+            self.assertEqual(self.module._PERF_STATS["prompt_tokens_saved"], saved)
+            with mock.patch.object(self.module, "PROMPT_SAVINGS_STATS", True):
+                self.module.build_reading_prompt("Q?", "next 30 days", self.astro, self.spread)
+        self.assertEqual(build.call_count, 3)
+        self.assertGreater(self.module._PERF_STATS["prompt_tokens_saved"], saved)
+
+    def test_output_profile_is_consistent_under_threads(self):
+        threads = [threading.Thread(target=lambda: [self.module.record_output_tokens(4, 500) for _ in range(2000)])
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.module.get_output_profile()["4"]["n"], 8 * 2000)
+
+    def test_requests_use_budgeted_or_pinned_max_tokens(self):
+        args = ("Budget?", "next 30 days", self.astro, self.spread, "gpt-4o-mini", 0.2)
+        expected = self.module.output_budget(len(self.spread))
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            self.module.synthesize_reading(*args, 0)
+            self.module.synthesize_reading(*args, 777)
+            with mock.patch.object(self.module, "PROMPT_BUDGET", False):
+                self.module.synthesize_reading(*args, 0)
+        self.assertEqual(fake.requests[0]["max_tokens"], expected)
+        self.assertLess(expected, 1500)
+        self.assertEqual(fake.requests[1]["max_tokens"], 777)
+        self.assertEqual(fake.requests[2]["max_tokens"], 1500)
+        self.assertIn("notes", fake.requests[2]["messages"][1]["content"])
+        self.assertIn("4", self.module.get_output_profile())
+
+
+class TestStreaming(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.expected = json.loads(SAMPLE_MODEL_OUTPUT)
+
+    def _feed(self, text, size=7):
+        parser = self.module.IncrementalJSONParser()
+        events = []
+        for i in range(0, len(text), size):
+            events.extend(parser.feed(text[i:i + size]))
+        return parser, events
+
+    def test_parser_emits_blocks_and_positions_in_order(self):
+        parser, events = self._feed(SAMPLE_MODEL_OUTPUT)
+        paths = [path for path, _ in events]
+        positions = self.expected["interpretation"]["positions"]
+        self.assertEqual(paths[:2], ["meta", "astro_summary"])
+        self.assertEqual(paths.count("interpretation"), 1)
+        self.assertLess(paths.index("interpretation.positions[0]"), paths.index("interpretation"))
+        self.assertEqual(parser.items["interpretation.positions"], positions)
+        self.assertEqual(dict(events)["meta"], self.expected["meta"])
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.result(), self.expected)
+
+    def test_parser_ignores_trailing_chatter(self):
+        parser, _ = self._feed("Sure! " + SAMPLE_MODEL_OUTPUT + "\nHope that helps {")
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.result(), self.expected)
+
+    def test_partial_keeps_completed_blocks(self):
+        cut = SAMPLE_MODEL_OUTPUT.index('"action_items"')
+        parser, _ = self._feed(SAMPLE_MODEL_OUTPUT[:cut])
+        self.assertFalse(parser.done)
+        partial = parser.partial()
+        self.assertEqual(partial["meta"], self.expected["meta"])
+        self.assertEqual(partial["interpretation"]["positions"], self.expected["interpretation"]["positions"])
+        self.assertNotIn("confidence", partial)
+
+    def test_call_chatgpt_stream_reports_blocks_as_they_close(self):
+        seen = []
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            text = self.module.call_chatgpt_stream("sys", "user", "m", 0.2, 10,
+                                                   on_event=lambda p, v: seen.append(p))
+        self.assertTrue(fake.requests[0]["stream"])
+        self.assertEqual(json.loads(text), self.expected)
+        self.assertIn("interpretation.positions[2]", seen)
+
+    def test_truncated_stream_keeps_completed_blocks(self):
+        cut = SAMPLE_MODEL_OUTPUT.index('"confidence"')
+        with FakeOpenAIServer(content=SAMPLE_MODEL_OUTPUT[:cut]) as fake, use_fake_openai(self.module, fake):
+            fake.finish_reason = "length"
+            reading = self.module.synthesize_reading_stream(
+                "Q?", "next 30 days", {}, [{"position": "Past", "card": "The Hermit"}], "m", 0.2, 10)
+        self.assertEqual(reading["meta"]["spread_name"], self.expected["meta"]["spread_name"])
+        self.assertTrue(reading["interpretation"]["positions"])
+        self.assertIn("confidence", reading)
+
+    def _router_errors(self, model):
+        return (self.module._ROUTER.stats.get(model) or {}).get("errors", 0)
+
+    def test_truncated_stream_is_not_recorded_as_success(self):
+        self.module.reset_circuit_breakers()
+        self.addCleanup(self.module.reset_circuit_breakers)
+        cut = SAMPLE_MODEL_OUTPUT.index('"confidence"')
+        with FakeOpenAIServer(content=SAMPLE_MODEL_OUTPUT[:cut]) as fake, use_fake_openai(self.module, fake):
+            fake.finish_reason = None
+            errors = self._router_errors("m-truncated")
+            self.module.call_chatgpt_stream("sys", "user", "m-truncated", 0.2, 10)
+            breaker = self.module.get_circuit_breaker(fake.url)
+        self.assertEqual(self._router_errors("m-truncated"), errors + 1)
+        self.assertEqual(breaker.failures, 1)
+
+    def test_mid_stream_error_is_recorded_as_failure(self):
+        self.module.reset_circuit_breakers()
+        self.addCleanup(self.module.reset_circuit_breakers)
+
+        def dies_mid_stream(_lines):
+            yield SAMPLE_MODEL_OUTPUT[:40], None
+            raise ConnectionError("connection reset mid-stream")
+
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake), \
+                mock.patch.object(self.module, "_iter_sse_content", dies_mid_stream):
+            errors = self._router_errors("m-dies")
+            with self.assertRaises(ConnectionError):
+                self.module.call_chatgpt_stream("sys", "user", "m-dies", 0.2, 10)
+            breaker = self.module.get_circuit_breaker(fake.url)
+        self.assertEqual(self._router_errors("m-dies"), errors + 1)
+        self.assertEqual(breaker.failures, 1)
+
+    def test_stdio_worker_emits_block_frames_before_result(self):
+        stdin = io.StringIO(json.dumps({
+            "id": 3, "question": "Home?", "timeframe": "next 30 days",
+            "spread": [{"position": "Past", "card": "The Hermit"}],
+            "options": {"save": False, "stream": True, "postprocess": False},
+        }) + "\n")
+        stdout = io.StringIO()
+        with FakeOpenAIServer() as fake, use_fake_openai(self.module, fake):
+            self.module.serve_stdio(stdin=stdin, stdout=stdout)
+        frames = [json.loads(line) for line in stdout.getvalue().splitlines()][1:]
+        blocks = [f for f in frames if f.get("event") == "block"]
+        self.assertTrue(blocks)
+        self.assertTrue(all(f["id"] == 3 for f in frames))
+        self.assertIn("result", frames[-1])
+        self.assertNotIn("event", frames[-1])
+
+
+class TestJsonRepair(unittest.TestCase):
+    """Fuzz corpus: saved raw model outputs plus seeded mutations of them."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        paths = sorted(PROJECT_ROOT.glob("readings/*_raw.json")) + [PROJECT_ROOT / "last_model_output.txt"]
+        cls.corpus = [p.read_text(encoding="utf-8") for p in paths]
+        cls.rng = random.Random(1234)
+
+    def _repair(self, text):
+        return json.loads(self.module._basic_json_repairs(text))
+
+    def _mutate_each(self, mutate):
+        for text in self.corpus:
+            with self.subTest(size=len(text)):
+                self.assertEqual(self._repair(mutate(text)), json.loads(text))
+
+    def test_valid_corpus_round_trips(self):
+        self._mutate_each(lambda t: t)
+
+    def test_fenced_output_with_chatter(self):
+        self._mutate_each(lambda t: "Here is your reading:\n```json\n" + t + "\n```\nBlessings!")
+
+    def test_trailing_commas(self):
+        self._mutate_each(lambda t: t.replace("\n  }", ",\n  }").replace("]", ", ]"))
+
+    def test_smart_quotes(self):
+        def smarten(text):
+            parts = text.split('"')
+            return "".join(p + ("\u201c" if i % 2 == 0 else "\u201d") for i, p in enumerate(parts[:-1])) + parts[-1]
+        self._mutate_each(smarten)
+
+    def test_single_quoted_keys(self):
+        self._mutate_each(lambda t: re.sub(r'"(\w+)":', r"'\1':", t))
+
+    def test_bad_escapes_are_kept_literally(self):
+        text = self.corpus[0].replace('"next 30 days"', '"next\\d 30 days"', 1)
+        self.assertEqual(self._repair(text)["meta"]["timeframe"], "next\\d 30 days")
+
+    def test_random_truncations_always_parse(self):
+        for text in self.corpus:
+            for cut in self.rng.sample(range(1, len(text)), 40):
+                with self.subTest(cut=cut):
+                    self.assertIsInstance(self._repair(text[:cut]), dict)
+
+    def test_parse_model_json_accepts_truncated_output(self):
+        data = self.module.parse_model_json(SAMPLE_MODEL_OUTPUT[: len(SAMPLE_MODEL_OUTPUT) // 2])
+        self.assertEqual(data["meta"], json.loads(SAMPLE_MODEL_OUTPUT)["meta"])
+
+    def test_throughput_on_large_inputs(self):
+        docs = ",".join(self.corpus * 2)
+        text = "\u201creadings\u201d: [" + docs + ",]"
+        text = "{" + text[: len(text) - 500]
+        self.assertGreater(len(text.encode("utf-8")), 100_000)
+        start = time.perf_counter()
+        data = self._repair(text)
+        duration = time.perf_counter() - start
+        self.assertGreater(len(data["readings"]), len(self.corpus))
+        mb_per_s = len(text) / duration / 1e6
+        self.assertGreater(mb_per_s, 0.5, f"repair throughput {mb_per_s:.2f} MB/s")
+
+    def test_backslash_heavy_input_stays_linear(self):
+        text = '{"a": "' + "\\x" * 50_000
+        start = time.perf_counter()
+        self.assertEqual(len(self._repair(text)["a"]), 100_000)
+        self.assertLess(time.perf_counter() - start, MAX_PROCESS_SECONDS)
+
+
+class TestKnowledgeIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+        cls.module.warm_kbs()
+
+    def test_suit_aliases_resolve_to_deck_cards(self):
+        for alias, name in (("Ace of Wands", "Ace of Flames"), ("Three of Coins", "Three of Stones"),
+                            ("Knight of Disks", "Knight of Stones"), ("Two of Cups", "Two of Tides"),
+                            ("Queen of Swords", "Queen of Winds")):
+            self.assertEqual(self.module.kb_lookup(alias)["name"], name)
+
+    def test_card_names_are_normalised(self):
+        self.assertEqual(self.module.kb_lookup("  the   FOOL ")["name"], "The Fool")
+        self.assertEqual(self.module.kb_lookup("Nonexistent Card"), {})
+
+    def test_keywords_come_from_orientation_lists(self):
+        card = self.module.kb_lookup("The Fool")
+        self.assertEqual(self.module.kb_keywords("The Fool"), card["keywords_upright"][:4])
+        self.assertEqual(self.module.kb_keywords("The Fool", "reversed"), card["keywords_reversed"][:4])
+
+    def test_constellations_resolve_under_nested_key(self):
+        for name, expected in (("Libra", "Libra"), ("capricorn", "Capricornus"), ("Scorpio", "Scorpius"),
+                               ("Bootes", "Boötes"), ("ursa  major", "Ursa Major")):
+            self.assertEqual(self.module.constellation_lookup(name)["name"], expected)
+        self.assertTrue(self.module.constellation_theme_line("Libra"))
+
+    def test_index_rebuilds_after_reload(self):
+        before = self.module.get_knowledge_index()
+        self.assertIs(self.module.get_knowledge_index(), before)
+        self.module.load_constellation_kb(force_reload=True)
+        self.assertIsNot(self.module.get_knowledge_index(), before)
+
+    def test_lookups_are_constant_time(self):
+        self.module.get_knowledge_index()
+        start = time.perf_counter()
+        for _ in range(20_000):
+            self.module.constellation_theme_line("Capricorn")
+            self.module.kb_element("Ace of Wands")
+        self.assertLess(time.perf_counter() - start, MAX_PROCESS_SECONDS)
+
+
+class TestKBSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cards = Path(tmp.name) / "cards.json"
+        self.constellations = Path(tmp.name) / "constellations.json"
+        self.cards.write_bytes((PROJECT_ROOT / "data/celestia_arcana_knowledge.json").read_bytes())
+        self.constellations.write_bytes((PROJECT_ROOT / "data/constellation_knowledge.json").read_bytes())
+
+    def _origin(self, kind="cards"):
+        return self.module.get_cache_stats()["kb_load"][kind]["origin"]
+
+    def test_first_load_compiles_then_reuses_snapshot(self):
+        first = self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        self.assertEqual(self._origin(), "json")
+        self.assertTrue(self.module.kb_snapshot_path(self.cards).exists())
+        second = self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        self.assertEqual(self._origin(), "snapshot")
+        self.assertEqual(second, first)
+
+    def test_touched_source_with_same_content_keeps_snapshot(self):
+        self.module.load_constellation_kb(path=str(self.constellations), force_reload=True)
+        stat = self.constellations.stat()
+        os.utime(self.constellations, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+        self.module.load_constellation_kb(path=str(self.constellations), force_reload=True)
+        self.assertEqual(self._origin("constellations"), "snapshot")
+
+    def test_changed_source_recompiles(self):
+        self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        data = json.loads(self.cards.read_text(encoding="utf-8"))
+        data["cards"].append({"name": "The Comet", "arcana": "Major", "keywords_upright": ["Wonder"]})
+        self.cards.write_text(json.dumps(data), encoding="utf-8")
+        kb = self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        self.assertEqual(self._origin(), "json")
+        self.assertIn("The Comet", kb)
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        self.module.kb_snapshot_path(self.cards).write_bytes(b"not a pickle")
+        kb = self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        self.assertEqual(self._origin(), "json")
+        self.assertIn("The Fool", kb)
+
+    def test_index_uses_prebuilt_tables(self):
+        self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        self.module.load_constellation_kb(path=str(self.constellations), force_reload=True)
+        index = self.module.get_knowledge_index()
+        self.assertEqual(index.card("Ace of Wands")["name"], "Ace of Flames")
+        self.assertTrue(index.theme_line("Capricorn"))
+
+    def tearDown(self):
+        self.module.clear_all_caches()
+
+
+class TestStartupBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def _python(self, *args, env=None):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, *args], capture_output=True, text=True,
+                              cwd=PROJECT_ROOT, env=env, timeout=60)
+        return proc, time.perf_counter() - start
+
+    def test_import_skips_network_and_async_stacks(self):
+        proc, _ = self._python("-c", "import sys, astro_tarot_reader; "
+                               "print([m for m in ('requests', 'asyncio', 'httpx', 'sqlite3') if m in sys.modules])")
+        self.assertEqual(proc.stdout.strip(), "[]", proc.stderr)
+
+    def test_validator_compiles_regex_tables_on_first_use(self):
+        code = ("import sys; sys.path.insert(0, 'scripts'); import validate_reading_faith as v; "
+                "before = v._intent_patterns.cache_info().currsize; "
+                "print(before, len(v.INTENT_PATTERNS), v._intent_patterns.cache_info().currsize)")
+        proc, _ = self._python("-c", code)
+        self.assertEqual(proc.stdout.split(), ["0", "14", "1"], proc.stderr)
+
+    def test_help_cold_start_within_budget(self):
+        proc, duration = self._python("astro_tarot_reader.py", "--help")
+        self.assertEqual(proc.returncode, 0)
+        self.assertIn("--startup-report", proc.stdout)
+        self.assertLess(duration, STARTUP_BUDGET_SECONDS)
+
+    def test_cache_hit_reading_cold_start_within_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = str(Path(tmp) / "cache.sqlite3")
+            astro = _load_json("data/astrology_context.json")
+            spread = _load_json("data/my_spread.json")
+            with mock.patch.dict(self.module._OUTPUT_PROFILE, clear=True):  # a cold process has no profile yet
+                prompt, max_tokens = self.module.build_reading_prompt(
+                    self.module.DEFAULT_QUESTION, self.module.DEFAULT_TIMEFRAME, astro, spread)
+            key = self.module._get_cache_key(self.module.SYSTEM_PROMPT, prompt, self.module.DEFAULT_MODEL, 0.2, max_tokens)
+            cache = self.module.SQLiteResponseCache(db)
+            cache.set(key, SAMPLE_MODEL_OUTPUT)
+            cache.close()
+            env = dict(os.environ, RESPONSE_CACHE_BACKEND="sqlite", RESPONSE_CACHE_PATH=db,
+                       LAST_MODEL_OUTPUT_PATH=str(Path(tmp) / "last.txt"), OPENAI_API_KEY="")
+            proc, duration = self._python("astro_tarot_reader.py", "--outdir", tmp, env=env)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertIn("interpretation", json.loads(proc.stdout))
+        self.assertLess(duration, STARTUP_BUDGET_SECONDS)
+
+    def test_startup_report_parses_importtime(self):
+        rows = self.module.parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _json\n"
+            "import time:       300 |        420 | json\n")
+        self.assertEqual(rows[0], {"module": "_json", "self_us": 120, "cumulative_us": 120, "depth": 1})
+        self.assertEqual(rows[1]["depth"], 0)
+
+    def test_startup_report_covers_reader_and_validator(self):
+        report = self.module.startup_report()
+        for target in ("astro_tarot_reader", "validate_reading_faith"):
+            entry = report["targets"][target]
+            self.assertTrue(entry["ok"])
+            self.assertGreater(entry["import_us"], 0)
+            self.assertNotIn("requests", [m["module"] for m in entry["modules"]])
+
+
+class TestKBHotReload(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = importlib.import_module("astro_tarot_reader")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cards = Path(tmp.name) / "cards.json"
+        self.constellations = Path(tmp.name) / "constellations.json"
+        self.cards.write_bytes((PROJECT_ROOT / "data/celestia_arcana_knowledge.json").read_bytes())
+        self.constellations.write_bytes((PROJECT_ROOT / "data/constellation_knowledge.json").read_bytes())
+        self.module.load_card_kb(path=str(self.cards), force_reload=True)
+        self.module.load_constellation_kb(path=str(self.constellations), force_reload=True)
+
+    def tearDown(self):
+        self.module.clear_all_caches()
+        self.module._KB_PATHS.update(cards=self.module.TAROT_KB_PATH,
+                                     constellations=self.module.CONSTELLATION_KB_PATH)
+
+    def _add_card(self, name):
+        data = json.loads(self.cards.read_text(encoding="utf-8"))
+        data["cards"].append({"name": name, "arcana": "Major", "element": "Spirit", "keywords_upright": ["Wonder"]})
+        self.cards.write_text(json.dumps(data), encoding="utf-8")
+
+    def test_swap_publishes_new_index_and_counts_reload(self):
+        before = self.module.get_cache_stats()["perf_stats"]["kb_reloads"]
+        self._add_card("The Comet")
+        self.assertTrue(self.module.swap_kbs())
+        self.assertEqual(self.module.kb_element("the comet"), "Spirit")
+        self.assertEqual(self.module.get_cache_stats()["perf_stats"]["kb_reloads"], before + 1)
+
+    def test_pinned_reading_keeps_its_snapshot(self):
+        with self.module.pinned_knowledge_index():
+            self._add_card("The Comet")
+            self.module.swap_kbs()
+            self.assertEqual(self.module.kb_lookup("The Comet"), {})
+        self.assertEqual(self.module.kb_lookup("The Comet")["name"], "The Comet")
+
+    def test_watcher_check_only_reloads_on_change(self):
+        watcher = self.module.KBWatcher(interval=60)
+        watcher._seen = watcher._snapshot()
+        self.assertFalse(watcher.check())
+        self._add_card("The Comet")
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+
+    def test_invalid_json_keeps_current_kbs(self):
+        watcher = self.module.KBWatcher(interval=60)
+        watcher._seen = watcher._snapshot()
+        self.cards.write_text("{ not json", encoding="utf-8")
+        self.assertFalse(watcher.check())
+        self.assertEqual(self.module.kb_lookup("The Fool")["name"], "The Fool")
+
+    def test_background_watcher_swaps_without_restart(self):
+        watcher = self.module.KBWatcher(interval=0.05).start()
+        self.addCleanup(watcher.stop)
+        self._add_card("The Comet")
+        deadline = time.monotonic() + MAX_LOAD_SECONDS
+        while not self.module.kb_lookup("The Comet") and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.module.kb_lookup("The Comet")["name"], "The Comet")
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)